@@ -0,0 +1,3 @@
+"""
+Benchmarks against local mock Serper / Gemini / Bright Data servers
+"""
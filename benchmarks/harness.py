@@ -0,0 +1,108 @@
+"""
+Timing, memory and notebook-loading helpers for the benchmark scenarios
+
+The pipeline code lives in notebooks, so the scenarios call into the namespace
+scraping_core.notebooks.load_notebook() builds from a notebook's code cells
+(re-exported here). run_timed() drives a scenario function over its inputs
+with a thread pool and summarize() turns the per-item latencies into the
+report numbers.
+"""
+
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from scraping_core.notebooks import REPO_ROOT, load_notebook
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0..100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def run_timed(func: Callable[[Any], Any], items: Iterable[Any], concurrency: int = 1,
+              is_success: Callable[[Any], bool] = lambda result: result is not None) -> Dict[str, Any]:
+    """
+    Call func once per item on a thread pool, timing every call
+
+    Returns:
+        Dict with latencies (seconds), wall time, successes and errors
+    """
+    latencies: List[float] = []
+    errors: List[str] = []
+    successes = 0
+
+    def timed(item):
+        start = time.perf_counter()
+        try:
+            result = func(item)
+            return result, None, time.perf_counter() - start
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in as_completed([executor.submit(timed, item) for item in items]):
+            result, error, latency = future.result()
+            latencies.append(latency)
+            if error:
+                errors.append(error)
+            elif is_success(result):
+                successes += 1
+
+    return {
+        "latencies": latencies,
+        "wall_seconds": time.perf_counter() - wall_start,
+        "successes": successes,
+        "errors": errors,
+    }
+
+
+def summarize(scenario: str, timing: Dict[str, Any], unit: str, items_per_call: int = 1,
+              extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Report numbers for one scenario run
+
+    Args:
+        scenario: Scenario name
+        timing: run_timed() result
+        unit: What one throughput unit is (emails, profiles, people)
+        items_per_call: Units handled by each timed call
+        extra: Additional values to include (server stats, config, ...)
+    """
+    latencies = timing["latencies"]
+    calls = len(latencies)
+    wall = timing["wall_seconds"] or 1e-9
+    report = {
+        "scenario": scenario,
+        "calls": calls,
+        "successes": timing["successes"],
+        "errors": len(timing["errors"]),
+        "unit": unit,
+        "p50_seconds": round(percentile(latencies, 50), 3),
+        "p99_seconds": round(percentile(latencies, 99), 3),
+        "mean_seconds": round(sum(latencies) / calls, 3) if calls else 0.0,
+        "wall_seconds": round(wall, 3),
+        "per_minute": round(calls * items_per_call / wall * 60, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    if timing["errors"]:
+        report["first_error"] = timing["errors"][0]
+    if extra:
+        report.update(extra)
+    return report
@@ -0,0 +1,171 @@
+"""
+Import-time and cold-start budget for batch workers
+
+Every CLI / batch worker process pays for its imports before it handles the
+first row, so a heavy import (LangChain, google-generativeai, NumPy, ...)
+sneaking into the core package costs seconds per worker. This check runs in
+fresh interpreters:
+
+- import time: `python -X importtime -c "import <module>"` for the package and
+  the modules workers import, compared against a per-module budget
+- forbidden modules: none of HEAVY_MODULES may be loaded by those imports
+  (they are imported lazily, on first use, or only by the notebooks)
+- cold start: interpreter start -> EmailPipeline.from_env() -> one email
+  analyzed against MockAPIServer, compared against a wall-clock budget. The
+  single email scrapes directly (coalesce=False): a lone email has no
+  concurrent callers to share a trigger with, so the coalescer's batch window
+  would only add a fixed wait that says nothing about startup cost
+
+Exits with status 1 when a budget is exceeded or a heavy module was imported.
+
+Usage:
+    python benchmarks/import_budget.py
+    python benchmarks/import_budget.py --scale 2 --cold-start-budget 8 --output imports.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.harness import REPO_ROOT
+from benchmarks.mock_servers import MockAPIServer, MockConfig
+
+# Module -> import budget in milliseconds (cumulative -X importtime of that module)
+IMPORT_BUDGETS_MS = {
+    "scraping_core": 20,
+    "scraping_core.models": 300,
+    "scraping_core.email_pipeline": 600,
+    "scraping_core.name_scraper": 400,
+    "scraping_core.cli": 400,
+}
+
+# Never imported by the modules above
+HEAVY_MODULES = ("langchain", "google.generativeai", "numpy", "selectolax", "opentelemetry")
+
+COLD_START_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from scraping_core.email_pipeline import EmailPipeline
+imported = time.perf_counter()
+pipeline = EmailPipeline.from_env()
+pipeline.brightdata.coalesce = False
+result = pipeline.analyze("contact@coldstart.example")
+done = time.perf_counter()
+print(json.dumps({"import_seconds": imported - start, "email_seconds": done - imported,
+                  "email_error": result.get("error")}))
+"""
+
+
+def _python(args: List[str], env: Optional[Dict[str, str]] = None, cwd: Optional[str] = None):
+    return subprocess.run([sys.executable] + args, capture_output=True, text=True, env=env,
+                          cwd=cwd or REPO_ROOT, timeout=300)
+
+
+def measure_import(module: str) -> Dict[str, Any]:
+    """Cumulative import time of `module` in a fresh interpreter, plus the heavy modules it loaded"""
+    probe = (f"import json, sys, {module}; "
+             f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))")
+    completed = _python(["-X", "importtime", "-c", probe])
+    if completed.returncode != 0:
+        return {"module": module, "error": completed.stderr.strip().splitlines()[-1:]}
+
+    cumulative_us = 0
+    for line in completed.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            cumulative_us = int(parts[1])
+    return {
+        "module": module,
+        "import_ms": round(cumulative_us / 1000, 1),
+        "heavy_modules": json.loads(completed.stdout.strip().splitlines()[-1]),
+    }
+
+
+def measure_cold_start() -> Dict[str, Any]:
+    """Fresh interpreter -> one analyzed email against the mock APIs (wall clock from process start)"""
+    with MockAPIServer(MockConfig(ready_delay=1.0)) as server:
+        env = dict(os.environ,
+                   SCRAPING_BASE_URL_OVERRIDES=json.dumps(server.base_url_overrides()),
+                   SERPER_API_KEY="budget", GOOGLE_API_KEY="budget", BRIGHTDATA_API_TOKEN="budget",
+                   PYTHONPATH=REPO_ROOT)
+        # Empty cache / job store, so nothing is served from an earlier run
+        start = time.perf_counter()
+        completed = _python(["-c", COLD_START_SCRIPT], env=env, cwd=tempfile.mkdtemp(prefix="import_budget_"))
+        wall_seconds = time.perf_counter() - start
+
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1:]}
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    report["wall_seconds"] = wall_seconds
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiply every import budget (slow CI machines)")
+    parser.add_argument("--cold-start-budget", type=float, default=5.0,
+                        help="Seconds from interpreter start to the first analyzed email (mock APIs)")
+    parser.add_argument("--skip-cold-start", action="store_true", help="Only check the imports")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    failures = []
+    imports = []
+    print(f"\n{'module':<34} {'import ms':>10} {'budget ms':>10}  heavy modules")
+    for module, budget_ms in IMPORT_BUDGETS_MS.items():
+        report = measure_import(module)
+        report["budget_ms"] = budget_ms * args.scale
+        imports.append(report)
+        if "error" in report:
+            print(f"{module:<34} failed: {report['error']}")
+            failures.append(f"{module}: import failed")
+            continue
+
+        print(f"{module:<34} {report['import_ms']:>10} {report['budget_ms']:>10.0f}  "
+              f"{', '.join(report['heavy_modules']) or '-'}")
+        if report["import_ms"] > report["budget_ms"]:
+            failures.append(f"{module}: {report['import_ms']} ms > {report['budget_ms']:.0f} ms")
+        if report["heavy_modules"]:
+            failures.append(f"{module}: imports {', '.join(report['heavy_modules'])}")
+
+    cold_start = None
+    if not args.skip_cold_start:
+        cold_start = measure_cold_start()
+        if "error" in cold_start:
+            print(f"\n❄️ Cold start failed: {cold_start['error']}")
+            failures.append("cold start failed")
+        else:
+            print(f"\n❄️ Cold start: {cold_start['wall_seconds']:.2f}s wall "
+                  f"(imports {cold_start['import_seconds']:.2f}s, first email {cold_start['email_seconds']:.2f}s, "
+                  f"budget {args.cold_start_budget:.1f}s)")
+            if cold_start["email_error"]:
+                failures.append(f"cold start email failed: {cold_start['email_error']}")
+            if cold_start["wall_seconds"] > args.cold_start_budget:
+                failures.append(f"cold start: {cold_start['wall_seconds']:.2f}s > {args.cold_start_budget:.1f}s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"imports": imports, "cold_start": cold_start}, f, indent=2)
+        print(f"\n💾 Report written to {args.output}")
+
+    if failures:
+        print("\n❌ Budget exceeded:")
+        for line in failures:
+            print(f"   {line}")
+        return 1
+    print("\n✅ Within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,510 @@
+"""
+Local stand-ins for the Serper, Gemini and Bright Data APIs
+
+MockAPIServer answers the endpoints the notebooks and scripts call, on one
+local port:
+
+- POST /serper/search                                   (google.serper.dev/search, single or array payload)
+- POST /gemini/v1beta/models/{model}:generateContent     (Gemini REST)
+- POST /brightdata/datasets/v3/trigger
+- POST /brightdata/datasets/v3/scrape                   (synchronous scrape, answers after scrape_delay)
+- POST /brightdata/datasets/v3/snapshot/{snapshot_id}/cancel
+- GET  /brightdata/datasets/v3/progress/{snapshot_id}   (and /progress/, /snapshots)
+- GET  /brightdata/datasets/v3/snapshot/{snapshot_id}   (json / ndjson, 202 while running)
+- GET  /brightdata/datasets/v3/download/{snapshot_id}   (and /datasets/snapshots/{id}/download)
+
+Triggers that name an `endpoint` / `notify` URL get the finished snapshot and a
+{"snapshot_id", "status"} notification POSTed there once it is ready.
+
+Latency, the delay until a snapshot is ready, the share of 202 / 429 answers
+and the payload sizes come from MockConfig. Generated records are derived from
+the inputs (not from a random stream), so every run of a scenario sees the same
+data no matter how requests interleave.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Group", "Hooli", "Stark Industries", "Wayne Enterprises"]
+
+
+class MockConfig:
+    def __init__(self,
+                 latency_ms: float = 50.0,
+                 latency_jitter_ms: float = 20.0,
+                 ready_delay: float = 3.0,
+                 rate_202: float = 0.0,
+                 rate_429: float = 0.0,
+                 retry_after: float = 0.5,
+                 html_bytes: int = 50_000,
+                 organic_results: int = 5,
+                 profiles_per_person: int = 20,
+                 about_chars: int = 600,
+                 match_rate: float = 0.2,
+                 partial_results: bool = True,
+                 download_formats: Sequence[str] = ("json", "ndjson"),
+                 serper_max_batch: int = 100,
+                 scrape_delay: float = 1.0,
+                 seed: int = 7):
+        """
+        Behaviour of the mock APIs
+
+        Args:
+            latency_ms: Base delay added to every answer
+            latency_jitter_ms: Uniform extra delay (0..jitter) per answer
+            ready_delay: Seconds from /trigger until a snapshot reports ready
+            rate_202: Share of snapshot downloads answered 202 "still building" after the snapshot is ready
+            rate_429: Share of all requests answered 429 with a Retry-After header
+            retry_after: Retry-After value sent with 429 answers (seconds)
+            html_bytes: Approximate size of each scraped web page
+            organic_results: Organic results per Serper search
+            profiles_per_person: Profiles returned per person by name discovery
+            about_chars: Length of each profile's "about" text
+            match_rate: Share of discovered profiles working at "Acme Corp" (the benchmark company pattern)
+            partial_results: Include partial_results in 202 answers while a snapshot is running
+            download_formats: Snapshot formats answered; other format= values get 400 (tests endpoint negotiation)
+            serper_max_batch: Largest array payload Serper accepts; bigger batches get 400 (tests the fallback)
+            scrape_delay: Seconds the synchronous /scrape endpoint takes to answer
+            seed: Seed for latency jitter and 202 / 429 decisions
+        """
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.ready_delay = ready_delay
+        self.rate_202 = rate_202
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.html_bytes = html_bytes
+        self.organic_results = organic_results
+        self.profiles_per_person = profiles_per_person
+        self.about_chars = about_chars
+        self.match_rate = match_rate
+        self.partial_results = partial_results
+        self.download_formats = list(download_formats)
+        self.serper_max_batch = serper_max_batch
+        self.scrape_delay = scrape_delay
+        self.seed = seed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+def _digest(*parts: Any) -> int:
+    return int(hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest()[:12], 16)
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def fake_page(url: str, size: int) -> str:
+    """HTML page of roughly `size` bytes with head, navigation, main text and footer"""
+    host = urlparse(url).netloc or url
+    brand = host.replace("www.", "").split(".")[0].title()
+    head = (f"<html><head><title>{brand} - Official Site</title>"
+            f"<meta name=\"description\" content=\"{brand} builds software for industrial teams.\">"
+            f"<script>var tracking = '{'x' * 200}';</script></head><body>"
+            f"<nav><a href='/'>Home</a><a href='/about'>About</a><a href='/contact'>Contact</a></nav><main>"
+            f"<h1>Welcome to {brand}</h1>")
+    tail = f"</main><footer>© {brand}. All rights reserved.</footer></body></html>"
+    paragraph = (f"<p>{brand} helps manufacturers plan production, track inventory and ship on time "
+                 f"with one connected platform used by teams around the world.</p>")
+    body = []
+    used = len(head) + len(tail)
+    index = 0
+    while used < size:
+        block = f"<h2>Section {index}</h2>{paragraph}" if index % 5 == 0 else paragraph
+        body.append(block)
+        used += len(block)
+        index += 1
+    return head + "".join(body) + tail
+
+
+def fake_profile(first: str, last: str, index: int, config: MockConfig, url: Optional[str] = None,
+                 person: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """LinkedIn-like profile; completeness and company vary with the index"""
+    seed = _digest(first, last, index, url)
+    matches = (seed % 1000) / 1000.0 < config.match_rate
+    company = COMPANIES[0] if matches else COMPANIES[1 + seed % (len(COMPANIES) - 1)]
+    complete = seed % 3 != 0
+    slug = url.rstrip("/").rsplit("/", 1)[-1] if url else f"{_slug(first)}-{_slug(last)}-{index}"
+    profile = {
+        "id": slug,
+        "name": f"{first.title()} {last.title()}",
+        "url": url or f"https://www.linkedin.com/in/{slug}",
+        "city": ["Mumbai", "London", "Austin", "Berlin"][seed % 4],
+        "current_company": {"name": company},
+        "current_company_name": company,
+        "position": "Engineering Manager" if complete else "",
+        "about": ("Builds reliable systems. " * (config.about_chars // 25 + 1))[:config.about_chars] if complete else "",
+        "experience": [{"title": "Engineer", "company": company}] * (1 + seed % 4) if complete else [],
+        "education": [{"title": "B.Tech"}] if seed % 2 else [],
+        "followers": seed % 2000,
+        "connections": 500 if complete else seed % 100,
+    }
+    if person is not None:
+        profile["input"] = person
+    return profile
+
+
+class _Snapshot:
+    def __init__(self, snapshot_id: str, dataset_id: str, params: Dict[str, str], inputs: List[Dict]):
+        self.snapshot_id = snapshot_id
+        self.dataset_id = dataset_id
+        self.params = params
+        self.inputs = inputs
+        self.created_at = time.time()
+        self.cancelled = False
+        self._records: Optional[List[Dict]] = None
+
+    def records(self, config: MockConfig) -> List[Dict]:
+        if self._records is None:
+            records = []
+            discovery = self.params.get("type") == "discover_new"
+            for item in self.inputs:
+                if discovery:
+                    first, last = item.get("first_name", ""), item.get("last_name", "")
+                    records.extend(fake_profile(first, last, index, config, person=item)
+                                   for index in range(config.profiles_per_person))
+                elif "linkedin.com/in/" in item.get("url", ""):
+                    slug = item["url"].rstrip("/").rsplit("/", 1)[-1]
+                    first, _, last = slug.partition("-")
+                    records.append(fake_profile(first, last or "profile", 0, config, url=item["url"], person=item))
+                else:
+                    records.append({"input": item, "url": item.get("url"),
+                                    "html": fake_page(item.get("url", ""), config.html_bytes)})
+            self._records = records
+        return self._records
+
+
+class MockAPIServer:
+    def __init__(self, config: Optional[MockConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Threaded HTTP server standing in for Serper, Gemini and Bright Data
+
+        Args:
+            config: Latency / readiness / error-rate / payload settings
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+        """
+        self.config = config or MockConfig()
+        self.snapshots: Dict[str, _Snapshot] = {}
+        self.stats: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._counter = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server._handle(self, "GET")
+
+            def do_POST(self):
+                server._handle(self, "POST")
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def base_url_overrides(self) -> Dict[str, str]:
+        """Mapping for HttpClient / SCRAPING_BASE_URL_OVERRIDES"""
+        return {
+            "https://google.serper.dev": f"{self.url}/serper",
+            "https://api.brightdata.com": f"{self.url}/brightdata",
+            "https://generativelanguage.googleapis.com": f"{self.url}/gemini",
+        }
+
+    @property
+    def gemini_endpoint(self) -> str:
+        """api_endpoint for genai.configure(transport="rest", client_options=...)"""
+        return f"{self.url}/gemini"
+
+    def start(self) -> "MockAPIServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockAPIServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ------------------------------------------------------------------ plumbing
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + amount
+
+    def _chance(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def _delay(self):
+        with self._lock:
+            jitter = self._random.uniform(0, self.config.latency_jitter_ms)
+        time.sleep((self.config.latency_ms + jitter) / 1000.0)
+
+    @staticmethod
+    def _send(handler, status: int, body: Any, content_type: str = "application/json",
+              headers: Optional[Dict[str, str]] = None):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def _handle(self, handler, method: str):
+        parsed = urlparse(handler.path)
+        path = parsed.path
+        query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        length = int(handler.headers.get("Content-Length") or 0)
+        raw = handler.rfile.read(length) if length else b""
+        payload = json.loads(raw) if raw else None
+
+        self._delay()
+        if self._chance(self.config.rate_429):
+            self._count("429")
+            self._send(handler, 429, {"error": "Too many requests"},
+                       headers={"Retry-After": str(self.config.retry_after)})
+            return
+
+        try:
+            if path == "/serper/search" and method == "POST" and isinstance(payload, list):
+                self._count("serper_batch")
+                if len(payload) > self.config.serper_max_batch:
+                    self._send(handler, 400, {"message": "Too many queries in one request"})
+                else:
+                    self._count("serper_search", len(payload))
+                    self._send(handler, 200, [self.serper_search(item) for item in payload])
+            elif path == "/serper/search" and method == "POST":
+                self._count("serper_search")
+                self._send(handler, 200, self.serper_search(payload or {}))
+            elif path.startswith("/gemini/") and path.endswith(":generateContent"):
+                self._count("gemini_generate")
+                self._send(handler, 200, self.gemini_generate(payload or {}))
+            elif path == "/brightdata/datasets/v3/trigger" and method == "POST":
+                self._count("bd_trigger")
+                self._send(handler, 200, self.trigger(query, payload or []))
+            elif path == "/brightdata/datasets/v3/scrape" and method == "POST":
+                self._count("bd_scrape")
+                time.sleep(self.config.scrape_delay)
+                snapshot = _Snapshot("", query.get("dataset_id", ""), {}, list(payload or []))
+                self._send(handler, 200, snapshot.records(self.config))
+            elif path.startswith("/brightdata/datasets/v3/snapshot/") and path.endswith("/cancel"):
+                self._count("bd_cancel")
+                self._send(handler, 200, self.cancel(path.rstrip("/").split("/")[-2]))
+            elif path.startswith("/brightdata/datasets/v3/progress"):
+                self._count("bd_progress")
+                self._send(handler, 200, self.progress(path.rsplit("/", 1)[-1]))
+            elif path == "/brightdata/datasets/v3/snapshots":
+                self._count("bd_snapshots")
+                self._send(handler, 200, self.list_snapshots(query))
+            elif (path.startswith("/brightdata/datasets/v3/snapshot/")
+                  or path.startswith("/brightdata/datasets/v3/download/")
+                  or (path.startswith("/brightdata/datasets/snapshots/") and path.endswith("/download"))):
+                self._count("bd_download")
+                snapshot_id = path.rstrip("/").split("/")[-2 if path.endswith("/download") else -1]
+                self.download(handler, snapshot_id, query.get("format", "json"))
+            else:
+                self._count("not_found")
+                self._send(handler, 404, {"error": f"Unknown endpoint {method} {path}"})
+        except Exception as e:
+            self._count("errors")
+            self._send(handler, 500, {"error": str(e)})
+
+    # ------------------------------------------------------------------ Serper
+
+    def serper_search(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        query = str(payload.get("q", ""))
+        domain = next((word for word in query.split() if "." in word), "company.example")
+        brand = domain.split(".")[0]
+        organic = [{"title": f"{brand.title()} - Official Site", "link": f"https://www.{domain}/",
+                    "snippet": f"{brand.title()} builds software for industrial teams.", "position": 1}]
+        for position in range(2, self.config.organic_results + 1):
+            organic.append({"title": f"{brand.title()} on directory {position}",
+                            "link": f"https://www.linkedin.com/company/{brand}-{position}",
+                            "snippet": f"Company profile of {brand.title()}.", "position": position})
+        return {
+            "searchParameters": {"q": query, "num": payload.get("num", 10)},
+            "organic": organic[:payload.get("num", 10)],
+            "knowledgeGraph": {"title": brand.title(), "website": f"https://www.{domain}/"},
+            "relatedSearches": [{"query": f"{brand} careers"}, {"query": f"{brand} pricing"}],
+        }
+
+    # ------------------------------------------------------------------ Gemini
+
+    def _answer_fields(self, prompt: str, fields: List[str]) -> Dict[str, Any]:
+        """Plausible values for the JSON fields a stage prompt asks for"""
+        urls = re.findall(r"https?://[^\s\"'<>]+", prompt)
+        domain_match = re.search(r"Domain:\s*(\S+)", prompt)
+        domain = domain_match.group(1) if domain_match else "company.example"
+        answer = {}
+        for field in fields:
+            if field == "search_query":
+                answer[field] = f"{domain} official website"
+            elif field == "domain":
+                answer[field] = domain
+            elif field in ("selected_url", "url"):
+                answer[field] = urls[0] if urls else f"https://www.{domain}/"
+            elif field == "reasoning":
+                answer[field] = "The first result is the company's own domain"
+            elif field == "confidence_score":
+                answer[field] = 0.9
+            elif field == "summary":
+                answer[field] = f"{domain} builds software that helps industrial teams plan and ship."
+            elif field == "original_email":
+                answer[field] = f"contact@{domain}"
+            else:
+                answer[field] = ""
+        return answer
+
+    def gemini_generate(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        prompt = "".join(part.get("text", "")
+                         for content in payload.get("contents", [])
+                         for part in content.get("parts", []))
+        generation_config = payload.get("generationConfig") or payload.get("generation_config") or {}
+        schema = generation_config.get("responseSchema") or generation_config.get("response_schema")
+
+        if schema and str(schema.get("type", "")).upper() == "ARRAY":
+            # Batched structured request: one answer per "### Task id: ..." section
+            fields = [name for name in schema["items"]["properties"] if name != "id"]
+            sections = re.split(r"### Task id: (\S+)\n", prompt)[1:]
+            answers = [dict(self._answer_fields(task_prompt, fields), id=task_id)
+                       for task_id, task_prompt in zip(sections[::2], sections[1::2])]
+            text = json.dumps(answers)
+        else:
+            # Single prompt: fill in the JSON format example the prompt ends with
+            example = prompt[prompt.rfind("{"):] if "{" in prompt else ""
+            fields = re.findall(r'"(\w+)"\s*:', example) or ["text"]
+            text = json.dumps(self._answer_fields(prompt, fields))
+
+        prompt_tokens = len(prompt) // 4
+        output_tokens = len(text) // 4
+        return {
+            "candidates": [{"content": {"parts": [{"text": text}], "role": "model"},
+                            "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {"promptTokenCount": prompt_tokens, "candidatesTokenCount": output_tokens,
+                              "totalTokenCount": prompt_tokens + output_tokens},
+        }
+
+    # ------------------------------------------------------------------ Bright Data
+
+    def trigger(self, query: Dict[str, str], inputs: List[Dict]) -> Dict[str, Any]:
+        with self._lock:
+            self._counter += 1
+            snapshot_id = f"s_mock{self._counter:06d}"
+            params = {key: value for key, value in query.items() if key != "dataset_id"}
+            snapshot = _Snapshot(snapshot_id, query.get("dataset_id", ""), params, list(inputs))
+            self.snapshots[snapshot_id] = snapshot
+
+        if params.get("endpoint") or params.get("notify"):
+            timer = threading.Timer(self.config.ready_delay, self._push, args=(snapshot,))
+            timer.daemon = True
+            timer.start()
+        return {"snapshot_id": snapshot_id}
+
+    def _push(self, snapshot: _Snapshot):
+        """Webhook delivery: POST the records to `endpoint`, then the notification to `notify`"""
+        headers = {"snapshot-id": snapshot.snapshot_id}
+        if snapshot.params.get("auth_header"):
+            headers["Authorization"] = snapshot.params["auth_header"]
+        try:
+            if snapshot.params.get("endpoint"):
+                self._count("bd_webhook")
+                requests.post(snapshot.params["endpoint"], json=snapshot.records(self.config),
+                              headers=headers, timeout=30)
+            if snapshot.params.get("notify"):
+                self._count("bd_notify")
+                requests.post(snapshot.params["notify"], headers=headers, timeout=30,
+                              json={"snapshot_id": snapshot.snapshot_id, "status": "ready"})
+        except requests.RequestException:
+            self._count("push_errors")
+
+    def cancel(self, snapshot_id: str) -> Dict[str, Any]:
+        snapshot = self.snapshots.get(snapshot_id)
+        if snapshot is None:
+            return {"error": f"Snapshot {snapshot_id} not found"}
+        snapshot.cancelled = True
+        return {"snapshot_id": snapshot_id, "status": "cancelled"}
+
+    def _ready(self, snapshot: _Snapshot) -> bool:
+        return time.time() - snapshot.created_at >= self.config.ready_delay
+
+    def _status(self, snapshot: _Snapshot) -> str:
+        if snapshot.cancelled:
+            return "cancelled"
+        return "ready" if self._ready(snapshot) else "running"
+
+    def progress(self, snapshot_id: str) -> Any:
+        snapshot = self.snapshots.get(snapshot_id)
+        if snapshot is None:
+            return [{"snapshot_id": s.snapshot_id, "status": self._status(s)}
+                    for s in list(self.snapshots.values())]
+        return {"snapshot_id": snapshot_id, "dataset_id": snapshot.dataset_id,
+                "status": self._status(snapshot)}
+
+    def list_snapshots(self, query: Dict[str, str]) -> List[Dict[str, Any]]:
+        wanted = query.get("status")
+        listed = []
+        for snapshot in sorted(self.snapshots.values(), key=lambda s: s.created_at, reverse=True):
+            status = "ready" if self._ready(snapshot) else "running"
+            if wanted in (None, status):
+                listed.append({"id": snapshot.snapshot_id, "status": status,
+                               "created": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(snapshot.created_at))})
+        return listed
+
+    def download(self, handler, snapshot_id: str, format_type: str):
+        snapshot = self.snapshots.get(snapshot_id)
+        if snapshot is None:
+            self._send(handler, 404, {"error": f"Snapshot {snapshot_id} not found"})
+            return
+
+        if format_type not in self.config.download_formats:
+            self._send(handler, 400, {"error": f"Unsupported format: {format_type}"})
+            return
+
+        if not self._ready(snapshot) or self._chance(self.config.rate_202):
+            body = {"status": "running", "message": "Snapshot is not ready yet, try again in 10s"}
+            if self.config.partial_results and not self._ready(snapshot):
+                records = snapshot.records(self.config)
+                share = (time.time() - snapshot.created_at) / max(self.config.ready_delay, 1e-6)
+                body["partial_results"] = records[:int(len(records) * min(share, 1.0))]
+            self._count("bd_202")
+            self._send(handler, 202, body)
+            return
+
+        records = snapshot.records(self.config)
+        if format_type in ("ndjson", "jsonl"):
+            data = "\n".join(json.dumps(record) for record in records).encode("utf-8")
+            self._send(handler, 200, data, content_type="application/x-ndjson")
+        else:
+            self._send(handler, 200, records)
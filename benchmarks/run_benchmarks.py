@@ -0,0 +1,255 @@
+"""
+Throughput / latency benchmarks against local mock APIs
+
+Runs reproducible scenarios for the entry points that spend the most API
+time, without real credentials or credits:
+
+- analyze_email_domain                                (Serper,gemini_and_brightdata.ipynb)
+- email_pipeline_core                                 (scraping_core.EmailPipeline, same pipeline without LangChain)
+- scrape_linkedin_profiles_complete                   (BrightData_LinkedIn_Profile_URL_Scrapper.ipynb)
+- discover_linkedin_profiles_with_smart_termination   (regex_name_scraper.py)
+
+Every scenario runs in its own process (so peak RSS is per scenario) with all
+Serper / Bright Data calls redirected to MockAPIServer through
+SCRAPING_BASE_URL_OVERRIDES and Gemini pointed at the mock REST endpoint. The
+report lists p50 / p99 latency per call, throughput per minute and peak RSS;
+pass --baseline to fail when a scenario regressed against an earlier report.
+
+Usage:
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --scenario discover_linkedin_profiles_with_smart_termination \\
+        --ready-delay 10 --rate-429 0.05 --baseline bench.json
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from typing import Any, Callable, Dict, List, Optional
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.harness import REPO_ROOT, load_notebook, run_timed, summarize
+from benchmarks.mock_servers import MockAPIServer, MockConfig
+from scraping_core.notebooks import NAME_SCRAPER_SCRIPT, PIPELINE_NOTEBOOK, URL_SCRAPER_NOTEBOOK, load_script
+from scraping_core.webhook_receiver import start_webhook_receiver
+
+API_KEY = "benchmark"
+DATASET_ID = "gd_l1viktl72bvl7bjuj0"
+COMPANY_PATTERN = ".*Acme.*"    # MockConfig.match_rate of discovered profiles work at "Acme Corp"
+
+# Per-scenario defaults: timed calls, concurrent callers, throughput unit, units per call
+SCENARIO_DEFAULTS = {
+    "analyze_email_domain": {"items": 20, "concurrency": 8, "unit": "emails", "per_call": 1},
+    "email_pipeline_core": {"items": 20, "concurrency": 8, "unit": "emails", "per_call": 1},
+    "scrape_linkedin_profiles_complete": {"items": 10, "concurrency": 4, "unit": "profiles", "per_call": 5},
+    "discover_linkedin_profiles_with_smart_termination": {"items": 8, "concurrency": 4, "unit": "people",
+                                                          "per_call": 1},
+}
+
+# Report fields where a larger value is a regression, and fields where a smaller value is
+HIGHER_IS_WORSE = ("p50_seconds", "p99_seconds", "peak_rss_mb")
+LOWER_IS_WORSE = ("per_minute",)
+
+
+def scenario_analyze_email_domain(items: int, concurrency: int, gemini_endpoint: str) -> Dict[str, Any]:
+    """One analyze_email_domain() call per email, each at its own domain"""
+    def configure(index: int, namespace: Dict[str, Any]):
+        if "GOOGLE_API_KEY" in namespace and "genai" in namespace:
+            namespace.update(SERPER_API_KEY=API_KEY, BRIGHTDATA_API_TOKEN=API_KEY, GOOGLE_API_KEY=API_KEY)
+            namespace["genai"].configure(api_key=API_KEY, transport="rest",
+                                         client_options={"api_endpoint": gemini_endpoint})
+            namespace.get("_GEMINI_MODELS", {}).clear()
+
+    # Last cell is the single-email demo run
+    namespace = load_notebook(PIPELINE_NOTEBOOK, skip_cells=[-1], after_cell=configure)
+    emails = [f"contact@company{index}.example" for index in range(items)]
+    return run_timed(namespace["analyze_email_domain"], emails, concurrency,
+                     is_success=lambda result: bool(result) and not result.get("error"))
+
+
+def scenario_email_pipeline_core(items: int, concurrency: int, gemini_endpoint: str) -> Dict[str, Any]:
+    """One EmailPipeline.analyze() call per email, each at its own domain (Gemini over the mock REST API)"""
+    from scraping_core.email_pipeline import EmailPipeline
+
+    os.environ.update(SERPER_API_KEY=API_KEY, BRIGHTDATA_API_TOKEN=API_KEY, GOOGLE_API_KEY=API_KEY)
+    pipeline = EmailPipeline.from_env()
+    emails = [f"contact@company{index}.example" for index in range(items)]
+    return run_timed(pipeline.analyze, emails, concurrency,
+                     is_success=lambda result: bool(result) and not result.get("error"))
+
+
+def scenario_scrape_linkedin_profiles_complete(items: int, concurrency: int, gemini_endpoint: str) -> Dict[str, Any]:
+    """One scrape_linkedin_profiles_complete() call per batch of five profile URLs"""
+    namespace = load_notebook(URL_SCRAPER_NOTEBOOK)
+    per_call = SCENARIO_DEFAULTS["scrape_linkedin_profiles_complete"]["per_call"]
+    batches = [[f"https://www.linkedin.com/in/person{index}-{offset}/" for offset in range(per_call)]
+               for index in range(items)]
+    scrape = namespace["scrape_linkedin_profiles_complete"]
+    return run_timed(lambda urls: scrape(API_KEY, DATASET_ID, urls), batches, concurrency,
+                     is_success=lambda result: bool(result))
+
+
+def scenario_discover_linkedin_profiles_with_smart_termination(items: int, concurrency: int,
+                                                               gemini_endpoint: str) -> Dict[str, Any]:
+    """One smart-termination discovery per person, filtered on COMPANY_PATTERN"""
+    module = load_script(NAME_SCRAPER_SCRIPT)
+
+    people = [{"first_name": f"Person{index}", "last_name": "Bench"} for index in range(items)]
+    return run_timed(
+        lambda person: module.discover_linkedin_profiles_with_smart_termination(
+            API_KEY, DATASET_ID, [person], COMPANY_PATTERN, min_quality_score=4, max_wait=120),
+        people, concurrency, is_success=lambda result: bool(result)
+    )
+
+
+SCENARIOS: Dict[str, Callable[[int, int, str], Dict[str, Any]]] = {
+    "analyze_email_domain": scenario_analyze_email_domain,
+    "email_pipeline_core": scenario_email_pipeline_core,
+    "scrape_linkedin_profiles_complete": scenario_scrape_linkedin_profiles_complete,
+    "discover_linkedin_profiles_with_smart_termination": scenario_discover_linkedin_profiles_with_smart_termination,
+}
+
+
+def _run_child(name: str, items: int, concurrency: int, overrides: Dict[str, str], gemini_endpoint: str,
+               verbose: bool, webhook: bool, queue):
+    # Fresh process: the shared HTTP client reads the overrides when it is created
+    os.environ["SCRAPING_BASE_URL_OVERRIDES"] = json.dumps(overrides)
+    sys.path.insert(0, REPO_ROOT)
+    # Caches / job stores / output files are created in a throwaway directory, so every run starts cold
+    os.chdir(tempfile.mkdtemp(prefix=f"bench_{name}_"))
+    os.environ.pop("BRIGHTDATA_WEBHOOK_URL", None)
+    if webhook:
+        # The mock pushes finished snapshots to this receiver instead of waiting to be polled
+        start_webhook_receiver(host="127.0.0.1", port=0)
+
+    defaults = SCENARIO_DEFAULTS[name]
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.ExitStack() as stack:
+            if not verbose:
+                stack.enter_context(contextlib.redirect_stdout(devnull))
+            timing = SCENARIOS[name](items, concurrency, gemini_endpoint)
+        queue.put(summarize(name, timing, defaults["unit"], defaults["per_call"],
+                            extra={"concurrency": concurrency}))
+    except ImportError as e:
+        queue.put({"scenario": name, "skipped": f"missing dependency: {e}"})
+    except Exception as e:
+        queue.put({"scenario": name, "skipped": f"{type(e).__name__}: {e}"})
+
+
+def run_scenario(name: str, server: MockAPIServer, items: Optional[int] = None,
+                 concurrency: Optional[int] = None, verbose: bool = False, webhook: bool = False) -> Dict[str, Any]:
+    """Run one scenario in a fresh process against the running mock server"""
+    defaults = SCENARIO_DEFAULTS[name]
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    before = dict(server.stats)
+
+    process = context.Process(target=_run_child, args=(
+        name, items or defaults["items"], concurrency or defaults["concurrency"],
+        server.base_url_overrides(), server.gemini_endpoint, verbose, webhook, queue))
+    process.start()
+    report = queue.get()
+    process.join()
+
+    report["mock_requests"] = {key: count - before.get(key, 0) for key, count in server.stats.items()
+                               if count - before.get(key, 0)}
+    return report
+
+
+def compare(reports: List[Dict[str, Any]], baseline: List[Dict[str, Any]], max_regression: float) -> List[str]:
+    """Regressions of more than max_regression (relative) against a baseline report"""
+    previous = {report["scenario"]: report for report in baseline if "skipped" not in report}
+    regressions = []
+    for report in reports:
+        old = previous.get(report["scenario"])
+        if old is None or "skipped" in report:
+            continue
+        for field in HIGHER_IS_WORSE + LOWER_IS_WORSE:
+            before, after = old.get(field), report.get(field)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if (field in HIGHER_IS_WORSE and change > max_regression) or \
+                    (field in LOWER_IS_WORSE and -change > max_regression):
+                regressions.append(f"{report['scenario']}: {field} {before} -> {after} ({change:+.0%})")
+    return regressions
+
+
+def print_report(reports: List[Dict[str, Any]]):
+    print(f"\n{'scenario':<52} {'calls':>5} {'ok':>4} {'p50 s':>8} {'p99 s':>8} {'per min':>14} {'RSS MB':>8}")
+    print("-" * 105)
+    for report in reports:
+        if "skipped" in report:
+            print(f"{report['scenario']:<52} skipped ({report['skipped']})")
+            continue
+        throughput = f"{report['per_minute']} {report['unit']}"
+        print(f"{report['scenario']:<52} {report['calls']:>5} {report['successes']:>4} {report['p50_seconds']:>8} "
+              f"{report['p99_seconds']:>8} {throughput:>14} {report['peak_rss_mb']:>8}")
+        if report.get("first_error"):
+            print(f"   ⚠️ {report['errors']} errors, first: {report['first_error']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--items", type=int, help="Timed calls per scenario (default: per scenario)")
+    parser.add_argument("--concurrency", type=int, help="Concurrent callers (default: per scenario)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Base latency of every mock answer")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="Extra uniform latency per answer")
+    parser.add_argument("--ready-delay", type=float, default=3.0, help="Seconds until a snapshot is ready")
+    parser.add_argument("--rate-202", type=float, default=0.0, help="Share of ready downloads answered 202")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Share of requests answered 429")
+    parser.add_argument("--html-bytes", type=int, default=50_000, help="Size of each scraped page")
+    parser.add_argument("--profiles-per-person", type=int, default=20, help="Profiles per discovered person")
+    parser.add_argument("--download-formats", default="json,ndjson",
+                        help="Snapshot formats the mock answers (others get 400, e.g. 'json' to test negotiation)")
+    parser.add_argument("--webhook", action="store_true",
+                        help="Have the mock push finished snapshots to a local webhook receiver (polling as fallback)")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Allowed relative slowdown / throughput drop / RSS growth before failing")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own progress output")
+    args = parser.parse_args(argv)
+
+    config = MockConfig(latency_ms=args.latency_ms, latency_jitter_ms=args.jitter_ms,
+                        ready_delay=args.ready_delay, rate_202=args.rate_202, rate_429=args.rate_429,
+                        html_bytes=args.html_bytes, profiles_per_person=args.profiles_per_person,
+                        download_formats=args.download_formats.split(","))
+
+    reports = []
+    with MockAPIServer(config) as server:
+        print(f"🧪 Mock APIs listening on {server.url}")
+        for name in args.scenario or list(SCENARIOS):
+            print(f"⏱️ Running {name}...")
+            reports.append(run_scenario(name, server, args.items, args.concurrency, args.verbose, args.webhook))
+
+    print_report(reports)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": config.to_dict(), "reports": reports}, f, indent=2)
+        print(f"\n💾 Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["reports"]
+        regressions = compare(reports, baseline, args.max_regression)
+        if regressions:
+            print("\n❌ Regressions against the baseline:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print("\n✅ No regressions against the baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+Shared building blocks for the Serper / Gemini / Bright Data scraping notebooks
+
+The notebooks and scripts in this repository import these helpers so the heavy
+lifting (batching, polling, caching, ...) lives in one place instead of being
+copied into every notebook cell.
+
+Everything is imported lazily: `import scraping_core` loads nothing, and
+`from scraping_core import EmailPipeline` only pulls in the modules that
+pipeline needs (no LangChain, no google-generativeai), so batch workers start
+in well under a second.
+"""
+
+import importlib
+
+# Public name -> module it lives in (resolved on first attribute access)
+_LAZY_EXPORTS = {
+    "EmailPipeline": "scraping_core.email_pipeline",
+    "SerperClient": "scraping_core.serper_client",
+    "GeminiClient": "scraping_core.gemini_client",
+    "BrightDataClient": "scraping_core.brightdata_client",
+    "BrightDataLinkedInNameScraper": "scraping_core.name_scraper",
+    "EntityResolver": "scraping_core.entity_resolution",
+    "DomainOutput": "scraping_core.models",
+    "SearchQueryOutput": "scraping_core.models",
+    "SearchResult": "scraping_core.models",
+    "SearchResultsOutput": "scraping_core.models",
+    "URLSelectionOutput": "scraping_core.models",
+    "ScrapedContentOutput": "scraping_core.models",
+    "FinalSummaryOutput": "scraping_core.models",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'scraping_core' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,191 @@
+"""
+Async batch engine for running a multi-stage pipeline over many inputs
+
+Every input (e.g. an email address) flows through an ordered list of stages.
+Each stage is bound to the upstream service it talks to (serper, gemini,
+brightdata, ...) and every service gets its own concurrency limit, so a slow
+Bright Data scrape for one email never holds up Serper or Gemini work for the
+others. Results are yielded as soon as each input has finished.
+"""
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List, Optional, Union
+
+from scraping_core.telemetry import get_tracer, run_context
+
+# Default per-service concurrency limits (tune these to your API plan quotas)
+DEFAULT_SERVICE_LIMITS = {
+    "local": 50,
+    "serper": 10,
+    "gemini": 8,
+    "brightdata": 20,
+}
+
+
+async def _as_async(items: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Any]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+class Stage:
+    def __init__(self, name: str, func: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+                 service: str = "local"):
+        """
+        Single pipeline stage
+
+        Args:
+            name: Stage name used in results and error reports
+            func: Callable (sync or async) receiving the accumulated state dict and
+                  returning a dict of new values to merge into the state
+            service: Upstream service whose concurrency limit applies to this stage
+        """
+        self.name = name
+        self.func = func
+        self.service = service
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, service={self.service!r})"
+
+
+class AsyncBatchEngine:
+    def __init__(self,
+                 stages: List[Stage],
+                 service_limits: Optional[Dict[str, int]] = None,
+                 max_in_flight: int = 200,
+                 input_key: str = "input"):
+        """
+        Initialize the batch engine
+
+        Args:
+            stages: Ordered list of stages every input goes through
+            service_limits: Concurrency limit per service (merged over the defaults)
+            max_in_flight: Maximum number of inputs being processed at the same time
+            input_key: State key the raw input is stored under before the first stage
+        """
+        self.stages = stages
+        self.service_limits = dict(DEFAULT_SERVICE_LIMITS)
+        if service_limits:
+            self.service_limits.update(service_limits)
+        self.max_in_flight = max_in_flight
+        self.input_key = input_key
+        self.stats = {"started": 0, "completed": 0, "failed": 0, "in_flight": 0}
+
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _semaphore_for(self, service: str) -> asyncio.Semaphore:
+        if service not in self._semaphores:
+            limit = self.service_limits.get(service, DEFAULT_SERVICE_LIMITS["local"])
+            self._semaphores[service] = asyncio.Semaphore(limit)
+        return self._semaphores[service]
+
+    async def _run_stage(self, stage: Stage, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        async with self._semaphore_for(stage.service):
+            with get_tracer().span(f"stage.{stage.name}", service=stage.service):
+                if asyncio.iscoroutinefunction(stage.func):
+                    return await stage.func(state)
+
+                # Blocking stages (requests / LangChain calls) run on the shared thread pool,
+                # inside a copy of this task's context so their spans keep the run id
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, contextvars.copy_context().run, stage.func, state)
+
+    async def _run_item(self, index: int, item: Any) -> Dict[str, Any]:
+        # Each item runs in its own task, so the run id only tags this item's spans
+        with run_context(str(item)):
+            return await self._run_item_stages(index, item)
+
+    async def _run_item_stages(self, index: int, item: Any) -> Dict[str, Any]:
+        state = {self.input_key: item}
+        start_time = time.time()
+        self.stats["started"] += 1
+        self.stats["in_flight"] += 1
+
+        try:
+            for stage in self.stages:
+                try:
+                    outputs = await self._run_stage(stage, state)
+                except Exception as e:
+                    self.stats["failed"] += 1
+                    return {
+                        "index": index,
+                        "input": item,
+                        "state": state,
+                        "error": str(e),
+                        "failed_stage": stage.name,
+                        "processing_time": time.time() - start_time,
+                    }
+
+                if outputs:
+                    state.update(outputs)
+
+            self.stats["completed"] += 1
+            return {
+                "index": index,
+                "input": item,
+                "state": state,
+                "error": None,
+                "failed_stage": None,
+                "processing_time": time.time() - start_time,
+            }
+        finally:
+            self.stats["in_flight"] -= 1
+
+    async def run(self, items: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run every input through the pipeline, yielding results as they complete
+
+        Inputs are pulled lazily from the iterable, so at most `max_in_flight`
+        of them are held in memory at once.
+
+        Args:
+            items: Iterable or async iterable of pipeline inputs (e.g. email addresses)
+
+        Yields:
+            Result dicts with index, input, state, error, failed_stage and processing_time
+        """
+        self._semaphores = {}
+        # One thread per concurrent blocking call is enough for every service to hit its limit
+        self._executor = ThreadPoolExecutor(max_workers=sum(self.service_limits.values()))
+        pending = set()
+
+        try:
+            index = 0
+            async for item in _as_async(items):
+                pending.add(asyncio.ensure_future(self._run_item(index, item)))
+                index += 1
+
+                if len(pending) >= self.max_in_flight:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            self._executor.shutdown(wait=False)
+
+    async def run_all(self, items: Iterable[Any]) -> List[Dict[str, Any]]:
+        """
+        Run every input and return all results in input order
+        """
+        results = [result async for result in self.run(items)]
+        results.sort(key=lambda r: r["index"])
+        return results
+
+    def run_sync(self, items: Iterable[Any]) -> List[Dict[str, Any]]:
+        """
+        Blocking helper for plain scripts (use `await run_all(...)` inside Jupyter)
+        """
+        return asyncio.run(self.run_all(items))
@@ -0,0 +1,325 @@
+"""
+Multi-process batch runner for large enrichment jobs
+
+Input rows (CSV, JSONL or one value per line) are read lazily, packed into
+chunks and fanned out over a pool of worker processes. Every worker builds its
+handler once (e.g. loads the pipeline notebook) and runs each chunk on its own
+event loop, so the rows of a chunk are processed with async I/O inside the
+process. Results stream to an output sink as chunks finish. At most
+max_pending_chunks are queued or running at a time: when the workers (or the
+sink) fall behind, the reader waits instead of loading the whole input into
+memory.
+"""
+
+import asyncio
+import csv
+import inspect
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from scraping_core.http_client import get_http_client
+from scraping_core.snapshot_stream import JsonlWriter, read_jsonl
+from scraping_core.telemetry import configure_logging, get_logger
+
+log = get_logger("batch")
+
+# Handler and event loop of the current worker process (set by _init_worker)
+_WORKER: Dict[str, Any] = {}
+
+
+def normalize_column(name: str) -> str:
+    """'First Name' -> 'first_name', so CSV exports and JSONL keys line up"""
+    return "_".join(str(name).strip().lower().split())
+
+
+def read_rows(path: str, text_column: str = "value") -> Iterator[Dict[str, Any]]:
+    """
+    Yield input rows from a file without loading it into memory
+
+    Args:
+        path: .csv (header row), .jsonl / .ndjson (one object per line) or any other
+              file with one value per line ("-" reads lines from stdin)
+        text_column: Column name used for one-value-per-line input
+
+    Yields:
+        dict per row with normalized column names
+    """
+    lower = path.lower()
+    if lower.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                yield {normalize_column(key): value.strip() if isinstance(value, str) else value
+                       for key, value in row.items() if key}
+    elif lower.endswith((".jsonl", ".ndjson")):
+        for record in read_jsonl(path):
+            yield {normalize_column(key): value for key, value in record.items()}
+    else:
+        f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield {text_column: line}
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+class CsvWriter:
+    def __init__(self, path: str, flush_every: int = 50):
+        """
+        Append-only CSV writer with the same interface as JsonlWriter
+
+        The columns are taken from the existing header (when appending) or from
+        the first record; later keys outside them are dropped and nested values
+        are written as JSON. Use JSONL output to keep complete records.
+
+        Args:
+            path: Output file; created if missing, appended to otherwise
+            flush_every: Flush to disk after this many records
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.count = 0
+        self.fieldnames: Optional[List[str]] = None
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, newline="", encoding="utf-8") as f:
+                self.fieldnames = next(csv.reader(f), None)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._writer: Optional[csv.DictWriter] = None
+
+    def write(self, record: Dict[str, Any]):
+        if self._writer is None:
+            new_file = self.fieldnames is None
+            if new_file:
+                self.fieldnames = list(record) + ([] if "error" in record else ["error"])
+            self._writer = csv.DictWriter(self._file, self.fieldnames, extrasaction="ignore")
+            if new_file:
+                self._writer.writeheader()
+        self._writer.writerow({key: json.dumps(value, ensure_ascii=False, default=str)
+                               if isinstance(value, (dict, list)) else value
+                               for key, value in record.items()})
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> "CsvWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_sink(path: str):
+    """CsvWriter for .csv output, JsonlWriter otherwise (both append)"""
+    return CsvWriter(path) if path.lower().endswith(".csv") else JsonlWriter(path)
+
+
+def completed_keys(path: str, key_field: str) -> Set[str]:
+    """Keys of rows an earlier run already wrote to path without an error"""
+    if not os.path.exists(path):
+        return set()
+    records = read_rows(path) if path.lower().endswith(".csv") else read_jsonl(path)
+    return {str(record[key_field]) for record in records
+            if record.get(key_field) not in (None, "") and not record.get("error")}
+
+
+def _init_worker(handler_factory: Callable[..., Callable], factory_kwargs: Dict[str, Any],
+                 log_level: str, rate_share: float):
+    configure_logging(log_level)
+    _WORKER["handler"] = handler_factory(**factory_kwargs)
+    # Loading a notebook configures logging at the notebook's own level
+    configure_logging(log_level)
+    _WORKER["loop"] = asyncio.new_event_loop()
+
+    # Token buckets are per process: each worker gets its share of every per-host limit
+    client = get_http_client()
+    client.rate_limits = {host: (rate * rate_share, max(1, int(burst * rate_share)))
+                          for host, (rate, burst) in client.rate_limits.items()}
+
+
+def _run_chunk(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    result = _WORKER["handler"](rows)
+    if inspect.isawaitable(result):
+        result = _WORKER["loop"].run_until_complete(result)
+    return list(result or [])
+
+
+class BatchRunner:
+    def __init__(self,
+                 handler_factory: Callable[..., Callable],
+                 factory_kwargs: Optional[Dict[str, Any]] = None,
+                 key_field: str = "id",
+                 workers: Optional[int] = None,
+                 chunk_size: int = 25,
+                 max_pending_chunks: Optional[int] = None,
+                 progress_every: float = 30.0,
+                 worker_log_level: str = "WARNING",
+                 share_rate_limits: bool = True):
+        """
+        Initialize the batch runner
+
+        Args:
+            handler_factory: Importable top-level function, called once in every worker process
+                             with factory_kwargs. It returns handler(rows) (sync or async) giving
+                             one output record per row, each carrying the row's key_field
+            factory_kwargs: Picklable keyword arguments for handler_factory
+            key_field: Column identifying a row; input columns are merged into its output
+                       record and --resume style skipping uses it
+            workers: Worker processes (defaults to the CPU count)
+            chunk_size: Rows sent to a worker per task
+            max_pending_chunks: Chunks queued or running before the reader waits (default 2 per worker)
+            progress_every: Seconds between progress log lines
+            worker_log_level: Log level inside the workers (per-row progress is noisy at INFO)
+            share_rate_limits: Split the per-host HTTP rate limits evenly across the workers
+        """
+        self.handler_factory = handler_factory
+        self.factory_kwargs = dict(factory_kwargs or {})
+        self.key_field = key_field
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.chunk_size = max(1, chunk_size)
+        self.max_pending_chunks = max(1, max_pending_chunks or 2 * self.workers)
+        self.progress_every = progress_every
+        self.worker_log_level = worker_log_level
+        self.share_rate_limits = share_rate_limits
+
+        self.stats = {
+            "read": 0,
+            "skipped": 0,             # already done (resume) or duplicate keys
+            "invalid": 0,             # rows without a key
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "written": 0,
+            "pending_chunks": 0,
+            "backpressure_waits": 0,  # times the reader waited for a free chunk slot
+        }
+        self._start = time.time()
+        self._last_progress = self._start
+
+    def _chunks(self, rows: Iterable[Dict[str, Any]], skip_keys: Set[str]) -> Iterator[List[Dict[str, Any]]]:
+        seen = set(skip_keys)
+        chunk = []
+        for row in rows:
+            self.stats["read"] += 1
+            key = row.get(self.key_field) if row else None
+            if key in (None, ""):
+                self.stats["invalid"] += 1
+                continue
+            if str(key) in seen:
+                self.stats["skipped"] += 1
+                continue
+            seen.add(str(key))
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _write(self, chunk: List[Dict[str, Any]], records: List[Dict[str, Any]], sink):
+        rows = {str(row[self.key_field]): row for row in chunk}
+        answered = set()
+        for record in records:
+            key = str(record.get(self.key_field, ""))
+            sink.write(dict(rows.get(key, {}), **record))
+            self.stats["written"] += 1
+            if key in rows and key not in answered:
+                answered.add(key)
+                self.stats["failed" if record.get("error") else "completed"] += 1
+
+        for key, row in rows.items():
+            if key not in answered:
+                sink.write(dict(row, error="No result returned for this row"))
+                self.stats["written"] += 1
+                self.stats["failed"] += 1
+
+    def _collect(self, pending: Dict[Future, List[Dict[str, Any]]], sink):
+        done, _ = wait(list(pending), timeout=self.progress_every, return_when=FIRST_COMPLETED)
+        for future in done:
+            chunk = pending.pop(future)
+            try:
+                records = future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                log.error(f"❌ Chunk of {len(chunk)} rows failed: {type(e).__name__}: {e}")
+                records = [{self.key_field: row[self.key_field], "error": f"{type(e).__name__}: {e}"}
+                           for row in chunk]
+            self._write(chunk, records, sink)
+        self.stats["pending_chunks"] = len(pending)
+
+        if time.time() - self._last_progress >= self.progress_every:
+            self._last_progress = time.time()
+            log.info(f"📊 {self.progress()}")
+
+    def progress(self) -> str:
+        """One-line progress summary"""
+        elapsed = time.time() - self._start
+        done = self.stats["completed"] + self.stats["failed"]
+        rate = done / elapsed * 60 if elapsed > 0 else 0.0
+        return (f"{done}/{self.stats['submitted']} rows done ({self.stats['failed']} failed, "
+                f"{self.stats['skipped']} skipped, {self.stats['pending_chunks']} chunks in flight, "
+                f"{rate:.0f} rows/min, {elapsed:.0f}s elapsed)")
+
+    def run(self, rows: Iterable[Dict[str, Any]], sink, skip_keys: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """
+        Process every row and write the results to sink as chunks finish
+
+        Args:
+            rows: Input rows (any iterable; read lazily)
+            sink: Object with write(record), e.g. open_sink(path)
+            skip_keys: Keys not to process again (e.g. completed_keys() of the output)
+
+        Returns:
+            The stats counters
+        """
+        self._start = self._last_progress = time.time()
+        pending: Dict[Future, List[Dict[str, Any]]] = {}
+        rate_share = 1.0 / self.workers if self.share_rate_limits else 1.0
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.handler_factory, self.factory_kwargs, self.worker_log_level, rate_share),
+        )
+        log.info(f"🚀 Batch run: {self.workers} workers, {self.chunk_size} rows per chunk, "
+                 f"up to {self.max_pending_chunks} chunks in flight")
+
+        try:
+            for chunk in self._chunks(rows, skip_keys or set()):
+                if len(pending) >= self.max_pending_chunks:
+                    self.stats["backpressure_waits"] += 1
+                while len(pending) >= self.max_pending_chunks:
+                    self._collect(pending, sink)
+                pending[executor.submit(_run_chunk, chunk)] = chunk
+                self.stats["submitted"] += len(chunk)
+                self.stats["pending_chunks"] = len(pending)
+
+            while pending:
+                self._collect(pending, sink)
+        except BrokenProcessPool:
+            log.error("❌ A worker process died (see the error above) - re-run with resume to continue")
+            raise
+        except KeyboardInterrupt:
+            log.warning(f"⚠️ Interrupted with {len(pending)} chunks in flight - re-run with resume to continue")
+            raise
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=not pending, cancel_futures=True)
+
+        log.info(f"✅ Batch finished: {self.progress()}")
+        return dict(self.stats)
@@ -0,0 +1,453 @@
+"""
+Bright Data web scraping client returning ScrapedContentOutput models
+
+One scrape of a company page: served from the response cache when possible,
+otherwise a /trigger + poll + download (optionally packed with concurrent
+callers into one trigger), raced against the synchronous /scrape endpoint
+when hedging is turned on, and a plain HTTP GET as the last resort. Snapshots
+are recorded in the job store so a restarted process resumes them.
+
+Hedging is opt-in because it pays for a second request: a losing /trigger
+snapshot of its own is cancelled, but a losing coalesced trigger is shared
+with other callers, keeps running and is billed.
+"""
+
+import time
+from typing import List, Optional
+
+from scraping_core.hedging import HedgeAttempt, hedge, hedge_cancelled, on_cancel
+from scraping_core.http_client import http_get, http_post
+from scraping_core.models import ScrapedContentOutput
+from scraping_core.snapshot_adapter import get_snapshot_adapter
+from scraping_core.snapshot_poller import get_snapshot_poller
+from scraping_core.telemetry import estimate_cost, get_logger, get_tracer
+from scraping_core.trigger_coalescer import get_trigger_coalescer, url_key
+from scraping_core.webhook_receiver import webhook_trigger_params
+
+BRIGHTDATA_API_URL = "https://api.brightdata.com/datasets/v3"
+DEFAULT_WEB_DATASET_ID = "gd_m6gjtfmeh43we6cqc"
+
+log = get_logger("brightdata")
+
+
+def scrape_succeeded(output: Optional[ScrapedContentOutput]) -> bool:
+    """True for a scrape that returned page content"""
+    return output is not None and output.scrape_status.startswith("success") and bool(output.html_content)
+
+
+def simple_scrape(url: str) -> ScrapedContentOutput:
+    """Fallback scraping using requests"""
+    try:
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+        response = http_get(url, headers=headers, timeout=10, retries=1)
+
+        if response.status_code == 200:
+            return ScrapedContentOutput(
+                url=url,
+                html_content=response.text[:5000],  # Limit content size
+                scrape_status="success_fallback"
+            )
+        return ScrapedContentOutput(url=url, html_content="", scrape_status=f"failed_{response.status_code}")
+    except Exception as e:
+        return ScrapedContentOutput(url=url, html_content="", scrape_status=f"error_{str(e)}")
+
+
+class BrightDataClient:
+    def __init__(self,
+                 api_token: str,
+                 dataset_id: str = DEFAULT_WEB_DATASET_ID,
+                 cache=None,
+                 job_store=None,
+                 coalesce: bool = True,
+                 batch_window_seconds: float = 2.0,
+                 max_batch_size: int = 100,
+                 hedged: bool = False,
+                 hedge_delay: float = 10.0,
+                 max_attempts_per_scrape: int = 4,
+                 sync_timeout: int = 60,
+                 max_wait_minutes: int = 5):
+        """
+        Initialize a Bright Data scraping client
+
+        Args:
+            api_token: Your Bright Data API token
+            dataset_id: Web scraper dataset ID
+            cache: Optional ResponseCache; successful scrapes are cached under "brightdata"
+            job_store: Optional JobStore recording snapshots so they can be resumed
+            coalesce: Share one /trigger call with concurrent callers
+            batch_window_seconds: How long the coalescer collects URLs before triggering
+            max_batch_size: Trigger immediately once this many URLs are queued
+            hedged: Race the synchronous /scrape endpoint against the trigger path (off by default:
+                    every scrape slower than hedge_delay pays for a second request)
+            hedge_delay: Seconds after /scrape before the trigger path starts (0 = both at once)
+            max_attempts_per_scrape: Most Bright Data requests scrape_first keeps in flight for one
+                                     email (top-N URLs x 2 when each URL is hedged as well)
+            sync_timeout: Timeout of the synchronous /scrape request in seconds
+            max_wait_minutes: How long to wait for a triggered snapshot
+        """
+        self.api_token = api_token
+        self.dataset_id = dataset_id
+        self.cache = cache
+        self.job_store = job_store
+        self.coalesce = coalesce
+        self.batch_window_seconds = batch_window_seconds
+        self.max_batch_size = max_batch_size
+        self.hedged = hedged
+        self.hedge_delay = hedge_delay
+        self.max_attempts_per_scrape = max_attempts_per_scrape
+        self.sync_timeout = sync_timeout
+        self.max_wait_minutes = max_wait_minutes
+        self.headers = {
+            "Authorization": f"Bearer {api_token}",
+            "Content-Type": "application/json"
+        }
+
+    # ------------------------------------------------------------------ public API
+
+    def scrape(self, url: str, dataset_id: Optional[str] = None,
+               coalesce: Optional[bool] = None, hedged: Optional[bool] = None) -> ScrapedContentOutput:
+        """
+        Scrape a URL, reusing a cached scrape of the same URL/dataset
+
+        Only successful scrapes are cached, so failures are retried on the next run.
+        """
+        dataset_id = dataset_id or self.dataset_id
+        with get_tracer().span("brightdata.scrape", dataset_id=dataset_id, cache_hit=True) as span:
+            def scrape():
+                span.set(cache_hit=False)
+                return self.scrape_uncached(url, dataset_id, coalesce, hedged)
+
+            if self.cache is None:
+                output = scrape()
+            else:
+                output = self.cache.get_or_compute(
+                    "brightdata",
+                    [dataset_id, url_key({"url": url})],
+                    compute=scrape,
+                    encode=lambda output: output.model_dump(),
+                    decode=lambda cached: ScrapedContentOutput(**cached),
+                    should_cache=scrape_succeeded
+                )
+            span.set(scrape_status=output.scrape_status)
+            return output
+
+    def scrape_first(self, urls: List[str], dataset_id: Optional[str] = None) -> Optional[ScrapedContentOutput]:
+        """
+        Scrape several URLs in parallel and keep the first good page
+
+        At most max_attempts_per_scrape requests are in flight: the URL list is cut to
+        that many, and each URL is only hedged itself while two attempts per URL still fit.
+
+        Returns:
+            The winning scrape, else the first finished failure (None if every attempt raised)
+        """
+        urls = urls[:max(1, self.max_attempts_per_scrape)]
+        nested_hedge = self.hedged and 2 * len(urls) <= self.max_attempts_per_scrape
+        outcome = hedge(
+            [HedgeAttempt(url, lambda url=url: self.scrape(url, dataset_id, hedged=nested_hedge)) for url in urls],
+            is_good=scrape_succeeded,
+            label="top_n_urls"
+        )
+        if outcome['winner']:
+            log.info(f"🏆 Scraped {outcome['winner']} first of {len(urls)} candidate sites")
+        return outcome['result']
+
+    def scrape_uncached(self, url: str, dataset_id: Optional[str] = None, coalesce: Optional[bool] = None,
+                        hedged: Optional[bool] = None) -> ScrapedContentOutput:
+        """
+        Call Bright Data API with proper two-phase workflow:
+        Phase 1: Trigger scraping job
+        Phase 2: Poll and retrieve results
+
+        Args:
+            url: URL to scrape
+            dataset_id: Bright Data dataset ID (defaults to the client's)
+            coalesce: Share one /trigger call with concurrent callers (defaults to the client setting)
+            hedged: Race the synchronous /scrape endpoint against the trigger path (defaults to the client setting)
+        """
+        dataset_id = dataset_id or self.dataset_id
+        if self.hedged if hedged is None else hedged:
+            return self.scrape_hedged(url, dataset_id, coalesce)
+        if self.coalesce if coalesce is None else coalesce:
+            return self.scrape_coalesced(url, dataset_id)
+
+        log.info(f"\n🤖 Starting Bright Data scraping for: {url}")
+
+        # A snapshot for this URL may still be running (or ready) from before a restart
+        existing = None
+        if self.job_store is not None:
+            existing = self.job_store.find_snapshot(dataset_id, url_key({"url": url}), {'format': 'json'})
+        if existing is not None:
+            log.info(f"♻️ Resuming Bright Data snapshot {existing['snapshot_id']} ({existing['status']})")
+            return self.poll_and_retrieve(existing['snapshot_id'], url, dataset_id)
+
+        params = {
+            'dataset_id': dataset_id,
+            'format': 'json'
+        }
+        params.update(webhook_trigger_params())
+        payload = [{"url": url}]
+
+        try:
+            log.info("⏳ Phase 1: Triggering scraping job...")
+            with get_tracer().span("brightdata.trigger", dataset_id=dataset_id, inputs=len(payload)) as span:
+                response = http_post(f"{BRIGHTDATA_API_URL}/trigger", headers=self.headers, params=params,
+                                     json=payload, timeout=30)
+                span.set(status_code=response.status_code)
+
+            if not response.ok:
+                log.error(f"❌ Trigger failed: {response.status_code} - {response.text}")
+                return simple_scrape(url)
+
+            result = response.json()
+            if 'snapshot_id' not in result:
+                log.error(f"❌ No snapshot_id in response: {result}")
+                return simple_scrape(url)
+
+            snapshot_id = result['snapshot_id']
+            log.info(f"✅ Job triggered successfully! Snapshot ID: {snapshot_id}")
+            if self.job_store is not None:
+                self.job_store.record_trigger(snapshot_id, dataset_id, payload, [url_key({"url": url})],
+                                              {'format': 'json'})
+
+            # Phase 2: Poll and retrieve results
+            return self.poll_and_retrieve(snapshot_id, url, dataset_id)
+
+        except Exception as e:
+            log.error(f"❌ Bright Data API Error: {e}")
+            return simple_scrape(url)
+
+    def scrape_hedged(self, url: str, dataset_id: Optional[str] = None,
+                      coalesce: Optional[bool] = None) -> ScrapedContentOutput:
+        """
+        Race the synchronous /scrape endpoint against the /trigger + poll path
+
+        The trigger path starts hedge_delay seconds after the synchronous request
+        (at once if that request fails first). The first successful scrape wins;
+        the other path is cancelled. A losing trigger path that went through the
+        coalescer is only abandoned: its snapshot is shared with other callers, so
+        it keeps running and is billed.
+        """
+        dataset_id = dataset_id or self.dataset_id
+        log.info(f"\n🏁 Hedged Bright Data scraping for: {url}")
+        outcome = hedge(
+            [
+                HedgeAttempt("sync", lambda: self.scrape_sync(url, dataset_id)),
+                HedgeAttempt("async", lambda: self.scrape_uncached(url, dataset_id, coalesce, hedged=False),
+                             delay=self.hedge_delay),
+            ],
+            is_good=scrape_succeeded,
+            label="brightdata"
+        )
+
+        if outcome['winner']:
+            log.info(f"🏆 '{outcome['winner']}' scrape won after {outcome['waited']:.1f}s ({outcome['statuses']})")
+            return outcome['result']
+
+        log.warning(f"⚠️ Neither scrape path succeeded ({outcome['statuses']})")
+        return outcome['result'] or simple_scrape(url)
+
+    def scrape_sync(self, url: str, dataset_id: Optional[str] = None) -> ScrapedContentOutput:
+        """
+        Scrape a URL through Bright Data's synchronous /scrape endpoint
+
+        Bright Data answers with the records when the scrape finishes within its
+        limit, or with 202 + snapshot_id when it moved the job to the background.
+        """
+        dataset_id = dataset_id or self.dataset_id
+        params = {
+            'dataset_id': dataset_id,
+            'format': 'json'
+        }
+
+        log.info(f"⚡ Synchronous scrape: {url}")
+        with get_tracer().span("brightdata.sync_scrape", dataset_id=dataset_id) as span:
+            response = http_post(f"{BRIGHTDATA_API_URL}/scrape", headers=self.headers, params=params,
+                                 json=[{"url": url}], timeout=self.sync_timeout, retries=0)
+            span.set(status_code=response.status_code, bytes=len(response.content))
+
+            if not response.ok:
+                log.warning(f"⚠️ Synchronous scrape failed: {response.status_code} - {response.text[:200]}")
+                return ScrapedContentOutput(url=url, html_content="", scrape_status=f"failed_{response.status_code}")
+
+            data = response.json()
+            if response.status_code == 202 and isinstance(data, dict) and 'snapshot_id' in data:
+                log.info(f"⏳ Synchronous scrape moved to snapshot {data['snapshot_id']}")
+                if self.job_store is not None:
+                    self.job_store.record_trigger(data['snapshot_id'], dataset_id, [{"url": url}],
+                                                  [url_key({"url": url})], {'format': 'json'})
+                return self.poll_and_retrieve(data['snapshot_id'], url, dataset_id)
+
+            records = data if isinstance(data, list) else [data]
+            if not records:
+                return ScrapedContentOutput(url=url, html_content="", scrape_status="failed_empty")
+
+            span.set(records=len(records), cost_usd=estimate_cost("brightdata", records=len(records)))
+            log.info(f"✅ Synchronous scrape finished for {url}")
+            return ScrapedContentOutput(
+                url=url,
+                html_content=self.extract_html(records, dataset_id),
+                scrape_status="success"
+            )
+
+    def scrape_coalesced(self, url: str, dataset_id: Optional[str] = None) -> ScrapedContentOutput:
+        """
+        Scrape a URL through the shared TriggerCoalescer
+
+        Concurrent callers are packed into one /trigger call; this caller gets back
+        only the snapshot records whose input URL matches its own.
+        """
+        dataset_id = dataset_id or self.dataset_id
+        log.info(f"\n🤖 Queueing Bright Data scraping for: {url} (batched trigger)")
+
+        coalescer = get_trigger_coalescer(
+            self.api_token,
+            dataset_id,
+            trigger_params={'format': 'json'},
+            window_seconds=self.batch_window_seconds,
+            max_batch_size=self.max_batch_size,
+            max_wait=self.max_wait_minutes * 60,
+            job_store=self.job_store
+        )
+        outcome = coalescer.scrape({"url": url})
+        status = outcome['status']
+
+        if status == 'success' and outcome['records']:
+            log.info(f"✅ Batched scrape finished for {url} (snapshot {outcome['snapshot_id']})")
+            return ScrapedContentOutput(
+                url=url,
+                html_content=self.extract_html(outcome['records'], dataset_id),
+                scrape_status="success"
+            )
+
+        if status == 'failed':
+            log.error("❌ Scraping failed!")
+            return ScrapedContentOutput(url=url, html_content="", scrape_status="failed")
+
+        if status == 'timeout':
+            log.warning(f"⏰ Timeout after {self.max_wait_minutes} minutes")
+            return ScrapedContentOutput(url=url, html_content="",
+                                        scrape_status=f"timeout_after_{self.max_wait_minutes}min")
+
+        log.error(f"❌ Batched scrape returned '{status}', using fallback scraping")
+        return simple_scrape(url)
+
+    # ------------------------------------------------------------------ snapshots
+
+    def poll_and_retrieve(self, snapshot_id: str, original_url: str, dataset_id: Optional[str] = None,
+                          max_wait_minutes: Optional[int] = None) -> ScrapedContentOutput:
+        """
+        Wait for Bright Data results and retrieve when ready
+
+        The snapshot is registered with the shared SnapshotPoller, so many in-flight
+        jobs share one poll stream and we download as soon as the job is ready.
+        """
+        dataset_id = dataset_id or self.dataset_id
+        max_wait_minutes = max_wait_minutes or self.max_wait_minutes
+        log.info(f"⏳ Phase 2: Waiting for results via shared poller (max {max_wait_minutes} minutes)...")
+
+        poller = get_snapshot_poller(self.api_token)
+        completion = poller.track(snapshot_id, max_wait=max_wait_minutes * 60)
+
+        # Losing a hedged scrape stops this wait; the snapshot itself is only cancelled
+        # when no other caller (e.g. one that reused it via find_snapshot) still waits for it
+        def cancel_snapshot():
+            if poller.cancel(snapshot_id, completion):
+                self._update_snapshot(snapshot_id, 'cancelled')
+        on_cancel(cancel_snapshot)
+        if hedge_cancelled():
+            return ScrapedContentOutput(url=original_url, html_content="", scrape_status="cancelled")
+
+        outcome = poller.result(snapshot_id, completion, timeout=max_wait_minutes * 60)
+        current_status = outcome['status']
+
+        log.info(f"📊 Status: {current_status} after {outcome['polls']} polls ({outcome['waited']:.0f}s)")
+
+        # On a timeout the snapshot stays 'running' in the job store, so the next run resumes it
+        if current_status in ('ready', 'failed'):
+            self._update_snapshot(snapshot_id, current_status)
+
+        if current_status == 'ready':
+            log.info("✅ Scraping completed! Downloading results...")
+            scraped_content = self.download(snapshot_id, original_url, dataset_id)
+            self._update_snapshot(snapshot_id, 'collected')
+            return scraped_content
+
+        if current_status == 'failed':
+            log.error("❌ Scraping failed!")
+            return ScrapedContentOutput(url=original_url, html_content="", scrape_status="failed")
+
+        if current_status == 'cancelled':
+            log.info("🛑 Snapshot cancelled (another scrape won)")
+            return ScrapedContentOutput(url=original_url, html_content="", scrape_status="cancelled")
+
+        if current_status == 'timeout':
+            log.warning(f"⏰ Timeout after {max_wait_minutes} minutes")
+            return ScrapedContentOutput(url=original_url, html_content="",
+                                        scrape_status=f"timeout_after_{max_wait_minutes}min")
+
+        # If we get here, the status checks kept failing
+        log.error("❌ Polling failed, using fallback scraping")
+        return simple_scrape(original_url)
+
+    def download(self, snapshot_id: str, original_url: str,
+                 dataset_id: Optional[str] = None) -> ScrapedContentOutput:
+        """Download the actual scraped content from Bright Data"""
+        dataset_id = dataset_id or self.dataset_id
+        with get_tracer().span("brightdata.download", snapshot_id=snapshot_id, dataset_id=dataset_id) as span:
+            output = self._download(snapshot_id, original_url, dataset_id, span)
+            span.set(scrape_status=output.scrape_status)
+            if output.scrape_status.startswith("success"):
+                span.set(records=1, cost_usd=estimate_cost("brightdata", records=1))
+            return output
+
+    def _download(self, snapshot_id: str, original_url: str, dataset_id: str, span) -> ScrapedContentOutput:
+        # The first download of a dataset finds the working endpoint and payload shape; later ones go straight to it
+        adapter = get_snapshot_adapter(self.api_token, dataset_id)
+
+        try:
+            log.info(f"📥 Downloading snapshot {snapshot_id}")
+            # Stream-decode and stop after the first record - it is all we summarize
+            parse_start = time.time()
+            records = adapter.iter_records(snapshot_id, stats=span.attributes)
+            first_record = next(records, None)
+            records.close()
+            span.set(parse_seconds=round(time.time() - parse_start, 4))
+        except Exception as e:
+            log.error(f"❌ Download error: {e}")
+            return ScrapedContentOutput(url=original_url, html_content="", scrape_status="download_failed")
+
+        if first_record is None:
+            log.error("❌ Snapshot has no records")
+            return ScrapedContentOutput(url=original_url, html_content="", scrape_status="download_failed")
+
+        # Text / HTML answers come back as one record holding the whole body
+        text_body = adapter.format is not None and adapter.format.shape == "text"
+        html_content = self.extract_html([first_record], dataset_id)
+        log.info(f"✅ Download successful! ({span.attributes.get('bytes', 0)} bytes read)")
+
+        return ScrapedContentOutput(
+            url=original_url,
+            html_content=html_content,
+            scrape_status="success_text" if text_body else "success"
+        )
+
+    def extract_html(self, scraped_data, dataset_id: Optional[str] = None) -> str:
+        """
+        Extract HTML content from the first record of a Bright Data snapshot
+
+        Which field holds the page (html, page_html, content, ...) is looked up once
+        per dataset by the snapshot adapter and reused for every later record.
+        """
+        try:
+            record = scraped_data[0] if isinstance(scraped_data, list) and scraped_data else scraped_data
+            return get_snapshot_adapter(self.api_token, dataset_id or self.dataset_id).content_of(record)
+        except Exception as e:
+            log.warning(f"⚠️ Error extracting HTML: {e}")
+            return str(scraped_data)
+
+    def _update_snapshot(self, snapshot_id: str, status: str):
+        if self.job_store is not None:
+            self.job_store.update_snapshot(snapshot_id, status)
@@ -0,0 +1,274 @@
+"""
+Command-line batch runner for the scraping pipelines
+
+    python -m scraping_core.cli emails contacts.csv -o summaries.jsonl --workers 8
+    python -m scraping_core.cli people people.csv -o matches.jsonl --company-pattern ".*Acme.*"
+    python -m scraping_core.cli urls profile_urls.txt -o profiles.jsonl --resume
+
+Input is CSV (header row), JSONL or one value per line. API keys come from the
+SERPER_API_KEY, GOOGLE_API_KEY and BRIGHTDATA_API_TOKEN environment variables
+(or --api-token). Every worker process builds the pipeline behind the command
+once (emails and people straight from the scraping_core package, urls from the
+URL scraper notebook; `emails --engine notebook` runs the pipeline notebook)
+and processes chunks of rows with async I/O; results are appended to the
+output file as chunks finish. With --resume, rows already in the output
+without an error are skipped, so an interrupted job continues where it stopped.
+
+The SQLite response cache, job store and profile store are shared by all
+workers; the per-host HTTP rate limits are split evenly between them.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scraping_core.batch_runner import BatchRunner, completed_keys, open_sink, read_rows
+from scraping_core.notebooks import PIPELINE_NOTEBOOK, URL_SCRAPER_NOTEBOOK, load_notebook
+from scraping_core.telemetry import configure_logging, get_logger
+
+log = get_logger("cli")
+
+DEFAULT_DATASET_ID = "gd_l1viktl72bvl7bjuj0"
+
+# Per-command defaults: key column and rows per chunk (one pipeline batch / one Bright Data trigger)
+COMMAND_DEFAULTS = {
+    "emails": {"key": "email", "chunk_size": 50},
+    "people": {"key": "id", "chunk_size": 20},
+    "urls": {"key": "url", "chunk_size": 20},
+}
+
+
+# ---------------------------------------------------------------------------
+# Worker handlers (built once per worker process)
+# ---------------------------------------------------------------------------
+
+def email_handler(service_limits: Optional[Dict[str, int]] = None, full_results: bool = False,
+                  engine: str = "core") -> Callable:
+    """
+    Email -> company summary through the async batch engine
+
+    engine="core" runs scraping_core.EmailPipeline (no LangChain / google-generativeai
+    import, so workers start fast); engine="notebook" executes the pipeline notebook.
+    """
+    if engine == "core":
+        from scraping_core.email_pipeline import EmailPipeline
+        analyze_emails_batch = EmailPipeline.from_env().analyze_batch
+    else:
+        analyze_emails_batch = _notebook_email_batch()
+
+    async def handle(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results = []
+        async for result in analyze_emails_batch([row["email"] for row in rows], service_limits=service_limits):
+            if not full_results:
+                result = {key: value for key, value in result.items() if key != "full_results"}
+            results.append(result)
+        return results
+
+    return handle
+
+
+def _notebook_email_batch() -> Callable:
+    """analyze_emails_batch() from the pipeline notebook, using the API keys from the environment"""
+    def use_environment_keys(index: int, namespace: Dict[str, Any]):
+        # Cell 1 defines the (empty) API keys and configures Gemini with them
+        if index == 0:
+            for name in ("SERPER_API_KEY", "BRIGHTDATA_API_TOKEN", "GOOGLE_API_KEY"):
+                namespace[name] = os.environ.get(name) or namespace.get(name, "")
+            namespace["genai"].configure(api_key=namespace["GOOGLE_API_KEY"])
+
+    # The last cell is the single-email demo run
+    namespace = load_notebook(PIPELINE_NOTEBOOK, skip_cells=[-1], after_cell=use_environment_keys)
+    return namespace["analyze_emails_batch"]
+
+
+def people_handler(api_token: str, dataset_id: str, case_sensitive: bool = False, min_quality_score: int = 4,
+                   max_wait: int = 600, location: Optional[str] = None) -> Callable:
+    """Name -> matching LinkedIn profiles, one multi-target discovery trigger per chunk"""
+    from scraping_core.entity_resolution import get_entity_resolver
+    from scraping_core.job_store import get_job_store
+    from scraping_core.name_scraper import discover_linkedin_profiles_for_targets
+    from scraping_core.profile_store import get_profile_store
+
+    job_store = get_job_store()
+    profile_store = get_profile_store()
+    entity_resolver = get_entity_resolver()
+    additional_params = {"location": location} if location else None
+
+    def discover(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        targets = [{key: row[key] for key in ("id", "first_name", "last_name", "company_pattern", "location")
+                    if row.get(key)} for row in rows]
+        results = discover_linkedin_profiles_for_targets(
+            api_token, dataset_id, targets, additional_params,
+            case_sensitive=case_sensitive, min_quality_score=min_quality_score, max_wait=max_wait,
+            job_store=job_store, profile_store=profile_store, entity_resolver=entity_resolver
+        )
+        if results is None:
+            return [{"id": row["id"], "error": "Discovery job could not be started"} for row in rows]
+        return [{"id": row["id"], "matches": len(results.get(row["id"], [])), "profiles": results.get(row["id"], [])}
+                for row in rows]
+
+    async def handle(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(discover, rows)
+
+    return handle
+
+
+def url_handler(api_token: str, dataset_id: str, max_age_days: Optional[float] = None,
+                refresh: bool = False) -> Callable:
+    """Profile URL -> scraped LinkedIn profile, one Bright Data trigger per chunk (fresh stored profiles skip it)"""
+    namespace = load_notebook(URL_SCRAPER_NOTEBOOK)
+    scrape = namespace["scrape_linkedin_profiles_complete"]
+    record_url_key = namespace["record_url_key"]
+    profile_url_key = namespace["profile_url_key"]
+    if max_age_days is None:
+        max_age_days = namespace["PROFILE_MAX_AGE_DAYS"]
+
+    def scrape_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        profiles = scrape(api_token, dataset_id, [row["url"] for row in rows],
+                          max_age_days=max_age_days, refresh=refresh) or []
+        by_url = {}
+        for profile in profiles:
+            by_url.setdefault(record_url_key(profile), profile)
+
+        results = []
+        for row in rows:
+            profile = by_url.get(profile_url_key(row["url"]))
+            if profile is None:
+                results.append({"url": row["url"], "error": "No profile returned for this URL"})
+            else:
+                results.append({"url": row["url"], "profile": profile})
+        return results
+
+    async def handle(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(scrape_rows, rows)
+
+    return handle
+
+
+# ---------------------------------------------------------------------------
+# Input rows
+# ---------------------------------------------------------------------------
+
+def prepare_email(row: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    email = row.get(args.column or "email") or row.get("email_address") or row.get("value")
+    return dict(row, email=str(email).strip().lower()) if email else row
+
+
+def prepare_person(row: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    first, last = row.get("first_name"), row.get("last_name")
+    full_name = row.get("name") or row.get("full_name") or row.get("value")
+    if not (first and last) and full_name and " " in str(full_name).strip():
+        first, last = str(full_name).strip().split(" ", 1)
+    pattern = row.get("company_pattern") or args.company_pattern
+    if not (first and last and pattern):
+        return row
+
+    person = dict(row, first_name=first, last_name=last, company_pattern=pattern)
+    person["id"] = row.get("id") or f"{first} {last} @ {pattern}"
+    return person
+
+
+def prepare_url(row: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    url = row.get(args.column or "url") or row.get("profile_url") or row.get("linkedin_url") or row.get("value")
+    return dict(row, url=str(url).strip()) if url else row
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m scraping_core.cli", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name: str, help_text: str) -> argparse.ArgumentParser:
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("input", help="CSV, JSONL or one-value-per-line file ('-' for stdin)")
+        command.add_argument("-o", "--output", required=True, help="Output file (.jsonl, or .csv for flat columns)")
+        command.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+        command.add_argument("--chunk-size", type=int, default=COMMAND_DEFAULTS[name]["chunk_size"],
+                             help="Rows per worker task")
+        command.add_argument("--max-pending", type=int,
+                             help="Chunks queued or running before reading more input (default: 2 per worker)")
+        command.add_argument("--resume", action="store_true",
+                             help="Skip rows the output already has without an error")
+        command.add_argument("--progress-every", type=float, default=30.0, help="Seconds between progress lines")
+        command.add_argument("--log-level", default="INFO", help="Log level of this process")
+        command.add_argument("--worker-log-level", default="WARNING", help="Log level inside the workers")
+        return command
+
+    emails = add_command("emails", "Summarize the company behind each email address")
+    emails.add_argument("--column", help="Email column (default: email)")
+    emails.add_argument("--full-results", action="store_true", help="Keep every intermediate stage output")
+    emails.add_argument("--engine", choices=["core", "notebook"], default="core",
+                        help="core: LangChain-free scraping_core pipeline; notebook: run the pipeline notebook")
+
+    people = add_command("people", "Find LinkedIn profiles by name and company pattern")
+    people.add_argument("--company-pattern", help="Regex for rows without a company_pattern column")
+    people.add_argument("--location", help="Location sent with every discovery input")
+    people.add_argument("--case-sensitive", action="store_true", help="Case-sensitive company matching")
+    people.add_argument("--min-quality-score", type=int, default=4, help="Score that ends a target's wait early")
+    people.add_argument("--max-wait", type=int, default=600, help="Seconds to wait for each discovery snapshot")
+
+    urls = add_command("urls", "Scrape LinkedIn profiles by URL")
+    urls.add_argument("--column", help="URL column (default: url)")
+    urls.add_argument("--max-age-days", type=float, help="Reuse stored profiles younger than this")
+    urls.add_argument("--refresh", action="store_true", help="Scrape every URL, even fresh stored ones")
+
+    for command in (people, urls):
+        command.add_argument("--api-token", default=os.environ.get("BRIGHTDATA_API_TOKEN", ""),
+                             help="Bright Data API token (default: BRIGHTDATA_API_TOKEN)")
+        command.add_argument("--dataset-id", default=DEFAULT_DATASET_ID, help="Bright Data LinkedIn dataset ID")
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    configure_logging(args.log_level)
+
+    if args.command == "emails":
+        factory, kwargs, prepare = email_handler, {"full_results": args.full_results, "engine": args.engine}, prepare_email
+    elif args.command == "people":
+        factory, prepare = people_handler, prepare_person
+        kwargs = {"api_token": args.api_token, "dataset_id": args.dataset_id, "case_sensitive": args.case_sensitive,
+                  "min_quality_score": args.min_quality_score, "max_wait": args.max_wait,
+                  "location": args.location}
+    else:
+        factory, prepare = url_handler, prepare_url
+        kwargs = {"api_token": args.api_token, "dataset_id": args.dataset_id,
+                  "max_age_days": args.max_age_days, "refresh": args.refresh}
+
+    if args.command in ("people", "urls") and not args.api_token:
+        log.error("❌ Set BRIGHTDATA_API_TOKEN or pass --api-token")
+        return 2
+
+    key_field = COMMAND_DEFAULTS[args.command]["key"]
+    skip_keys = completed_keys(args.output, key_field) if args.resume else set()
+    if skip_keys:
+        log.info(f"♻️ Resuming: {len(skip_keys)} rows already in {args.output}")
+
+    runner = BatchRunner(factory, kwargs, key_field=key_field, workers=args.workers, chunk_size=args.chunk_size,
+                         max_pending_chunks=args.max_pending, progress_every=args.progress_every,
+                         worker_log_level=args.worker_log_level)
+    rows = (prepare(row, args) for row in read_rows(args.input))
+
+    try:
+        with open_sink(args.output) as sink:
+            stats = runner.run(rows, sink, skip_keys)
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        log.error(f"❌ Batch run failed: {type(e).__name__}: {e}")
+        return 1
+
+    if stats["invalid"]:
+        log.warning(f"⚠️ {stats['invalid']} rows had no {key_field} and were ignored")
+    log.info(f"💾 {stats['written']} records written to {args.output}")
+    return 1 if stats["failed"] and not stats["completed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
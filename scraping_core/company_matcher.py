@@ -0,0 +1,81 @@
+"""
+One compiled matcher for many per-target company patterns
+
+When hundreds of contacts are enriched at once, every (person, company pattern)
+pair used to get its own discovery run and its own scan of the snapshot.
+MultiPatternMatcher compiles all target patterns into a single regex made of
+optional named-group lookaheads, so one `match` call on a company name reports
+every target whose pattern occurs in it. Verdicts are cached per distinct
+company string, which repeat heavily across discovered profiles.
+"""
+
+import re
+from typing import Dict, FrozenSet, Optional
+
+# Backreferences are renumbered inside the combined regex, so such patterns are checked one by one
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+class MultiPatternMatcher:
+    def __init__(self, patterns: Dict[str, str], case_sensitive: bool = False):
+        """
+        Compile per-target company patterns into one matcher
+
+        Args:
+            patterns: Target id -> company regex
+            case_sensitive: Whether matching should be case sensitive
+
+        Raises:
+            re.error: One of the patterns is not a valid regex (the message names the target)
+        """
+        self.patterns = dict(patterns)
+        self.flags = 0 if case_sensitive else re.IGNORECASE
+        self._target_ids = list(self.patterns)
+        self._verdicts: Dict[str, FrozenSet[str]] = {}
+
+        self.compiled = {}
+        for target_id, pattern in self.patterns.items():
+            try:
+                self.compiled[target_id] = re.compile(pattern, self.flags)
+            except re.error as e:
+                raise re.error(f"target {target_id!r}: {e}", pattern) from e
+
+        self.combined = self._compile_combined()
+
+    def _compile_combined(self) -> Optional["re.Pattern"]:
+        if any(_BACKREFERENCE.search(pattern) for pattern in self.patterns.values()):
+            return None
+
+        # `(?=[\s\S]*?(?P<_tN>...))?` at position 0 behaves like pattern.search() for target N,
+        # and every optional lookahead is tried, so all satisfied targets are reported at once
+        parts = [
+            rf"(?:(?=[\s\S]*?(?P<_t{index}>{pattern})))?"
+            for index, pattern in enumerate(self.patterns.values())
+        ]
+        try:
+            return re.compile("".join(parts), self.flags)
+        except (re.error, OverflowError, RecursionError):
+            return None
+
+    def targets_for(self, text: str) -> FrozenSet[str]:
+        """Ids of every target whose pattern is found in text"""
+        verdict = self._verdicts.get(text)
+        if verdict is not None:
+            return verdict
+
+        if self.combined is not None:
+            match = self.combined.match(text)
+            verdict = frozenset(
+                target_id for index, target_id in enumerate(self._target_ids)
+                if match.group(f"_t{index}") is not None
+            )
+        else:
+            verdict = frozenset(
+                target_id for target_id, pattern in self.compiled.items() if pattern.search(text)
+            )
+
+        self._verdicts[text] = verdict
+        return verdict
+
+    def __len__(self) -> int:
+        return len(self.patterns)
@@ -0,0 +1,520 @@
+"""
+LangChain-free email -> company summary pipeline
+
+The notebook builds the pipeline from LangChain chains, which means importing
+langchain and google-generativeai before the first email is touched. The
+pipeline is a fixed sequence (domain -> search query -> Serper -> URL
+selection -> Bright Data scrape -> summary), so EmailPipeline runs the same
+stages, prompts and parsers directly on top of SerperClient, GeminiClient and
+BrightDataClient. Results have the same shape as the notebook's
+analyze_email_domain(), and both paths share the response cache and job store.
+
+    pipeline = EmailPipeline.from_env()
+    result = pipeline.analyze("contact@company.com")
+    async for result in pipeline.analyze_batch(emails): ...
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+from scraping_core.batch_engine import AsyncBatchEngine, Stage
+from scraping_core.brightdata_client import BrightDataClient
+from scraping_core.gemini_client import GeminiClient, get_gemini_client
+from scraping_core.html_extract import extract_page_text
+from scraping_core.models import (DomainOutput, FinalSummaryOutput, ScrapedContentOutput, SearchQueryOutput,
+                                  SearchResultsOutput, URLSelectionOutput)
+from scraping_core.response_cache import DAY, get_response_cache
+from scraping_core.serper_client import SerperClient
+from scraping_core.single_flight import SingleFlight
+from scraping_core.structured_batch import StructuredBatcher
+from scraping_core.telemetry import get_logger, get_tracer, run_context
+from scraping_core.url_ranker import candidate_sites, select_url, site_root
+
+log = get_logger("pipeline")
+
+# Prompt templates (str.format syntax, same text as the notebook's PromptTemplates)
+SEARCH_QUERY_PROMPT = """
+You are tasked with creating an optimal search query to find the official website for a company domain.
+
+Domain: {domain}
+
+Create a search query that will help find the official company website. Consider:
+- The domain name itself
+- Adding terms like "official website" if helpful
+- Avoiding overly complex queries
+
+Return your response in this exact JSON format:
+{{
+    "search_query": "your optimized search query here",
+    "domain": "{domain}"
+}}
+"""
+
+URL_SELECTION_PROMPT = """
+You are an expert at identifying official company websites from search results.
+
+Search Results:
+{search_results}
+
+Analyze these search results and select the BEST URL that represents the official company website. Consider:
+- Official company domains vs third-party sites
+- Homepage vs subpages
+- Credibility and authority of the source
+- Relevance to the original domain
+
+Return your response in this exact JSON format:
+{{
+    "selected_url": "the best URL from the results",
+    "reasoning": "brief explanation of why you chose this URL",
+    "confidence_score": 0.95
+}}
+"""
+
+SUMMARY_PROMPT = """
+You are tasked with creating a concise, one-line summary of a website based on its scraped content.
+
+Website URL: {url}
+Domain: {domain}
+Scraped Content: {scraped_content}
+
+Create a single, clear sentence that describes what this website/company does. Focus on:
+- Main business purpose or service
+- Industry or sector
+- Key value proposition
+
+Return your response in this exact JSON format:
+{{
+    "summary": "One clear sentence describing what this company/website does",
+    "url": "{url}",
+    "domain": "{domain}"
+}}
+"""
+
+# Concurrency limit per upstream service for analyze_batch()
+EMAIL_SERVICE_LIMITS = {
+    "serper": 50,       # Serper searches in flight (batched ones share requests)
+    "gemini": 8,        # Gemini calls in flight (query, URL selection, summary)
+    "brightdata": 20,   # Bright Data scrape jobs being triggered/polled
+}
+
+DOMAIN_RESULT_FIELDS = ['domain', 'selected_url', 'summary', 'confidence', 'reasoning',
+                        'scrape_status', 'content_length', 'processing_time', 'timestamp']
+
+
+# ---------------------------------------------------------------------------
+# Stage helpers shared with the notebook chains
+# ---------------------------------------------------------------------------
+
+def extract_domain_from_email(email: str) -> DomainOutput:
+    """Extract domain from email address"""
+    with get_tracer().span("domain_extraction"):
+        domain_match = re.search(r'@([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', str(email))
+        if domain_match:
+            return DomainOutput(domain=domain_match.group(1), original_email=email)
+        return DomainOutput(domain="invalid", original_email=email)
+
+
+def format_search_results_for_prompt(search_results_output: SearchResultsOutput) -> str:
+    results_text = ""
+    for i, result in enumerate(search_results_output.results, 1):
+        results_text += f"{i}. Title: {result.title}\n"
+        results_text += f"   URL: {result.url}\n"
+        results_text += f"   Snippet: {result.snippet}\n\n"
+
+    # Google's knowledge panel often names the official website directly
+    knowledge_graph = search_results_output.knowledge_graph
+    if knowledge_graph.get('website'):
+        results_text += f"Knowledge Graph: {knowledge_graph.get('title', '')} - {knowledge_graph['website']}\n"
+    return results_text
+
+
+def _json_field(text: str, field: str) -> Optional[str]:
+    match = re.search(r'"%s":\s*"([^"]+)"' % field, text)
+    return match.group(1) if match else None
+
+
+def parse_domain_output(text: str) -> DomainOutput:
+    try:
+        return DomainOutput(**json.loads(text))
+    except Exception:
+        # Fallback parsing
+        return DomainOutput(domain=_json_field(text, "domain") or "unknown",
+                            original_email=_json_field(text, "original_email") or "unknown")
+
+
+def parse_search_query(text: str) -> SearchQueryOutput:
+    try:
+        return SearchQueryOutput(**json.loads(text))
+    except Exception:
+        # Fallback parsing
+        return SearchQueryOutput(search_query=_json_field(text, "search_query") or text.strip(),
+                                 domain=_json_field(text, "domain") or "unknown")
+
+
+def parse_url_selection(text: str) -> URLSelectionOutput:
+    try:
+        return URLSelectionOutput(**json.loads(text))
+    except Exception:
+        # Fallback parsing
+        confidence_match = re.search(r'"confidence_score":\s*([0-9.]+)', text)
+        return URLSelectionOutput(
+            selected_url=_json_field(text, "selected_url") or "unknown",
+            reasoning=_json_field(text, "reasoning") or "No reasoning provided",
+            confidence_score=float(confidence_match.group(1)) if confidence_match else 0.5
+        )
+
+
+def parse_final_summary(text: str) -> FinalSummaryOutput:
+    try:
+        parsed = json.loads(text)
+        # The timestamp is not part of the prompt so cached summaries can be reused
+        parsed.setdefault('timestamp', datetime.now().isoformat())
+        return FinalSummaryOutput(**parsed)
+    except Exception:
+        # Fallback parsing - just use the text as summary
+        return FinalSummaryOutput(summary=text.strip(), url="unknown", domain="unknown",
+                                  timestamp=datetime.now().isoformat())
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+class EmailPipeline:
+    def __init__(self,
+                 serper: SerperClient,
+                 gemini: GeminiClient,
+                 brightdata: BrightDataClient,
+                 cache=None,
+                 batched_gemini: bool = True,
+                 gemini_batch_window_seconds: float = 0.5,
+                 gemini_max_batch_size: int = 10,
+                 url_fast_path_min_confidence: Optional[float] = 0.75,
+                 summary_token_budget: int = 800,
+                 top_n_urls: int = 1,
+                 domain_memo: bool = True,
+                 domain_result_ttl: int = 7 * DAY):
+        """
+        Initialize the pipeline
+
+        Args:
+            serper: Client for the search stage
+            gemini: Client for the search query, URL selection and summary stages
+            brightdata: Client for the scrape stage
+            cache: Optional ResponseCache (batched Gemini answers, per-domain results)
+            batched_gemini: Share one JSON-schema Gemini request per stage between concurrent emails
+            gemini_batch_window_seconds: How long to collect prompts before sending a batch
+            gemini_max_batch_size: Send immediately once this many prompts are queued
+            url_fast_path_min_confidence: Local ranker confidence that skips Gemini URL selection
+                                          (None always asks Gemini)
+            summary_token_budget: Approximate tokens of page text sent to the summary prompt
+            top_n_urls: > 1 also scrapes the next best ranked sites in parallel
+            domain_memo: Emails at the same domain share one run (needs a cache to reuse stored results)
+            domain_result_ttl: How long a domain's stored result is reused (seconds)
+        """
+        self.serper = serper
+        self.gemini = gemini
+        self.brightdata = brightdata
+        self.cache = cache
+        self.url_fast_path_min_confidence = url_fast_path_min_confidence
+        self.summary_token_budget = summary_token_budget
+        self.top_n_urls = top_n_urls
+        self.domain_memo = domain_memo
+        self.domain_result_ttl = domain_result_ttl
+        self._domain_runs = SingleFlight()
+
+        self._batchers: Dict[str, StructuredBatcher] = {}
+        if batched_gemini:
+            def batcher(output_model, **kwargs) -> StructuredBatcher:
+                return StructuredBatcher(
+                    generate_json=gemini.generate_json,
+                    output_model=output_model,
+                    window_seconds=gemini_batch_window_seconds,
+                    max_batch_size=gemini_max_batch_size,
+                    cache=cache,
+                    cache_key_prefix=[gemini.model_name, gemini.temperature],
+                    **kwargs
+                )
+            self._batchers = {
+                "search_query": batcher(SearchQueryOutput),
+                "url_selection": batcher(URLSelectionOutput),
+                "summary": batcher(FinalSummaryOutput, exclude_fields=("timestamp",),
+                                   defaults=lambda: {"timestamp": datetime.now().isoformat()}),
+            }
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "EmailPipeline":
+        """
+        Pipeline with keys from SERPER_API_KEY, GOOGLE_API_KEY and BRIGHTDATA_API_TOKEN
+
+        The response cache and job store are the shared default files
+        (SCRAPING_CACHE_PATH / SCRAPING_JOBS_PATH). Keyword arguments override
+        EmailPipeline settings.
+        """
+        from scraping_core.job_store import get_job_store
+
+        cache = get_response_cache()
+        serper = SerperClient(os.environ.get("SERPER_API_KEY", ""), cache=cache)
+        gemini = get_gemini_client(os.environ.get("GOOGLE_API_KEY", ""), cache=cache)
+        brightdata = BrightDataClient(os.environ.get("BRIGHTDATA_API_TOKEN", ""), cache=cache,
+                                      job_store=get_job_store())
+        return cls(serper, gemini, brightdata, cache=cache, **kwargs)
+
+    # ------------------------------------------------------------------ stages
+
+    def _ask(self, stage: str, prompt: str, parse: Callable[[str], Any]) -> Any:
+        batcher = self._batchers.get(stage)
+        if batcher is not None:
+            result = batcher.run(prompt)
+            if result is not None:
+                return result
+        # Batch failed or this answer was invalid - ask for this prompt on its own
+        return parse(self.gemini.generate(prompt))
+
+    def extract_domain(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        result = extract_domain_from_email(state['email'])
+        return {'domain_output': result, 'domain': result.domain}
+
+    def build_search_query(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        prompt = SEARCH_QUERY_PROMPT.format(domain=state['domain'])
+        return {'search_query_output': self._ask("search_query", prompt, parse_search_query)}
+
+    def search(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        return {'search_results_output': self.serper.search(state['search_query_output'].search_query)}
+
+    def select_url(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        search_results_output = state['search_results_output']
+        if self.url_fast_path_min_confidence is not None:
+            # The local ranker answers obvious cases without Gemini
+            selection = select_url(state['domain'], search_results_output.results)
+            if selection and selection['confidence_score'] >= self.url_fast_path_min_confidence:
+                log.info(f"⚡ Fast-path URL selection: {selection['selected_url']} "
+                         f"(confidence {selection['confidence_score']:.2f}, Gemini skipped)")
+                return {'url_selection_output': URLSelectionOutput(**selection)}
+
+        prompt = URL_SELECTION_PROMPT.format(search_results=format_search_results_for_prompt(search_results_output))
+        return {'url_selection_output': self._ask("url_selection", prompt, parse_url_selection)}
+
+    def scrape(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        root_url = site_root(state['url_selection_output'].selected_url)
+
+        # Optionally scrape the next best ranked sites too; the first good page wins
+        if self.top_n_urls > 1:
+            candidates = candidate_sites(state['domain'], state['search_results_output'].results,
+                                         limit=self.top_n_urls, preferred=root_url)
+            if len(candidates) > 1:
+                scraped_content = self.brightdata.scrape_first(candidates)
+                if scraped_content is not None:
+                    return {'scraped_content_output': scraped_content}
+
+        return {'scraped_content_output': self.brightdata.scrape(root_url)}
+
+    def summarize(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        scraped_output: ScrapedContentOutput = state['scraped_content_output']
+
+        # Strip markup / boilerplate and keep the page text within the token budget
+        with get_tracer().span("html_extract", bytes=len(scraped_output.html_content)) as span:
+            content = extract_page_text(scraped_output.html_content, token_budget=self.summary_token_budget)
+            span.set(text_chars=len(content))
+
+        prompt = SUMMARY_PROMPT.format(url=state['url_selection_output'].selected_url, domain=state['domain'],
+                                       scraped_content=content)
+        return {'final_summary': self._ask("summary", prompt, parse_final_summary)}
+
+    def stages(self) -> List[Stage]:
+        """The pipeline as batch engine stages, in order"""
+        return [
+            Stage("domain_extraction", self.extract_domain),
+            Stage("search_query", self.build_search_query, service="gemini"),
+            Stage("serper_search", self.search, service="serper"),
+            Stage("url_selection", self.select_url, service="gemini"),
+            Stage("content_scraping", self.scrape, service="brightdata"),
+            Stage("summary", self.summarize, service="gemini"),
+        ]
+
+    # ------------------------------------------------------------------ running
+
+    def run(self, email: str) -> Dict[str, Any]:
+        """
+        Run every stage for one email (no memoization)
+
+        Returns:
+            dict: Same structure as analyze(), with the full state under 'full_results'
+        """
+        start_time = time.time()
+        state = {'email': email}
+        with run_context(email), get_tracer().span("email_pipeline") as span:
+            for stage in self.stages():
+                try:
+                    with get_tracer().span(f"stage.{stage.name}", service=stage.service):
+                        state.update(stage.func(state) or {})
+                except Exception as e:
+                    log.exception(f"❌ Error during analysis: {str(e)}")
+                    span.set(error=str(e))
+                    return self.format_result(email, state, time.time() - start_time, str(e), stage.name)
+
+        return self.format_result(email, state, time.time() - start_time)
+
+    @staticmethod
+    def format_result(email: str, state: Dict[str, Any], processing_time: Optional[float],
+                      error: Optional[str] = None, failed_stage: Optional[str] = None) -> Dict[str, Any]:
+        """Flatten a pipeline state into the analyze_email_domain() result dict"""
+        if error:
+            return {
+                'email': email,
+                'error': error,
+                'failed_stage': failed_stage,
+                'timestamp': datetime.now().isoformat()
+            }
+
+        final_summary = state['final_summary']
+        url_selection = state['url_selection_output']
+        scraped_content = state['scraped_content_output']
+        return {
+            'email': email,
+            'domain': state['domain'],
+            'selected_url': url_selection.selected_url,
+            'summary': final_summary.summary,
+            'confidence': url_selection.confidence_score,
+            'reasoning': url_selection.reasoning,
+            'scrape_status': scraped_content.scrape_status,
+            'content_length': len(scraped_content.html_content),
+            'processing_time': processing_time,
+            'timestamp': final_summary.timestamp,
+            'full_results': state
+        }
+
+    def memo_domain(self, email: str, use_memo: Optional[bool] = None) -> Optional[str]:
+        """Domain key for memoization (None without memoization or a usable domain)"""
+        if not (self.domain_memo if use_memo is None else use_memo):
+            return None
+        domain = extract_domain_from_email(email).domain
+        return None if domain in ('invalid', 'error') else domain.lower()
+
+    def stored_result(self, domain: str) -> Optional[Dict[str, Any]]:
+        """Stored analysis for a domain, if one has not expired yet"""
+        return self.cache.get("domain_pipeline", [domain]) if self.cache is not None else None
+
+    def store_result(self, domain: str, result: Dict[str, Any]):
+        """Keep a successful analysis so later contacts at the same domain reuse it"""
+        if self.cache is not None and not result.get('error'):
+            self.cache.set("domain_pipeline", [domain],
+                           {field: result.get(field) for field in DOMAIN_RESULT_FIELDS},
+                           ttl=self.domain_result_ttl)
+
+    @staticmethod
+    def result_for_email(result: Dict[str, Any], email: str, memoized: str) -> Dict[str, Any]:
+        """Re-label a domain's result for another email ('stored' or 'in_flight' reuse)"""
+        return dict(result, email=email, memoized=memoized, full_results=result.get('full_results'))
+
+    def analyze(self, email: str, use_memo: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Analyze one email; emails at the same domain share one run
+
+        Args:
+            email: Email address (e.g., "name@company.com")
+            use_memo: Reuse stored / in-flight domain results (defaults to domain_memo)
+
+        Returns:
+            dict: Same structure as the notebook's analyze_email_domain()
+        """
+        domain = self.memo_domain(email, use_memo)
+        if domain is None:
+            return self.run(email)
+
+        stored = self.stored_result(domain)
+        if stored is not None:
+            log.info(f"♻️ Reusing stored analysis for {domain} ({email})")
+            return self.result_for_email(stored, email, 'stored')
+
+        result, shared = self._domain_runs.do(domain, lambda: self.run(email))
+        if shared:
+            log.info(f"♻️ {email} shared the in-flight analysis for {domain}")
+            return self.result_for_email(result, email, 'in_flight')
+        self.store_result(domain, result)
+        return result
+
+    async def analyze_batch(self, emails: Iterable[str], service_limits: Optional[Dict[str, int]] = None,
+                            max_in_flight: int = 200,
+                            use_memo: Optional[bool] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analyze many emails concurrently, yielding each result as soon as it is done
+
+        Only the first email of each domain enters the engine; the other emails at
+        that domain get its result (or the stored one) as well.
+
+        Args:
+            emails: Any iterable of email addresses
+            service_limits: Optional overrides for EMAIL_SERVICE_LIMITS
+            max_in_flight: Maximum number of emails being processed at the same time
+            use_memo: Share results per domain (defaults to domain_memo)
+        """
+        limits = dict(EMAIL_SERVICE_LIMITS)
+        if service_limits:
+            limits.update(service_limits)
+        engine = AsyncBatchEngine(self.stages(), service_limits=limits, max_in_flight=max_in_flight,
+                                  input_key="email")
+        start_time = time.time()
+
+        waiting: Dict[str, List[str]] = {}   # domain -> other emails waiting for its in-flight run
+        # Stored results and engine results are merged here as soon as they exist; the
+        # bound holds back both the input walk and the engine while the caller is busy
+        results: asyncio.Queue = asyncio.Queue(maxsize=max_in_flight)
+        finished = object()
+
+        async def engine_inputs():
+            for email in emails:
+                domain = self.memo_domain(email, use_memo)
+                if domain is None:
+                    yield email
+                    continue
+
+                stored = self.stored_result(domain)
+                if stored is not None:
+                    await results.put(self.result_for_email(stored, email, 'stored'))
+                elif domain in waiting:
+                    waiting[domain].append(email)
+                else:
+                    waiting[domain] = []
+                    yield email
+
+        async def run_engine():
+            try:
+                async for outcome in engine.run(engine_inputs()):
+                    result = self.format_result(outcome['input'], outcome['state'], outcome['processing_time'],
+                                                outcome['error'], outcome['failed_stage'])
+                    stats = engine.stats
+                    progress = (f"{result['email']} done ({stats['completed']} ok, {stats['failed']} failed, "
+                                f"{stats['in_flight']} in flight, {time.time() - start_time:.0f}s elapsed)")
+                    if result.get('error'):
+                        log.error(f"❌ {progress}")
+                    else:
+                        log.info(f"✅ {progress}")
+                    await results.put(result)
+
+                    domain = self.memo_domain(result['email'], use_memo)
+                    if domain is not None:
+                        self.store_result(domain, result)
+                        for email in waiting.pop(domain, []):
+                            await results.put(self.result_for_email(result, email, 'in_flight'))
+            except Exception as e:
+                await results.put(e)
+                return
+            await results.put(finished)
+
+        producer = asyncio.ensure_future(run_engine())
+        try:
+            while True:
+                item = await results.get()
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            producer.cancel()
@@ -0,0 +1,599 @@
+"""
+Incremental entity resolution for discovered LinkedIn profiles
+
+Name discovery returns the same person many times - across runs, across
+queries, and as both a "skeleton" record (name + URL) and a full one. The
+EntityResolver groups those records into one entity per person and keeps a
+canonical record for it, persisted in SQLite (next to the profile store by
+default) so every run resolves against everything seen before.
+
+A new profile is only compared with entities sharing one of its blocking keys,
+never with the whole corpus:
+
+- the normalized profile URL (same URL = same person)
+- normalized first / last name + current company
+- normalized first / last name (confirmed by company, text similarity, or
+  being the only candidate when one side is a skeleton record)
+- MinHash / LSH band keys over the headline, about and experience text
+
+Blocks larger than max_block_candidates (very common names, boilerplate text)
+are capped, so each profile costs a bounded number of indexed lookups and
+comparisons and a resolve pass over n profiles stays O(n). Merged entities
+keep, for every field, the value from the highest-_quality_score record that
+has it; the entity's MinHash signature is the element-wise minimum of its
+members' signatures (the signature of the union of their text).
+
+    resolver = get_entity_resolver()
+    people = resolver.resolve(profiles)          # one canonical record per person
+    resolver.resolve(get_profile_store().iter_profiles())   # backfill the store
+"""
+
+import functools
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from scraping_core.profile_scoring import (PLACEHOLDER_VALUES, current_company_name, profile_key,
+                                           quality_features, score_feature_rows)
+from scraping_core.profile_store import DEFAULT_PROFILES_PATH, name_tokens, profile_url_key
+from scraping_core.response_cache import connect_sqlite, normalize_text
+from scraping_core.telemetry import get_logger
+
+log = get_logger("entities")
+
+# MinHash / LSH shape: 16 bands of 4 rows flag pairs from ~0.5 estimated Jaccard similarity
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+DEFAULT_SIMILARITY_THRESHOLD = 0.5
+DEFAULT_MAX_BLOCK_CANDIDATES = 50
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Text a profile is compared on (the headline / position, about section and experience entries)
+TEXT_FIELDS = ("headline", "position", "about")
+EXPERIENCE_FIELDS = ("title", "company", "description")
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    # Imported on first use; signatures are identical with or without it, only slower without
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def person_name(profile: Dict[str, Any]) -> str:
+    """Display name of a profile ("name", else "first_name last_name")"""
+    name = profile.get("name") or " ".join(
+        part for part in (profile.get("first_name"), profile.get("last_name")) if part)
+    return name if isinstance(name, str) else ""
+
+
+def profile_text(profile: Dict[str, Any]) -> str:
+    """Headline, about and experience text of a profile, as one string"""
+    parts = [profile.get(field) for field in TEXT_FIELDS]
+    experience = profile.get("experience")
+    if isinstance(experience, list):
+        for entry in experience:
+            if isinstance(entry, dict):
+                parts.extend(entry.get(field) for field in EXPERIENCE_FIELDS)
+    return " ".join(part for part in parts if isinstance(part, str) and part.strip())
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """Word n-grams of a text (single words for texts shorter than one n-gram)"""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return set(words)
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1):
+        """
+        MinHash signatures from a fixed family of (a * x + b) mod p permutations
+
+        Args:
+            num_perm: Signature length
+            seed: Seed of the permutation coefficients (must stay the same for a stored index)
+        """
+        generator = random.Random(seed)
+        self.num_perm = num_perm
+        self.coefficients = [(generator.randrange(1, _MERSENNE_PRIME), generator.randrange(0, _MERSENNE_PRIME))
+                             for _ in range(num_perm)]
+        self._vectors = None
+
+    def signature(self, items: Iterable[str]) -> Optional[List[int]]:
+        """MinHash signature of a set of strings (None for an empty set)"""
+        hashes = [zlib.crc32(item.encode("utf-8")) for item in set(items)]
+        if not hashes:
+            return None
+
+        np = _numpy()
+        if np is not None:
+            # a < 2**31 and a hash < 2**32, so a * hash + b fits in uint64 without overflow
+            if self._vectors is None:
+                self._vectors = (np.array([a for a, _ in self.coefficients], dtype=np.uint64)[:, None],
+                                 np.array([b for _, b in self.coefficients], dtype=np.uint64)[:, None])
+            a, b = self._vectors
+            values = np.asarray(hashes, dtype=np.uint64)[None, :]
+            return ((a * values + b) % np.uint64(_MERSENNE_PRIME)).min(axis=1).tolist()
+
+        return [min((a * value + b) % _MERSENNE_PRIME for value in hashes) for a, b in self.coefficients]
+
+
+def estimated_similarity(left: Sequence[int], right: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of the sets behind two MinHash signatures"""
+    return sum(1 for a, b in zip(left, right) if a == b) / len(left)
+
+
+def lsh_keys(signature: Sequence[int], bands: int) -> List[str]:
+    """One blocking key per LSH band of a signature"""
+    rows = len(signature) // bands
+    keys = []
+    for band in range(bands):
+        chunk = array("I", signature[band * rows:(band + 1) * rows]).tobytes()
+        keys.append(f"lsh:{band}:{hashlib.blake2b(chunk, digest_size=8).hexdigest()}")
+    return keys
+
+
+def has_value(value: Any) -> bool:
+    """False for missing / empty / placeholder field values"""
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return value.strip().lower() not in PLACEHOLDER_VALUES
+    if isinstance(value, (list, dict)):
+        return bool(value)
+    return True
+
+
+def merge_fields(record: Dict[str, Any], field_scores: Dict[str, int],
+                 profile: Dict[str, Any], score: int) -> bool:
+    """
+    Merge a profile into a canonical record, field by field
+
+    A field takes the profile's value when the record has none yet or the
+    profile scores at least as high as the record the current value came from.
+
+    Returns:
+        True when any field changed
+    """
+    changed = False
+    for field, value in profile.items():
+        if field.startswith("_") or not has_value(value):
+            continue
+        if field not in record or score >= field_scores.get(field, -1):
+            if record.get(field) != value:
+                record[field] = value
+                changed = True
+            field_scores[field] = score
+    return changed
+
+
+class _Entity:
+    # One row of the entities table while it is being resolved against
+    __slots__ = ("entity_id", "first_key", "last_key", "company_key", "url_key", "signature", "quality_score",
+                 "members", "field_scores", "record", "dirty")
+
+    def __init__(self, entity_id: str):
+        self.entity_id = entity_id
+        self.first_key = ""
+        self.last_key = ""
+        self.company_key = ""
+        self.url_key = None
+        self.signature: Optional[List[int]] = None
+        self.quality_score = 0
+        self.members = 0
+        self.field_scores: Dict[str, int] = {}
+        self.record: Dict[str, Any] = {}
+        self.dirty = False
+
+    @property
+    def skeleton(self) -> bool:
+        return not self.company_key and self.signature is None
+
+
+class EntityResolver:
+    def __init__(self,
+                 path: str = DEFAULT_PROFILES_PATH,
+                 num_perm: int = DEFAULT_NUM_PERM,
+                 bands: int = DEFAULT_BANDS,
+                 similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+                 max_block_candidates: int = DEFAULT_MAX_BLOCK_CANDIDATES):
+        """
+        Open (or create) the entity index
+
+        Args:
+            path: SQLite file path (the profile store's file by default; ":memory:" for one run only)
+            num_perm: MinHash signature length (fixed once the index has entities)
+            bands: LSH bands (num_perm must be a multiple of it)
+            similarity_threshold: Estimated text similarity that confirms a same-name candidate
+            max_block_candidates: Entities read per blocking key (larger blocks are capped)
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.path = path
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.similarity_threshold = similarity_threshold
+        self.max_block_candidates = max_block_candidates
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(path)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entities (
+                entity_id TEXT PRIMARY KEY,
+                first_key TEXT,
+                last_key TEXT,
+                company_key TEXT,
+                url_key TEXT,
+                signature BLOB,
+                quality_score INTEGER,
+                members INTEGER NOT NULL,
+                field_scores TEXT NOT NULL,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entity_members (
+                profile_id TEXT PRIMARY KEY,
+                entity_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entity_members_entity ON entity_members (entity_id);
+            CREATE TABLE IF NOT EXISTS entity_blocks (
+                block_key TEXT NOT NULL,
+                entity_id TEXT NOT NULL,
+                PRIMARY KEY (block_key, entity_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_entity_blocks_entity ON entity_blocks (entity_id);
+        """)
+        self._conn.commit()
+        self.counters = {"resolved": 0, "new_entities": 0, "merged": 0, "entity_merges": 0,
+                         "candidates_compared": 0, "blocks_capped": 0}
+
+    # ------------------------------------------------------------------ features
+
+    def _features(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        _, first, last = name_tokens(person_name(profile))
+        company = current_company_name(profile).strip()
+        company_key = normalize_text(company) if has_value(company) else ""
+        return {
+            "profile_id": profile_key(profile),
+            "first_key": first,
+            "last_key": last,
+            "company_key": company_key,
+            "url_key": profile_url_key(profile.get("url") or profile.get("input_url")),
+            "signature": self.hasher.signature(shingles(profile_text(profile))),
+        }
+
+    def _block_keys(self, first_key: str, last_key: str, company_key: str, url_key: Optional[str],
+                    signature: Optional[List[int]]) -> List[str]:
+        keys = []
+        if url_key:
+            keys.append(f"url:{url_key}")
+        if last_key:
+            keys.append(f"name:{first_key}|{last_key}")
+            if company_key:
+                keys.append(f"name_company:{first_key}|{last_key}|{company_key}")
+        if signature is not None:
+            keys.extend(lsh_keys(signature, self.bands))
+        return keys
+
+    @staticmethod
+    def _names_compatible(first: str, last: str, entity: _Entity) -> bool:
+        # Same last name and the same first name, or an initial of it ("j" / "john")
+        if not last or last != entity.last_key:
+            return False
+        if not first or not entity.first_key or first == entity.first_key:
+            return True
+        shorter, longer = sorted((first.rstrip("."), entity.first_key.rstrip(".")), key=len)
+        return len(shorter) == 1 and longer.startswith(shorter)
+
+    # ------------------------------------------------------------------ storage
+
+    def _load_entities(self, entity_ids: Iterable[str], cache: Dict[str, _Entity]) -> List[_Entity]:
+        missing = [entity_id for entity_id in set(entity_ids) if entity_id not in cache]
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            rows = self._conn.execute(
+                f"SELECT entity_id, first_key, last_key, company_key, url_key, signature, quality_score, members, "
+                f"field_scores, data FROM entities WHERE entity_id IN ({', '.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            for entity_id, first, last, company, url, signature, score, members, field_scores, data in rows:
+                entity = _Entity(entity_id)
+                entity.first_key, entity.last_key, entity.company_key, entity.url_key = first, last, company, url
+                entity.signature = array("I", signature).tolist() if signature else None
+                entity.quality_score = score or 0
+                entity.members = members
+                entity.field_scores = json.loads(field_scores)
+                entity.record = json.loads(data)
+                cache[entity_id] = entity
+        return [cache[entity_id] for entity_id in entity_ids if entity_id in cache]
+
+    def _candidates(self, keys: List[str]) -> List[str]:
+        entity_ids: Dict[str, None] = {}
+        for key in keys:
+            rows = self._conn.execute("SELECT entity_id FROM entity_blocks WHERE block_key = ? LIMIT ?",
+                                      (key, self.max_block_candidates + 1)).fetchall()
+            if len(rows) > self.max_block_candidates:
+                self.counters["blocks_capped"] += 1
+                rows = rows[:self.max_block_candidates]
+            entity_ids.update((row[0], None) for row in rows)
+        return list(entity_ids)
+
+    def _save(self, entity: _Entity):
+        signature = array("I", entity.signature).tobytes() if entity.signature is not None else None
+        record = dict(entity.record, _entity_id=entity.entity_id, _duplicates=entity.members - 1,
+                      _quality_score=entity.quality_score)
+        entity.record = record
+        self._conn.execute("""
+            INSERT INTO entities (entity_id, first_key, last_key, company_key, url_key, signature, quality_score,
+                                  members, field_scores, data, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(entity_id) DO UPDATE SET
+                first_key = excluded.first_key, last_key = excluded.last_key, company_key = excluded.company_key,
+                url_key = excluded.url_key, signature = excluded.signature, quality_score = excluded.quality_score,
+                members = excluded.members, field_scores = excluded.field_scores, data = excluded.data,
+                updated_at = excluded.updated_at
+        """, (entity.entity_id, entity.first_key, entity.last_key, entity.company_key, entity.url_key, signature,
+              entity.quality_score, entity.members, json.dumps(entity.field_scores),
+              json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str), time.time()))
+
+    def _add_blocks(self, entity: _Entity, keys: Iterable[str]):
+        self._conn.executemany("INSERT OR IGNORE INTO entity_blocks (block_key, entity_id) VALUES (?, ?)",
+                               [(key, entity.entity_id) for key in keys])
+
+    # ------------------------------------------------------------------ resolution
+
+    def _absorb(self, entity: _Entity, profile: Dict[str, Any], features: Dict[str, Any], score: int):
+        merge_fields(entity.record, entity.field_scores, profile, score)
+        if score >= entity.quality_score or not entity.last_key:
+            # Keys follow the best record (a skeleton's name / company never overrides a full profile's)
+            entity.first_key = features["first_key"] or entity.first_key
+            entity.last_key = features["last_key"] or entity.last_key
+            entity.company_key = features["company_key"] or entity.company_key
+        entity.url_key = entity.url_key or features["url_key"]
+        if features["signature"] is not None:
+            entity.signature = features["signature"] if entity.signature is None else \
+                [min(a, b) for a, b in zip(entity.signature, features["signature"])]
+        entity.quality_score = max(entity.quality_score, score)
+        entity.dirty = True
+
+    def _merge_entities(self, survivor: _Entity, other: _Entity, cache: Dict[str, _Entity]):
+        # Fold `other` into `survivor`: fields by their source score, signature by element-wise minimum
+        for field, value in other.record.items():
+            if field.startswith("_") or not has_value(value):
+                continue
+            score = other.field_scores.get(field, other.quality_score)
+            if field not in survivor.record or score > survivor.field_scores.get(field, -1):
+                survivor.record[field] = value
+                survivor.field_scores[field] = score
+        if other.signature is not None:
+            survivor.signature = other.signature if survivor.signature is None else \
+                [min(a, b) for a, b in zip(survivor.signature, other.signature)]
+        survivor.company_key = survivor.company_key or other.company_key
+        survivor.url_key = survivor.url_key or other.url_key
+        survivor.quality_score = max(survivor.quality_score, other.quality_score)
+        survivor.members += other.members
+        survivor.dirty = True
+
+        self._conn.execute("UPDATE entity_members SET entity_id = ? WHERE entity_id = ?",
+                           (survivor.entity_id, other.entity_id))
+        self._conn.execute("INSERT OR IGNORE INTO entity_blocks (block_key, entity_id) "
+                           "SELECT block_key, ? FROM entity_blocks WHERE entity_id = ?",
+                           (survivor.entity_id, other.entity_id))
+        self._conn.execute("DELETE FROM entity_blocks WHERE entity_id = ?", (other.entity_id,))
+        self._conn.execute("DELETE FROM entities WHERE entity_id = ?", (other.entity_id,))
+        cache.pop(other.entity_id, None)
+        self.counters["entity_merges"] += 1
+
+    def _matches(self, features: Dict[str, Any], candidates: List[_Entity]) -> List[_Entity]:
+        matches = []
+        same_name = []
+        for entity in candidates:
+            self.counters["candidates_compared"] += 1
+            if features["url_key"] and features["url_key"] == entity.url_key:
+                matches.append(entity)
+                continue
+            if not self._names_compatible(features["first_key"], features["last_key"], entity):
+                continue
+            same_name.append(entity)
+            if features["company_key"] and features["company_key"] == entity.company_key:
+                matches.append(entity)
+            elif features["signature"] is not None and entity.signature is not None and \
+                    estimated_similarity(features["signature"], entity.signature) >= self.similarity_threshold:
+                matches.append(entity)
+
+        # A skeleton (no company, no text) can only be placed by its name when that is unambiguous
+        skeleton = not features["company_key"] and features["signature"] is None
+        if not matches and len(same_name) == 1 and (skeleton or same_name[0].skeleton):
+            matches.append(same_name[0])
+        return matches
+
+    def _scores(self, profiles: List[Dict[str, Any]]) -> List[int]:
+        missing = [profile for profile in profiles if not isinstance(profile.get("_quality_score"), int)]
+        computed = iter(score_feature_rows([quality_features(profile) for profile in missing]))
+        return [profile["_quality_score"] if isinstance(profile.get("_quality_score"), int) else next(computed)
+                for profile in profiles]
+
+    def _resolve_batch(self, profiles: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], str]]:
+        cache: Dict[str, _Entity] = {}
+        assigned: List[Tuple[Dict[str, Any], str]] = []
+        member_of: Dict[str, str] = {}   # profile_id -> entity_id within this batch
+        merged_into: Dict[str, str] = {}  # entity merged away in this batch -> the entity it went into
+
+        def survivor(entity_id: str) -> str:
+            while entity_id in merged_into:
+                entity_id = merged_into[entity_id]
+            return entity_id
+
+        ids = [profile_key(profile) for profile in profiles]
+        known = {}
+        unique_ids = sorted({profile_id for profile_id in ids if profile_id})
+        for start in range(0, len(unique_ids), 500):
+            chunk = unique_ids[start:start + 500]
+            known.update(self._conn.execute(
+                f"SELECT profile_id, entity_id FROM entity_members "
+                f"WHERE profile_id IN ({', '.join('?' * len(chunk))})", chunk).fetchall())
+
+        for profile, score in zip(profiles, self._scores(profiles)):
+            features = self._features(profile)
+            profile_id = features["profile_id"]
+            keys = self._block_keys(features["first_key"], features["last_key"], features["company_key"],
+                                    features["url_key"], features["signature"])
+
+            # A profile seen before only refreshes its entity
+            entity_id = member_of.get(profile_id) or known.get(profile_id) if profile_id else None
+            entity_id = survivor(entity_id) if entity_id else None
+            loaded = self._load_entities([entity_id], cache) if entity_id else []
+            entity = loaded[0] if loaded else None
+            if entity is None:
+                matches = self._matches(features, self._load_entities(self._candidates(keys), cache))
+                if matches:
+                    matches.sort(key=lambda e: (e.members, e.quality_score), reverse=True)
+                    entity = matches[0]
+                    for other in matches[1:]:
+                        self._merge_entities(entity, other, cache)
+                        merged_into[other.entity_id] = entity.entity_id
+                    self.counters["merged"] += 1
+                else:
+                    entity = _Entity(uuid.uuid4().hex)
+                    cache[entity.entity_id] = entity
+                    self.counters["new_entities"] += 1
+                entity.members += 1
+                if profile_id:
+                    self._conn.execute("INSERT OR REPLACE INTO entity_members (profile_id, entity_id) VALUES (?, ?)",
+                                       (profile_id, entity.entity_id))
+                    member_of[profile_id] = entity.entity_id
+
+            self._absorb(entity, profile, features, score)
+            self._add_blocks(entity, keys)
+            assigned.append((profile, entity.entity_id))
+            self.counters["resolved"] += 1
+
+        for entity in cache.values():
+            if entity.dirty:
+                self._save(entity)
+        # Entities merged away later in the batch point to their survivor
+        return [(profile, survivor(entity_id)) for profile, entity_id in assigned]
+
+    def resolve(self, profiles: Iterable[Dict[str, Any]], batch_size: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Assign profiles to entities (merging duplicates) and return their canonical records
+
+        Args:
+            profiles: Profile records, from this run or any earlier one (a '_quality_score'
+                      is computed when missing)
+            batch_size: Profiles resolved per transaction
+
+        Returns:
+            One canonical record per distinct entity among the inputs, in the order the
+            entities first appear. Each carries '_entity_id', '_duplicates' (other records
+            merged into it) and the entity's best '_quality_score'.
+        """
+        entity_order: Dict[str, None] = {}   # insertion-ordered set
+        batch: List[Dict[str, Any]] = []
+        start = time.time()
+
+        def flush():
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    assigned = self._resolve_batch(batch)
+                    self._conn.commit()
+                except Exception:
+                    self._conn.rollback()
+                    raise
+            for _, entity_id in assigned:
+                entity_order.setdefault(entity_id)
+            batch.clear()
+
+        for profile in profiles:
+            if isinstance(profile, dict):
+                batch.append(profile)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+        canonical = self.get_many(list(entity_order))
+        log.info(f"🧬 Resolved profiles into {len(canonical)} entities in {time.time() - start:.2f}s "
+                 f"({self.counters['merged']} merged into known entities so far)")
+        return canonical
+
+    # ------------------------------------------------------------------ lookups
+
+    def get_many(self, entity_ids: Sequence[str]) -> List[Dict[str, Any]]:
+        """Canonical records for entity ids (in the given order; merged-away ids follow their survivor)"""
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for start in range(0, len(entity_ids), 500):
+                chunk = list(entity_ids[start:start + 500])
+                rows = self._conn.execute(
+                    f"SELECT entity_id, data FROM entities WHERE entity_id IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update((entity_id, json.loads(data)) for entity_id, data in rows)
+        records, seen = [], set()
+        for entity_id in entity_ids:
+            if entity_id in found and entity_id not in seen:
+                seen.add(entity_id)
+                records.append(found[entity_id])
+        return records
+
+    def get(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        """Canonical record of an entity"""
+        records = self.get_many([entity_id])
+        return records[0] if records else None
+
+    def entity_of(self, profile: Any) -> Optional[str]:
+        """Entity id a profile (record or profile id) was resolved to"""
+        profile_id = profile_key(profile) if isinstance(profile, dict) else profile
+        with self._lock:
+            row = self._conn.execute("SELECT entity_id FROM entity_members WHERE profile_id = ?",
+                                     (profile_id,)).fetchone()
+        return row[0] if row else None
+
+    def members(self, entity_id: str) -> List[str]:
+        """Profile ids merged into an entity"""
+        with self._lock:
+            rows = self._conn.execute("SELECT profile_id FROM entity_members WHERE entity_id = ? ORDER BY profile_id",
+                                      (entity_id,)).fetchall()
+        return [row[0] for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            profiles = self._conn.execute("SELECT COUNT(*) FROM entity_members").fetchone()[0]
+        return {"entities": len(self), "profiles": profiles, "path": self.path, **self.counters}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_resolvers: Dict[str, EntityResolver] = {}
+_resolvers_lock = threading.Lock()
+
+
+def get_entity_resolver(path: str = DEFAULT_PROFILES_PATH) -> EntityResolver:
+    """Return the shared entity resolver for a file path (opened on first use)"""
+    path = os.path.abspath(path)
+    with _resolvers_lock:
+        resolver = _resolvers.get(path)
+        if resolver is None:
+            resolver = EntityResolver(path)
+            _resolvers[path] = resolver
+        return resolver
@@ -0,0 +1,137 @@
+"""
+Gemini REST client without the google-generativeai SDK
+
+The notebooks talk to Gemini through google.generativeai, which takes seconds
+to import (protobuf, grpc, google.api_core, ...). GeminiClient calls the
+generateContent REST endpoint through the shared HTTP client instead, so a
+worker only pays for `requests`. Completions are cached in the response cache
+under the same keys the notebook's GeminiLLM uses, so both paths share answers.
+"""
+
+import threading
+from typing import Any, Dict
+
+from scraping_core.http_client import http_post
+from scraping_core.telemetry import estimate_cost, get_logger, get_tracer
+
+GEMINI_API_URL = "https://generativelanguage.googleapis.com"
+DEFAULT_GEMINI_MODEL = "gemini-1.5-flash"
+
+log = get_logger("gemini")
+
+
+def response_text(answer: Dict[str, Any]) -> str:
+    """Text of the first candidate of a generateContent answer"""
+    candidates = answer.get("candidates") or []
+    if not candidates:
+        feedback = answer.get("promptFeedback", {})
+        raise ValueError(f"Gemini returned no candidates ({feedback.get('blockReason', 'no reason given')})")
+    parts = candidates[0].get("content", {}).get("parts", [])
+    return "".join(part.get("text", "") for part in parts)
+
+
+class GeminiClient:
+    def __init__(self,
+                 api_key: str,
+                 model_name: str = DEFAULT_GEMINI_MODEL,
+                 temperature: float = 0.1,
+                 cache=None,
+                 base_url: str = GEMINI_API_URL,
+                 timeout: int = 60):
+        """
+        Initialize a Gemini client for one model
+
+        Args:
+            api_key: Google AI API key
+            model_name: Gemini model name
+            temperature: Sampling temperature
+            cache: Optional ResponseCache; plain completions are cached under "gemini"
+            base_url: REST API root (SCRAPING_BASE_URL_OVERRIDES also applies)
+            timeout: Request timeout in seconds
+        """
+        self.api_key = api_key
+        self.model_name = model_name
+        self.temperature = temperature
+        self.cache = cache
+        self.url = f"{base_url}/v1beta/models/{model_name}:generateContent"
+        self.timeout = timeout
+        self.headers = {"x-goog-api-key": api_key, "Content-Type": "application/json"}
+
+    def generate(self, prompt: str) -> str:
+        """
+        Free-text completion (served from the cache when possible)
+
+        Returns:
+            The answer text, or "Error: ..." when the request failed (not cached)
+        """
+        if self.cache is None:
+            return self._generate(prompt)
+        return self.cache.get_or_compute(
+            "gemini",
+            [self.model_name, self.temperature, prompt.strip()],
+            compute=lambda: self._generate(prompt),
+            should_cache=lambda text: not text.startswith("Error:")
+        )
+
+    def _generate(self, prompt: str) -> str:
+        with get_tracer().span("gemini.generate", model=self.model_name, structured=False) as span:
+            try:
+                return self._request(prompt, {"temperature": self.temperature}, span)
+            except Exception as e:
+                span.set(error=str(e))
+                log.error(f"❌ Gemini request failed: {e}")
+                return f"Error: {str(e)}"
+
+    def generate_json(self, prompt: str, schema: Dict[str, Any]) -> str:
+        """
+        Ask for JSON constrained to `schema` (raises on failure)
+
+        Returns:
+            The raw JSON text
+        """
+        generation_config = {
+            "responseMimeType": "application/json",
+            "responseSchema": schema,
+            "temperature": self.temperature,
+        }
+        with get_tracer().span("gemini.generate", model=self.model_name, structured=True) as span:
+            return self._request(prompt, generation_config, span)
+
+    def _request(self, prompt: str, generation_config: Dict[str, Any], span) -> str:
+        payload = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": generation_config,
+        }
+        response = http_post(self.url, headers=self.headers, json=payload, timeout=self.timeout)
+        if not response.ok:
+            raise RuntimeError(f"Gemini API error {response.status_code}: {response.text[:200]}")
+
+        answer = response.json()
+        usage = answer.get("usageMetadata", {})
+        prompt_tokens = usage.get("promptTokenCount", 0) or 0
+        response_tokens = usage.get("candidatesTokenCount", 0) or 0
+        span.set(prompt_tokens=prompt_tokens, response_tokens=response_tokens,
+                 cost_usd=estimate_cost("gemini", prompt_tokens=prompt_tokens, response_tokens=response_tokens))
+        return response_text(answer)
+
+
+_clients: Dict[tuple, GeminiClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_gemini_client(api_key: str, model_name: str = DEFAULT_GEMINI_MODEL, **kwargs) -> GeminiClient:
+    """
+    Return the process-wide client for an API key / model (created on first use)
+
+    Args:
+        api_key: Google AI API key
+        model_name: Gemini model name
+        **kwargs: Extra GeminiClient settings (only used when the client is created)
+    """
+    with _clients_lock:
+        client = _clients.get((api_key, model_name))
+        if client is None:
+            client = GeminiClient(api_key, model_name, **kwargs)
+            _clients[(api_key, model_name)] = client
+        return client
+
@@ -0,0 +1,202 @@
+"""
+Hedged requests: race several ways of getting the same result
+
+A slow or broken path (a synchronous scrape hanging until its timeout, a dead
+page picked as the company website) used to decide the latency of the whole
+email. hedge() starts a list of attempts, at once or each after its own
+delay (a failed attempt starts the next waiting one right away), and
+returns the first result that passes a check. The other attempts are
+cancelled. Attempts still waiting for their start delay never run.
+Running ones are told through the callbacks they registered with on_cancel()
+(e.g. cancel a Bright Data snapshot and stop polling for it). Blocking calls
+that cannot be interrupted finish in the background and their result is
+dropped.
+"""
+
+import contextvars
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from scraping_core.telemetry import get_logger, get_tracer
+
+log = get_logger("hedge")
+
+_current_attempt: contextvars.ContextVar = contextvars.ContextVar("hedge_attempt", default=None)
+
+# Process-wide counters: hedges run, wins per attempt name, hedges without a good result, cancelled attempts
+HEDGE_STATS: Dict[str, Any] = {"hedges": 0, "wins": {}, "no_winner": 0, "cancelled": 0, "skipped": 0}
+
+
+class HedgeAttempt:
+    def __init__(self, name: str, fn: Callable[[], Any], delay: float = 0.0):
+        """
+        One way of getting the result
+
+        Args:
+            name: Label used in logs, spans and HEDGE_STATS (e.g. "sync", "async", a URL)
+            fn: Blocking function returning the result
+            delay: Seconds after the hedge starts before this attempt runs
+        """
+        self.name = name
+        self.fn = fn
+        self.delay = delay
+        self.status = "pending"    # pending, running, won, bad, failed, cancelled or skipped
+        self.cancelled = threading.Event()
+        self._wake = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def on_cancel(self, callback: Callable[[], None]):
+        """Run callback if this attempt is cancelled while it is still running"""
+        with self._lock:
+            if not self.cancelled.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def cancel(self):
+        with self._lock:
+            if self.cancelled.is_set():
+                return
+            self.cancelled.set()
+            self._wake.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                log.warning(f"⚠️ Cancel callback of hedge attempt '{self.name}' failed: {e}")
+
+    def _finish(self):
+        # A finished attempt has nothing left to cancel
+        with self._lock:
+            self._callbacks = []
+
+
+def on_cancel(callback: Callable[[], None]) -> bool:
+    """
+    Register a cancel callback for the hedge attempt running the current code
+
+    Returns:
+        False when the code is not running inside a hedge (the callback is ignored)
+    """
+    attempt = _current_attempt.get()
+    if attempt is None:
+        return False
+    attempt.on_cancel(callback)
+    return True
+
+
+def hedge_cancelled() -> bool:
+    """True when the current code runs in a hedge attempt that has lost"""
+    attempt = _current_attempt.get()
+    return attempt is not None and attempt.cancelled.is_set()
+
+
+def _run_attempt(attempt: HedgeAttempt) -> Any:
+    _current_attempt.set(attempt)
+    try:
+        return attempt.fn()
+    finally:
+        attempt._finish()
+
+
+def hedge(attempts: Sequence[HedgeAttempt],
+          is_good: Callable[[Any], bool] = bool,
+          timeout: Optional[float] = None,
+          label: str = "hedge") -> Dict[str, Any]:
+    """
+    Run the attempts (each after its delay) and keep the first good result
+
+    Args:
+        attempts: Ways of getting the result, usually the preferred one first with delay 0
+        is_good: Check a result must pass to win
+        timeout: Stop waiting after this many seconds
+        label: Span name suffix ("hedge.<label>")
+
+    Returns:
+        dict with winner (attempt name or None), result (the winning result; without a
+        winner the first result that finished without an exception, else None),
+        statuses ({name: status}) and waited (seconds)
+    """
+    HEDGE_STATS["hedges"] += 1
+    finished: "queue.Queue" = queue.Queue()
+    started = time.time()
+    deadline = started + timeout if timeout else None
+
+    def run(attempt: HedgeAttempt, context: contextvars.Context):
+        if attempt.delay:
+            attempt._wake.wait(attempt.delay)
+        if attempt.cancelled.is_set():
+            attempt.status = "skipped"
+            finished.put((attempt, None, None))
+            return
+        attempt.status = "running"
+        try:
+            # A copy of the caller's context keeps spans attributed to the caller's run
+            finished.put((attempt, context.run(_run_attempt, attempt), None))
+        except Exception as e:
+            finished.put((attempt, None, e))
+
+    winner: Optional[HedgeAttempt] = None
+    result, fallback = None, None
+    with get_tracer().span(f"hedge.{label}", attempts=len(attempts)) as span:
+        # A hedge nested in an attempt of another hedge is cancelled along with that attempt
+        on_cancel(lambda: [attempt.cancel() for attempt in attempts])
+        for attempt in attempts:
+            threading.Thread(target=run, args=(attempt, contextvars.copy_context()),
+                             name=f"hedge-{attempt.name}", daemon=True).start()
+
+        remaining_attempts = len(attempts)
+        while remaining_attempts:
+            wait = None if deadline is None else deadline - time.time()
+            if wait is not None and wait <= 0:
+                break
+            try:
+                attempt, value, error = finished.get(timeout=wait)
+            except queue.Empty:
+                break
+            remaining_attempts -= 1
+
+            if attempt.status == "skipped":
+                continue
+            if error is None and is_good(value):
+                attempt.status = "won"
+                winner, result = attempt, value
+                break
+
+            if error is not None:
+                attempt.status = "failed"
+                log.debug(f"🏁 Hedge attempt '{attempt.name}' failed: {type(error).__name__}: {error}")
+            else:
+                attempt.status = "bad"
+                if fallback is None:
+                    fallback = value
+            # No point waiting out the next attempt's delay any more
+            waiting = next((other for other in attempts if other.status == "pending"), None)
+            if waiting is not None:
+                waiting._wake.set()
+
+        for attempt in attempts:
+            if attempt is not winner and attempt.status in ("pending", "running"):
+                attempt.status = "cancelled" if attempt.status == "running" else "skipped"
+                HEDGE_STATS[attempt.status] += 1
+            if attempt is not winner:
+                attempt.cancel()
+
+        if winner is not None:
+            HEDGE_STATS["wins"][winner.name] = HEDGE_STATS["wins"].get(winner.name, 0) + 1
+        else:
+            HEDGE_STATS["no_winner"] += 1
+            result = fallback
+        statuses = {attempt.name: attempt.status for attempt in attempts}
+        span.set(winner=winner.name if winner else None, statuses=statuses)
+
+    return {
+        "winner": winner.name if winner else None,
+        "result": result,
+        "statuses": statuses,
+        "waited": time.time() - started,
+    }
@@ -0,0 +1,330 @@
+"""
+HTML-to-text extraction with a token budget, run before Gemini summarization
+
+Scraped pages used to reach the summary prompt as the first 2000 characters of
+raw HTML - mostly <head>, script and style markup. extract_page_text() keeps
+what describes the site (title, meta description, headings and the main body
+text), drops navigation / footer / script boilerplate and repeated blocks, and
+packs the result into a configurable token budget.
+
+selectolax (Lexbor backend) is used when installed (fastest); otherwise a
+streaming parser from the standard library consumes the page chunk by chunk and
+stops reading once it has collected enough text, so very large pages are never
+parsed in full. Both feed the same collector, so they extract the same text.
+When nothing but boilerplate is found, the page's plain text is used instead.
+"""
+
+import functools
+import re
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional, Union
+
+from scraping_core.telemetry import get_logger
+
+log = get_logger("html_extract")
+
+DEFAULT_TOKEN_BUDGET = 800
+CHARS_PER_TOKEN = 4         # Rough average for English prose
+MIN_BLOCK_CHARS = 25        # Shorter body blocks are usually buttons, labels or link lists
+
+# Never contains readable page content
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "canvas", "object", "head"}
+# Site chrome repeated on every page
+BOILERPLATE_TAGS = {"nav", "footer", "aside", "form", "button", "select", "dialog"}
+# Matched against whole class / id / role tokens ("cookie-banner", "menu_item", "sidebar"), never inside one
+# ("content-sidebar-wrap" and "has-sidebar" are layout wrappers around the real content)
+BOILERPLATE_HINTS = re.compile(r"(?:cookie|consent|banner|navbar|menu|footer|sidebar|modal|popup|breadcrumb|share|social)"
+                               r"(?:[-_].*)?", re.IGNORECASE)
+
+HEADING_TAGS = {"h1", "h2", "h3", "h4"}
+BLOCK_TAGS = HEADING_TAGS | {"p", "li", "td", "th", "dd", "dt", "blockquote", "pre", "figcaption",
+                             "div", "section", "article", "main", "header", "tr", "ul", "ol", "table", "br"}
+MAIN_TAGS = {"main", "article"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param",
+             "source", "track", "wbr"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate LLM token count of a text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _clean(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _is_boilerplate_hint(attributes: Dict[str, Optional[str]]) -> bool:
+    tokens = " ".join(attributes.get(name) or "" for name in ("class", "id", "role")).split()
+    return any(BOILERPLATE_HINTS.fullmatch(token) for token in tokens)
+
+
+class _Block:
+    __slots__ = ("text", "heading_level", "in_main")
+
+    def __init__(self, text: str, heading_level: int, in_main: bool):
+        self.text = text
+        self.heading_level = heading_level
+        self.in_main = in_main
+
+
+class _StreamingExtractor(HTMLParser):
+    """
+    Event-driven block collector (feed() it the page in as many chunks as you like)
+
+    An element skipped only for its class / id / role hint is un-skipped as soon as
+    a <main> or <article> opens inside it, so layout wrappers never hide the content.
+    """
+
+    def __init__(self, stop_after_chars: Optional[int] = None):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.meta: Dict[str, str] = {}
+        self.blocks: List[_Block] = []
+        self.collected_chars = 0
+        self.stop_after_chars = stop_after_chars
+
+        self.plain: List[str] = []                  # Page text outside script / style, the fallback
+        self.plain_chars = 0
+
+        self._stack: List[List] = []   # [tag, opened a skipped region, skipped only for its hint, opened SKIP_TAGS]
+        self._skip_depth = 0
+        self._hard_skip_depth = 0
+        self._main_depth = 0
+        self._heading_level = 0
+        self._in_title = False
+        self._buffer: List[str] = []
+
+    @property
+    def enough(self) -> bool:
+        return self.stop_after_chars is not None and self.collected_chars >= self.stop_after_chars
+
+    def _flush(self):
+        text = _clean("".join(self._buffer))
+        self._buffer = []
+        if text:
+            self.blocks.append(_Block(text, self._heading_level, self._main_depth > 0))
+            self.collected_chars += len(text)
+
+    def handle_starttag(self, tag, attrs):
+        if self.enough:
+            return
+        attributes = dict(attrs)
+
+        if tag == "meta":
+            key = (attributes.get("name") or attributes.get("property") or "").lower()
+            if key in ("description", "og:description", "og:title", "og:site_name") and attributes.get("content"):
+                self.meta.setdefault(key, _clean(attributes["content"]))
+            return
+        if tag == "title":
+            self._in_title = True
+            return
+        if tag in VOID_TAGS:
+            if tag == "br":
+                self._buffer.append(" ")
+            return
+
+        hard_skipped = tag in SKIP_TAGS
+        tag_skipped = hard_skipped or tag in BOILERPLATE_TAGS or attributes.get("aria-hidden") == "true"
+        hint_skipped = (not tag_skipped and tag not in MAIN_TAGS and tag != "body"
+                        and _is_boilerplate_hint(attributes))
+        skipped = tag_skipped or hint_skipped
+
+        if tag in BLOCK_TAGS and not self._skip_depth:
+            self._flush()
+        if tag in MAIN_TAGS:
+            self._unskip_hinted_ancestors()
+            self._main_depth += 1
+        if tag in HEADING_TAGS:
+            self._heading_level = int(tag[1])
+        if skipped:
+            self._skip_depth += 1
+        if hard_skipped:
+            self._hard_skip_depth += 1
+            self.plain.append(" ")
+        self._stack.append([tag, skipped, hint_skipped, hard_skipped])
+
+    def _unskip_hinted_ancestors(self):
+        # Only when every skipped ancestor was skipped for its hint (<main> inside <nav> stays skipped)
+        if not self._skip_depth or any(entry[1] and not entry[2] for entry in self._stack):
+            return
+        for entry in self._stack:
+            if entry[2]:
+                entry[1] = entry[2] = False
+                self._skip_depth -= 1
+
+    def handle_endtag(self, tag):
+        if self.enough:
+            return
+        if tag == "title":
+            self._in_title = False
+            return
+        if not any(entry[0] == tag for entry in self._stack):
+            return  # Stray end tag
+
+        # Close everything up to the matching tag (browsers do the same for unclosed children)
+        while self._stack:
+            open_tag, skipped, _, hard_skipped = self._stack.pop()
+            if open_tag in BLOCK_TAGS and not self._skip_depth:
+                self._flush()
+            if skipped:
+                self._skip_depth -= 1
+            if hard_skipped:
+                self._hard_skip_depth -= 1
+            if open_tag in BLOCK_TAGS or open_tag in BOILERPLATE_TAGS:
+                self.plain.append(" ")
+            if open_tag in MAIN_TAGS:
+                self._main_depth -= 1
+            if open_tag in HEADING_TAGS:
+                self._heading_level = 0
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.enough:
+            return
+        if self._in_title:
+            self.title += data
+            return
+        if not self._skip_depth:
+            self._buffer.append(data)
+        if not self._hard_skip_depth and (self.stop_after_chars is None or self.plain_chars < self.stop_after_chars):
+            self.plain.append(data)
+            self.plain_chars += len(data)
+
+    def plain_text(self) -> str:
+        return _clean("".join(self.plain))
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def _collect_streaming(html: Union[str, Iterable[str]], stop_after_chars: int) -> _StreamingExtractor:
+    extractor = _StreamingExtractor(stop_after_chars)
+    chunks = [html] if isinstance(html, str) else html
+    for chunk in chunks:
+        # Feed large strings in slices so collection can stop early
+        for start in range(0, len(chunk), 64 * 1024):
+            extractor.feed(chunk[start:start + 64 * 1024])
+            if extractor.enough:
+                break
+        if extractor.enough:
+            break
+    extractor.close()
+    return extractor
+
+
+@functools.lru_cache(maxsize=None)
+def _selectolax_parser():
+    # Imported on the first extraction, not when the module is imported
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+    except ImportError:  # Falls back to the streaming standard-library parser
+        log.info("ℹ️ selectolax (Lexbor) not available - extracting page text with the streaming html.parser")
+        return None
+    return LexborHTMLParser
+
+
+def _collect_selectolax(html: str, stop_after_chars: int) -> _StreamingExtractor:
+    # Lexbor parses the page; its tree is replayed as parser events into the streaming collector,
+    # so both paths apply the same skip / block / fallback rules
+    tree = _selectolax_parser()(html)
+    result = _StreamingExtractor(stop_after_chars)
+    if tree.root is None:
+        return result
+
+    # Explicit stack (deeply nested pages would exceed the recursion limit); a tag name marks its end tag
+    pending = [tree.root]
+    while pending and not result.enough:
+        node = pending.pop()
+        if isinstance(node, str):
+            result.handle_endtag(node)
+            continue
+        tag = node.tag
+        if tag == "-text":
+            result.handle_data(node.text_content or "")
+            continue
+        if tag.startswith("-") or tag.startswith("!"):
+            continue  # Comments, doctype
+        result.handle_starttag(tag, list(node.attributes.items()))
+        if tag in VOID_TAGS:
+            continue
+        pending.append(tag)
+        pending.extend(reversed(list(node.iter(include_text=True))))
+    result.close()
+    return result
+
+
+def _truncate_words(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0]
+    return cut + "…"
+
+
+def extract_page_text(html: Union[str, Iterable[str]],
+                      token_budget: int = DEFAULT_TOKEN_BUDGET,
+                      min_block_chars: int = MIN_BLOCK_CHARS) -> str:
+    """
+    Turn a scraped page into compact, prompt-ready text
+
+    Args:
+        html: Page HTML as one string, or an iterable of text chunks (streamed)
+        token_budget: Approximate maximum number of tokens in the result
+        min_block_chars: Body blocks shorter than this are dropped (headings are always kept)
+
+    Returns:
+        "Title: ...", "Description: ..." and the deduplicated headings / main text,
+        in document order, cut to the token budget
+    """
+    budget_chars = token_budget * CHARS_PER_TOKEN
+
+    # Collect a few budgets' worth so boilerplate / duplicates can still be dropped
+    if isinstance(html, str) and _selectolax_parser() is not None:
+        page = _collect_selectolax(html, stop_after_chars=budget_chars * 4)
+    else:
+        page = _collect_streaming(html, stop_after_chars=budget_chars * 4)
+
+    lines = []
+    title = _clean(page.title) or page.meta.get("og:title", "")
+    if title:
+        lines.append(f"Title: {title}")
+    description = page.meta.get("description") or page.meta.get("og:description")
+    if description:
+        lines.append(f"Description: {description}")
+
+    # Prefer <main>/<article> content when the page marks it up and it has real text
+    blocks = page.blocks
+    main_blocks = [block for block in blocks if block.in_main]
+    if sum(len(block.text) for block in main_blocks if not block.heading_level) >= 200:
+        blocks = main_blocks
+
+    seen = {_clean(title).lower(), (description or "").lower()}
+    used = sum(len(line) + 1 for line in lines)
+    header_lines = len(lines)
+    for block in blocks:
+        key = block.text.lower()
+        if key in seen or (not block.heading_level and len(block.text) < min_block_chars):
+            continue
+        seen.add(key)
+
+        line = f"{'#' * block.heading_level} {block.text}" if block.heading_level else block.text
+        remaining = budget_chars - used
+        if remaining <= 0:
+            break
+        if len(line) + 1 > remaining:
+            if remaining > 80:
+                lines.append(_truncate_words(line, remaining - 1))
+            break
+
+        lines.append(line)
+        used += len(line) + 1
+
+    if len(lines) == header_lines:
+        # Everything was filtered as boilerplate (or too short) - the page's plain text beats nothing
+        plain = page.plain_text()
+        remaining = budget_chars - used
+        if plain and plain.lower() not in seen and remaining > 0:
+            lines.append(_truncate_words(plain, remaining - 1))
+
+    return "\n".join(lines)
@@ -0,0 +1,254 @@
+"""
+Shared HTTP client: pooled keep-alive sessions, rate limits and retries
+
+Every Serper / Bright Data call used to go through bare `requests.get/post`,
+paying a fresh TCP + TLS handshake each time, and a 429 only printed a hint.
+HttpClient keeps one pooled `requests.Session` per host, throttles each API key
+with a token bucket, and retries 429 / 5xx answers with jittered exponential
+backoff that honors the server's Retry-After header.
+
+Drop-in usage: replace `requests.get(...)` / `requests.post(...)` with
+`http_get(...)` / `http_post(...)` - the return value is the same Response.
+
+Base URL overrides (SCRAPING_BASE_URL_OVERRIDES, a JSON object such as
+{"https://api.brightdata.com": "http://127.0.0.1:8000/brightdata"}) send the
+API calls to a local mock or proxy without editing the notebooks; rate limits
+still apply per original host.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scraping_core.telemetry import get_logger, get_tracer
+
+# (requests per second, burst size) per host - tune these to your API plans
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "google.serper.dev": (5.0, 10),
+    "api.brightdata.com": (10.0, 20),
+}
+DEFAULT_RATE_LIMIT = (20.0, 40)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_TIMEOUT = 60
+
+log = get_logger("http")
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        """
+        Thread-safe token bucket
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Block until `tokens` are available
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+
+                delay = (tokens - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    def __init__(self,
+                 rate_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+                 max_retries: int = 4,
+                 backoff_base: float = 1.0,
+                 max_backoff: float = 60.0,
+                 pool_maxsize: int = 32,
+                 base_url_overrides: Optional[Dict[str, str]] = None):
+        """
+        Initialize the shared HTTP client
+
+        Args:
+            rate_limits: Per-host (requests per second, burst) overrides
+            max_retries: Retries for 429 / 5xx answers and connection errors
+            backoff_base: First backoff step in seconds (doubles each retry, with full jitter)
+            max_backoff: Upper bound for a single backoff sleep
+            pool_maxsize: Keep-alive connections kept per host
+            base_url_overrides: URL prefix -> replacement prefix (defaults to SCRAPING_BASE_URL_OVERRIDES)
+        """
+        self.rate_limits = dict(DEFAULT_RATE_LIMITS)
+        if rate_limits:
+            self.rate_limits.update(rate_limits)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.pool_maxsize = pool_maxsize
+        if base_url_overrides is None:
+            base_url_overrides = json.loads(os.environ.get("SCRAPING_BASE_URL_OVERRIDES") or "{}")
+        self.base_url_overrides = dict(base_url_overrides)
+
+        self._sessions: Dict[str, requests.Session] = {}
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0, "throttle_wait": 0.0}
+
+    def session_for(self, host: str) -> requests.Session:
+        """Pooled keep-alive session for one host"""
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def bucket_for(self, host: str, api_key: str) -> TokenBucket:
+        """Token bucket for one (host, API key) pair"""
+        with self._lock:
+            bucket = self._buckets.get((host, api_key))
+            if bucket is None:
+                rate, capacity = self.rate_limits.get(host, DEFAULT_RATE_LIMIT)
+                bucket = TokenBucket(rate, capacity)
+                self._buckets[(host, api_key)] = bucket
+            return bucket
+
+    def rewrite_url(self, url: str) -> str:
+        """Apply the first matching base URL override"""
+        for prefix, replacement in self.base_url_overrides.items():
+            if url.startswith(prefix):
+                return replacement.rstrip("/") + url[len(prefix):]
+        return url
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method: str, url: str, retries: Optional[int] = None, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session with rate limiting and retries
+
+        Args:
+            method: HTTP method
+            url: Full URL
+            retries: Override max_retries for this call (0 disables retries)
+            **kwargs: Passed to requests (headers, params, json, timeout, stream, ...)
+
+        Returns:
+            The final requests.Response (callers keep handling non-2xx statuses themselves)
+        """
+        host = urlparse(url).netloc
+        url = self.rewrite_url(url)
+        headers = kwargs.get("headers") or {}
+        api_key = headers.get("Authorization") or headers.get("X-API-KEY") or ""
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        retries = self.max_retries if retries is None else retries
+
+        session = self.session_for(urlparse(url).netloc)
+        bucket = self.bucket_for(host, api_key)
+
+        attempt = 0
+        with get_tracer().span("http.request", method=method, host=host) as span:
+            while True:
+                self.stats["throttle_wait"] += bucket.acquire()
+                self.stats["requests"] += 1
+
+                try:
+                    response = session.request(method, url, **kwargs)
+                except (requests.ConnectionError, requests.Timeout):
+                    if attempt >= retries:
+                        raise
+                    response = None
+
+                if response is not None and (response.status_code not in RETRY_STATUSES or attempt >= retries):
+                    span.set(status_code=response.status_code, retries=attempt)
+                    return response
+
+                if response is not None and response.status_code == 429:
+                    self.stats["rate_limited"] += 1
+
+                delay = self._backoff(attempt, response)
+                status = response.status_code if response is not None else "connection error"
+                log.info(f"🔁 {method} {host}: {status}, retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+                if response is not None:
+                    response.close()
+
+                self.stats["retries"] += 1
+                attempt += 1
+                time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client(**kwargs) -> HttpClient:
+    """
+    Return the process-wide HttpClient (created on first use)
+
+    Args:
+        **kwargs: HttpClient settings (only used when the client is created)
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(**kwargs)
+        return _client
+
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    """Drop-in replacement for requests.get using the shared client"""
+    return get_http_client().get(url, **kwargs)
+
+
+def http_post(url: str, **kwargs) -> requests.Response:
+    """Drop-in replacement for requests.post using the shared client"""
+    return get_http_client().post(url, **kwargs)
@@ -0,0 +1,643 @@
+"""
+Durable job queue and resumable checkpoints for long Bright Data runs
+
+A kernel restart, or a timeout inside poll_and_retrieve_results /
+wait_with_early_termination, used to lose every in-flight snapshot_id: the next
+run triggered (and paid for) the same scrape again and repeated every chain
+stage from the start. JobStore keeps this state in a local SQLite file:
+
+- snapshots: every /trigger call with its snapshot_id, dataset, params, input
+  set and status, so callers can pick up a still-running (or ready) snapshot
+  for the same input instead of triggering a new one
+- jobs: one row per email / person with its input, status, the last stage it
+  finished and the checkpointed state after that stage
+
+JobRunner claims jobs with a lease (so several worker threads or processes can
+share one file), runs the remaining stages and checkpoints after each one, which
+turns the pipeline into a restartable, long-lived service.
+"""
+
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
+
+from scraping_core.response_cache import connect_sqlite
+from scraping_core.telemetry import get_logger, get_tracer, run_context
+
+DEFAULT_JOBS_PATH = os.environ.get("SCRAPING_JOBS_PATH", "scraping_jobs.sqlite3")
+
+# Snapshots older than this are not reused for new requests (Bright Data expires them eventually)
+SNAPSHOT_REUSE_MAX_AGE = 24 * 60 * 60
+
+# Snapshot statuses whose records have not been downloaded yet ("collected" ones are not reused)
+LIVE_SNAPSHOT_STATUSES = ("running", "ready")
+
+# Finished jobs / snapshots older than this are deleted by JobStore.prune()
+PRUNE_MAX_AGE = 7 * 24 * 60 * 60
+
+log = get_logger("jobs")
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def input_key_for(key: Any) -> str:
+    """Stable text form of a routing key (URL string, (first, last) tuple, ...)"""
+    return key if isinstance(key, str) else _dumps(key)
+
+
+def input_set_key(items: Sequence[Dict[str, Any]]) -> str:
+    """Order-independent key for a whole trigger payload"""
+    digest = hashlib.sha256(_dumps(sorted(_dumps(item) for item in items)).encode("utf-8")).hexdigest()
+    return f"set:{digest}"
+
+
+def encode_state(value: Any) -> Any:
+    """JSON form of a pipeline state; Pydantic models are tagged with their class name"""
+    if hasattr(value, "model_dump"):
+        return {"__model__": type(value).__name__, "data": value.model_dump()}
+    if isinstance(value, dict):
+        return {str(k): encode_state(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_state(v) for v in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def decode_state(value: Any, models: Sequence[Type] = ()) -> Any:
+    """
+    Rebuild a state written by encode_state()
+
+    Args:
+        value: Encoded state
+        models: Pydantic model classes that may appear in the state
+    """
+    registry = {model.__name__: model for model in models}
+
+    def decode(item):
+        if isinstance(item, dict):
+            if set(item) == {"__model__", "data"} and item["__model__"] in registry:
+                return registry[item["__model__"]](**item["data"])
+            return {k: decode(v) for k, v in item.items()}
+        if isinstance(item, list):
+            return [decode(v) for v in item]
+        return item
+
+    return decode(value)
+
+
+class JobStore:
+    def __init__(self, path: str = DEFAULT_JOBS_PATH):
+        """
+        Open (or create) the job store
+
+        Args:
+            path: SQLite file path (share it between worker processes to split the queue)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        # Autocommit mode; claim() opens its own IMMEDIATE transaction so workers never take the same job
+        self._conn = connect_sqlite(path, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                input_key TEXT NOT NULL,
+                input TEXT NOT NULL,
+                status TEXT NOT NULL,
+                stage TEXT,
+                state TEXT,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL,
+                worker TEXT,
+                lease_until REAL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (kind, status, created_at);
+
+            CREATE TABLE IF NOT EXISTS snapshots (
+                snapshot_id TEXT PRIMARY KEY,
+                dataset_id TEXT NOT NULL,
+                params TEXT NOT NULL,
+                inputs TEXT NOT NULL,
+                status TEXT NOT NULL,
+                job_id TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_snapshots_status ON snapshots (status);
+
+            CREATE TABLE IF NOT EXISTS snapshot_inputs (
+                snapshot_id TEXT NOT NULL,
+                dataset_id TEXT NOT NULL,
+                params TEXT NOT NULL,
+                input_key TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_snapshot_inputs_key ON snapshot_inputs (dataset_id, input_key);
+            CREATE INDEX IF NOT EXISTS idx_snapshot_inputs_snapshot ON snapshot_inputs (snapshot_id);
+        """)
+        # Files created before retries were delayed have no available_at column
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "available_at" not in columns:
+            try:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN available_at REAL")
+            except sqlite3.OperationalError as e:
+                # Another process added it first
+                if "duplicate column" not in str(e):
+                    raise
+
+    @staticmethod
+    def _job(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        for field in ("input", "state", "result"):
+            if job[field] is not None:
+                job[field] = json.loads(job[field])
+        return job
+
+    # ------------------------------------------------------------------ snapshots
+
+    def record_trigger(self, snapshot_id: str, dataset_id: str, inputs: List[Dict[str, Any]],
+                       input_keys: Sequence[Any], params: Optional[Dict[str, Any]] = None,
+                       job_id: Optional[str] = None):
+        """
+        Remember a /trigger call so its snapshot can be resumed after a restart
+
+        Args:
+            snapshot_id: Snapshot ID returned by /trigger
+            dataset_id: Dataset the trigger was sent to
+            inputs: The trigger payload
+            input_keys: Keys the snapshot can be found by (per-input routing keys and/or input_set_key())
+            params: Extra /trigger query params (dataset_id excluded)
+            job_id: Job that triggered it, if any
+        """
+        params_text = _dumps({k: v for k, v in (params or {}).items() if k != "dataset_id"})
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO snapshots (snapshot_id, dataset_id, params, inputs, status, job_id, "
+                    "created_at, updated_at) VALUES (?, ?, ?, ?, 'running', ?, ?, ?)",
+                    (snapshot_id, dataset_id, params_text, _dumps(inputs), job_id, now, now)
+                )
+                self._conn.executemany(
+                    "INSERT INTO snapshot_inputs (snapshot_id, dataset_id, params, input_key) VALUES (?, ?, ?, ?)",
+                    [(snapshot_id, dataset_id, params_text, input_key_for(key)) for key in input_keys]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def update_snapshot(self, snapshot_id: str, status: str):
+        """
+        Set a snapshot's status ("ready", "failed", or "collected" once its records were downloaded)
+
+        A failed / collected snapshot is never reused, so its input keys are dropped with it.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("UPDATE snapshots SET status = ?, updated_at = ? WHERE snapshot_id = ?",
+                                   (status, time.time(), snapshot_id))
+                if status not in LIVE_SNAPSHOT_STATUSES:
+                    self._conn.execute("DELETE FROM snapshot_inputs WHERE snapshot_id = ?", (snapshot_id,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def find_snapshot(self, dataset_id: str, key: Any, params: Optional[Dict[str, Any]] = None,
+                      max_age: float = SNAPSHOT_REUSE_MAX_AGE) -> Optional[Dict[str, Any]]:
+        """
+        Newest running / ready snapshot that already covers an input
+
+        Args:
+            dataset_id: Dataset ID
+            key: Routing key of the input, or an input_set_key()
+            params: Extra /trigger query params the snapshot must have been triggered with
+            max_age: Ignore snapshots triggered longer ago than this (seconds)
+
+        Returns:
+            Dict with snapshot_id, status and created_at, or None
+        """
+        params_text = _dumps({k: v for k, v in (params or {}).items() if k != "dataset_id"})
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT s.snapshot_id, s.status, s.created_at FROM snapshot_inputs i "
+                "JOIN snapshots s ON s.snapshot_id = i.snapshot_id "
+                "WHERE i.dataset_id = ? AND i.input_key = ? AND i.params = ? "
+                f"AND s.status IN ({', '.join('?' * len(LIVE_SNAPSHOT_STATUSES))}) AND s.created_at >= ? "
+                "ORDER BY s.created_at DESC LIMIT 1",
+                (dataset_id, input_key_for(key), params_text, *LIVE_SNAPSHOT_STATUSES, time.time() - max_age)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def pending_snapshots(self, dataset_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Snapshots that were triggered but never reported ready / failed"""
+        query = "SELECT * FROM snapshots WHERE status = 'running'"
+        args: tuple = ()
+        if dataset_id:
+            query += " AND dataset_id = ?"
+            args = (dataset_id,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created_at", args).fetchall()
+        return [dict(row, inputs=json.loads(row["inputs"]), params=json.loads(row["params"])) for row in rows]
+
+    # ------------------------------------------------------------------ jobs
+
+    def enqueue(self, kind: str, key: str, payload: Any) -> str:
+        """
+        Add a job unless the same kind / key is already queued
+
+        Args:
+            kind: Job type (e.g. "email_pipeline", "name_discovery")
+            key: Identity of the input within its kind (e.g. the email address)
+            payload: JSON-serializable job input
+
+        Returns:
+            The job_id (existing jobs keep their status and checkpoints)
+        """
+        job_id = f"{kind}:{hashlib.sha256(key.encode('utf-8')).hexdigest()[:24]}"
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (job_id, kind, input_key, input, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'pending', ?, ?)",
+                (job_id, kind, key, _dumps(payload), now, now)
+            )
+        return job_id
+
+    def claim(self, kind: str, worker_id: str, lease_seconds: float = 900) -> Optional[Dict[str, Any]]:
+        """
+        Take the oldest pending job (or one whose worker's lease ran out)
+
+        Returns:
+            The job dict (input / state decoded from JSON), or None when the queue is empty
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT job_id FROM jobs WHERE kind = ? AND ((status = 'pending' "
+                    "AND (available_at IS NULL OR available_at <= ?)) "
+                    "OR (status = 'running' AND lease_until < ?)) ORDER BY created_at LIMIT 1",
+                    (kind, now, now)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1, "
+                    "updated_at = ? WHERE job_id = ?",
+                    (worker_id, now + lease_seconds, now, row["job_id"])
+                )
+                job = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self._job(job)
+
+    def extend_leases(self, job_ids: Sequence[str], worker_id: str, lease_seconds: float = 900):
+        """Keep jobs owned by a live worker from being claimed by another one"""
+        until = time.time() + lease_seconds
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE jobs SET lease_until = ? WHERE job_id = ? AND worker = ? AND status = 'running'",
+                [(until, job_id, worker_id) for job_id in job_ids]
+            )
+
+    def checkpoint(self, job_id: str, stage: str, state: Any):
+        """Store the state after a finished stage (the job resumes after this stage)"""
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET stage = ?, state = ?, updated_at = ? WHERE job_id = ?",
+                               (stage, _dumps(state), time.time(), job_id))
+
+    def complete(self, job_id: str, result: Any = None):
+        """Mark a job done and store its result"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE job_id = ?",
+                (_dumps(result), time.time(), job_id)
+            )
+
+    def fail(self, job_id: str, error: str, retry: bool = True, retry_delay: float = 0):
+        """
+        Record an error; the job goes back to the queue (keeping its checkpoint) when retry is True
+
+        Args:
+            job_id: Failed job
+            error: Error message stored on the job
+            retry: Re-queue the job instead of marking it failed
+            retry_delay: Seconds before the re-queued job can be claimed again
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_until = NULL, available_at = ?, updated_at = ? "
+                "WHERE job_id = ?",
+                ("pending" if retry else "failed", error, now + retry_delay if retry else None, now, job_id)
+            )
+
+    def next_retry_at(self, kind: str) -> Optional[float]:
+        """When the earliest delayed retry of a kind becomes claimable (None when no retry is waiting)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(available_at) FROM jobs WHERE kind = ? AND status = 'pending' AND available_at > ?",
+                (kind, time.time())
+            ).fetchone()
+        return row[0]
+
+    def requeue_running(self, kind: Optional[str] = None) -> int:
+        """
+        Put every 'running' job back to 'pending' right away
+
+        Only call this when no other worker is alive (e.g. after restarting the
+        single notebook kernel); otherwise expired leases are reclaimed anyway.
+        """
+        query = "UPDATE jobs SET status = 'pending', lease_until = NULL, available_at = NULL WHERE status = 'running'"
+        args: tuple = ()
+        if kind:
+            query += " AND kind = ?"
+            args = (kind,)
+        with self._lock:
+            return self._conn.execute(query, args).rowcount
+
+    def prune(self, max_age: float = PRUNE_MAX_AGE) -> Dict[str, int]:
+        """
+        Delete done / failed jobs and finished or expired snapshots last updated longer ago than max_age
+
+        Returns:
+            Number of deleted jobs and snapshots
+        """
+        cutoff = time.time() - max_age
+        live = ", ".join("?" * len(LIVE_SNAPSHOT_STATUSES))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                jobs = self._conn.execute(
+                    "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (cutoff,)
+                ).rowcount
+                # Live snapshots past the reuse window are never looked up again either
+                stale = ("(status NOT IN ({live}) AND updated_at < ?) OR created_at < ?").format(live=live)
+                stale_args = (*LIVE_SNAPSHOT_STATUSES, cutoff, time.time() - max(max_age, SNAPSHOT_REUSE_MAX_AGE))
+                self._conn.execute(
+                    f"DELETE FROM snapshot_inputs WHERE snapshot_id IN (SELECT snapshot_id FROM snapshots WHERE {stale})",
+                    stale_args
+                )
+                snapshots = self._conn.execute(f"DELETE FROM snapshots WHERE {stale}", stale_args).rowcount
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if jobs or snapshots:
+            log.info(f"🧹 Pruned {jobs} finished jobs and {snapshots} snapshots")
+        return {"jobs": jobs, "snapshots": snapshots}
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._job(row)
+
+    def jobs(self, kind: Optional[str] = None, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Jobs filtered by kind / status, oldest first"""
+        clauses, args = [], []
+        if kind:
+            clauses.append("kind = ?")
+            args.append(kind)
+        if status:
+            clauses.append("status = ?")
+            args.append(status)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT * FROM jobs{where} ORDER BY created_at", args).fetchall()
+        return [self._job(row) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """Job counts per kind / status and snapshot counts per status"""
+        with self._lock:
+            jobs = self._conn.execute("SELECT kind, status, COUNT(*) FROM jobs GROUP BY kind, status").fetchall()
+            snapshots = self._conn.execute("SELECT status, COUNT(*) FROM snapshots GROUP BY status").fetchall()
+        counts: Dict[str, Dict[str, int]] = {}
+        for kind, status, count in jobs:
+            counts.setdefault(kind, {})[status] = count
+        return {"jobs": counts, "snapshots": {status: count for status, count in snapshots}}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobRunner:
+    def __init__(self,
+                 store: JobStore,
+                 kind: str,
+                 stages: List[Any],
+                 input_key: str = "input",
+                 encode: Callable[[Dict[str, Any]], Any] = encode_state,
+                 decode: Callable[[Any], Dict[str, Any]] = decode_state,
+                 finish: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 reuse: Optional[Callable[[Any], Optional[Any]]] = None,
+                 worker_id: Optional[str] = None,
+                 lease_seconds: float = 900,
+                 max_attempts: int = 3,
+                 retry_backoff: float = 30,
+                 max_retry_backoff: float = 900):
+        """
+        Worker that drains one kind of job from a JobStore, resuming from checkpoints
+
+        Args:
+            store: JobStore holding the queue
+            kind: Job kind this runner processes
+            stages: Ordered batch_engine.Stage objects (sync or async funcs returning new state values)
+            input_key: State key the job input is stored under before the first stage
+            encode: Turns the state into JSON for checkpoints (default handles Pydantic models)
+            decode: Rebuilds the state from a checkpoint (pass the pipeline's model classes)
+            finish: Builds the stored job result from the final state (defaults to the encoded state)
+            reuse: Returns an already known result for an input, finishing the job without any stage
+            worker_id: Name recorded on claimed jobs (defaults to host:pid)
+            lease_seconds: How long a claimed job stays reserved; renewed while the job runs
+            max_attempts: Failed jobs are retried (from their last checkpoint) up to this many times
+            retry_backoff: Seconds before the first retry of a failed job; doubles with every attempt
+            max_retry_backoff: Longest delay between two attempts
+        """
+        self.store = store
+        self.kind = kind
+        self.stages = stages
+        self.input_key = input_key
+        self.encode = encode
+        self.decode = decode
+        self.finish = finish
+        self.reuse = reuse
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+
+        self._active: Dict[str, str] = {}   # job_id -> worker id of the thread running it
+        self._lock = threading.Lock()
+        self.stats = {"claimed": 0, "completed": 0, "failed": 0, "resumed": 0, "reused": 0}
+
+    def _run_stage(self, stage, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with get_tracer().span(f"stage.{stage.name}"):
+            outputs = stage.func(state)
+            if inspect.isawaitable(outputs):
+                outputs = asyncio.run(outputs)
+        return outputs
+
+    def run_job(self, job: Dict[str, Any]) -> Optional[Any]:
+        """
+        Run the stages a claimed job has not finished yet
+
+        Returns:
+            The job result, or None if a stage failed (the job is re-queued or marked failed)
+        """
+        with run_context(job["input_key"]), get_tracer().span("job", kind=self.kind, attempt=job["attempts"]):
+            return self._run_job(job)
+
+    def _run_job(self, job: Dict[str, Any]) -> Optional[Any]:
+        job_id = job["job_id"]
+
+        if job["stage"] is None and self.reuse is not None:
+            reused = self.reuse(job["input"])
+            if reused is not None:
+                self.stats["reused"] += 1
+                self.store.complete(job_id, reused)
+                return reused
+
+        state = self.decode(job["state"]) if job["state"] is not None else {self.input_key: job["input"]}
+        names = [stage.name for stage in self.stages]
+        start = names.index(job["stage"]) + 1 if job["stage"] in names else 0
+        if start:
+            self.stats["resumed"] += 1
+            log.info(f"♻️ Resuming job {job['input_key']} after stage '{job['stage']}'")
+
+        for stage in self.stages[start:]:
+            try:
+                outputs = self._run_stage(stage, state)
+            except Exception as e:
+                retry = job["attempts"] < self.max_attempts
+                delay = min(self.retry_backoff * 2 ** max(job["attempts"] - 1, 0), self.max_retry_backoff)
+                self.stats["failed"] += 1
+                log.error(f"❌ Job {job['input_key']} failed in stage '{stage.name}': {e}"
+                          f"{f' (will retry in {delay:.0f}s)' if retry else ''}")
+                self.store.fail(job_id, f"{stage.name}: {e}", retry=retry, retry_delay=delay)
+                return None
+
+            if outputs:
+                state.update(outputs)
+            self.store.checkpoint(job_id, stage.name, self.encode(state))
+
+        result = self.finish(state) if self.finish else self.encode(state)
+        self.store.complete(job_id, result)
+        self.stats["completed"] += 1
+        return result
+
+    def _heartbeat(self, stop: threading.Event):
+        while not stop.wait(self.lease_seconds / 3):
+            with self._lock:
+                active = list(self._active.items())
+            for job_id, worker_id in active:
+                self.store.extend_leases([job_id], worker_id, self.lease_seconds)
+
+    def _work(self, worker_id: str, max_jobs: Optional[int], wait_for_jobs: bool,
+              idle_interval: float, stop: threading.Event) -> int:
+        done = 0
+        while not stop.is_set() and (max_jobs is None or done < max_jobs):
+            job = self.store.claim(self.kind, worker_id, self.lease_seconds)
+            if job is None:
+                retry_at = self.store.next_retry_at(self.kind)
+                if retry_at is not None:
+                    # Failed jobs are still due for a retry; wait for the earliest one
+                    delay = max(retry_at - time.time(), 0.05)
+                    stop.wait(min(delay, idle_interval) if wait_for_jobs else delay)
+                    continue
+                if not wait_for_jobs:
+                    break
+                stop.wait(idle_interval)
+                continue
+
+            self.stats["claimed"] += 1
+            with self._lock:
+                self._active[job["job_id"]] = worker_id
+            try:
+                self.run_job(job)
+            finally:
+                with self._lock:
+                    self._active.pop(job["job_id"], None)
+            done += 1
+        return done
+
+    def run(self, workers: int = 1, max_jobs: Optional[int] = None, wait_for_jobs: bool = False,
+            idle_interval: float = 5.0, stop: Optional[threading.Event] = None) -> Dict[str, int]:
+        """
+        Process queued jobs with a pool of worker threads
+
+        Start the same runner in several processes (pointing at one SQLite file)
+        to scale out; each claim is atomic, so no job runs twice at a time.
+
+        Args:
+            workers: Worker threads in this process
+            max_jobs: Stop each worker after this many jobs (None = until the queue is empty)
+            wait_for_jobs: Keep polling for new jobs instead of returning once the queue is empty
+            idle_interval: Seconds between queue checks while waiting for jobs
+            stop: Event that ends a long-lived run
+
+        Returns:
+            Runner stats (claimed, completed, failed, resumed, reused)
+        """
+        stop = stop or threading.Event()
+        self.store.prune()
+        heartbeat_stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(heartbeat_stop,), daemon=True)
+        heartbeat.start()
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(self._work, f"{self.worker_id}:{index}", max_jobs, wait_for_jobs,
+                                    idle_interval, stop)
+                    for index in range(workers)
+                ]
+                for future in futures:
+                    future.result()
+        finally:
+            heartbeat_stop.set()
+
+        log.info(f"🏁 Worker {self.worker_id} finished: {self.stats}")
+        return dict(self.stats)
+
+
+_stores: Dict[str, JobStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_job_store(path: str = DEFAULT_JOBS_PATH) -> JobStore:
+    """Return the shared job store for a file path (opened on first use)"""
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = JobStore(path)
+            _stores[path] = store
+        return store
@@ -0,0 +1,59 @@
+"""
+Pydantic models passed between the email -> summary pipeline stages
+
+Shared by the notebook's LangChain chains, the LangChain-free EmailPipeline
+and the Serper / Bright Data clients; job checkpoints are decoded back into
+these models (job_store.decode_state).
+"""
+
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class DomainOutput(BaseModel):
+    domain: str = Field(description="Extracted domain from email")
+    original_email: str = Field(description="Original email address")
+
+
+class SearchQueryOutput(BaseModel):
+    search_query: str = Field(description="Optimized search query for the domain")
+    domain: str = Field(description="Domain being searched")
+
+
+class SearchResult(BaseModel):
+    title: str = Field(description="Title of the search result")
+    url: str = Field(description="URL of the search result")
+    snippet: str = Field(description="Description/snippet of the search result")
+
+
+class SearchResultsOutput(BaseModel):
+    results: List[SearchResult] = Field(description="List of top 5 search results")
+    query_used: str = Field(description="Search query that was used")
+    knowledge_graph: dict = Field(default_factory=dict, description="Serper knowledgeGraph block (if any)")
+    related_searches: List[str] = Field(default_factory=list, description="Related search queries")
+    extras: dict = Field(default_factory=dict, description="Other response blocks (peopleAlsoAsk, places, ...)")
+
+
+class URLSelectionOutput(BaseModel):
+    selected_url: str = Field(description="The best URL selected by Gemini")
+    reasoning: str = Field(description="Reasoning for URL selection")
+    confidence_score: float = Field(description="Confidence score (0-1)")
+
+
+class ScrapedContentOutput(BaseModel):
+    url: str = Field(description="URL that was scraped")
+    html_content: str = Field(description="Raw HTML content from the page")
+    scrape_status: str = Field(description="Status of scraping operation")
+
+
+class FinalSummaryOutput(BaseModel):
+    summary: str = Field(description="One-line summary of the website")
+    url: str = Field(description="URL of the summarized website")
+    domain: str = Field(description="Domain of the website")
+    timestamp: str = Field(description="When the analysis was completed")
+
+
+# Every model a pipeline state can hold (for job_store.decode_state)
+PIPELINE_MODELS = [DomainOutput, SearchQueryOutput, SearchResult, SearchResultsOutput,
+                   URLSelectionOutput, ScrapedContentOutput, FinalSummaryOutput]
@@ -0,0 +1,1005 @@
+"""
+LinkedIn people discovery by name with company-regex filtering
+
+BrightDataLinkedInNameScraper triggers Bright Data "discover by name" jobs,
+streams the snapshot records as they arrive, filters them on a company regex
+and a quality score and terminates early once good matches are in.
+discover_linkedin_profiles_with_smart_termination() (one company pattern) and
+discover_linkedin_profiles_for_targets() (a pattern per person) are the entry
+points used by regex_name_scraper.py, the batch CLI and the benchmarks. With
+an EntityResolver, results are returned as one canonical record per person,
+merged with every duplicate seen in earlier runs.
+"""
+
+import re
+import time
+from concurrent.futures import TimeoutError as FuturesTimeoutError, wait as wait_for_futures
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from scraping_core.company_matcher import MultiPatternMatcher
+from scraping_core.entity_resolution import EntityResolver
+from scraping_core.http_client import http_post
+from scraping_core.job_store import JobStore, input_set_key
+from scraping_core.profile_store import ProfileStore
+from scraping_core.profile_scoring import BulkProfileScorer, TopKProfiles, company_mentions, new_records
+from scraping_core.snapshot_adapter import get_snapshot_adapter
+from scraping_core.snapshot_poller import get_snapshot_poller
+from scraping_core.snapshot_stream import JsonlWriter, timestamped_record
+from scraping_core.telemetry import estimate_cost, get_logger, get_tracer, run_context, traced
+from scraping_core.trigger_coalescer import RESULT_GRACE_SECONDS, get_trigger_coalescer, person_key
+from scraping_core.webhook_receiver import webhook_trigger_params
+
+log = get_logger("name_scraper")
+
+# Stored profiles younger than this let a discovery skip Bright Data entirely
+KNOWN_PROFILE_MAX_AGE = 30 * 24 * 60 * 60
+
+
+def people_run_id(people: List[Dict[str, str]]) -> str:
+    """Run id for telemetry spans: the names being discovered"""
+    return ", ".join(f"{person.get('first_name', '')} {person.get('last_name', '')}".strip() for person in people)
+
+
+class BrightDataLinkedInNameScraper:
+    def __init__(self, api_token: str, dataset_id: str = "gd_l1viktl72bvl7bjuj0",
+                 job_store: Optional[JobStore] = None, profile_store: Optional[ProfileStore] = None,
+                 entity_resolver: Optional[EntityResolver] = None):
+        """
+        Initialize LinkedIn name-based scraper with Bright Data API
+
+        Args:
+            api_token: Your Bright Data API token
+            dataset_id: Your LinkedIn scraper dataset ID
+            job_store: Optional JobStore recording triggered snapshots so they can be resumed
+            profile_store: Optional ProfileStore discovered profiles are kept in (and looked up from)
+            entity_resolver: Optional EntityResolver merging duplicate profiles across runs
+        """
+        self.api_token = api_token
+        self.dataset_id = dataset_id
+        self.headers = {
+            "Authorization": f"Bearer {api_token}",
+            "Content-Type": "application/json"
+        }
+        # 🔧 FIXED: Removed trailing space in base_url
+        self.base_url = "https://api.brightdata.com/datasets/v3"
+        self.poller = get_snapshot_poller(api_token, self.base_url)
+        # Learns the dataset's working download endpoint and payload shape once, then decodes directly
+        self.snapshots = get_snapshot_adapter(api_token, dataset_id, self.base_url)
+        # Scores / regex matches are cached per profile, so repeated polls only evaluate new records
+        self.scorer = BulkProfileScorer()
+        self.job_store = job_store
+        self.profile_store = profile_store
+        self.entity_resolver = entity_resolver
+
+    def trigger_name_discovery(self, people: List[Dict[str, str]],
+                             additional_params: Optional[Dict] = None) -> Dict:
+        """
+        Trigger LinkedIn profile discovery using names
+
+        Args:
+            people: List of dictionaries with 'first_name' and 'last_name'
+            additional_params: Optional additional search parameters (company, location, etc.)
+
+        Returns:
+            API response with job details including snapshot_id
+        """
+        # Validate input data
+        if not people:
+            return {"error": "Empty people list provided"}
+
+        for person in people:
+            if 'first_name' not in person or 'last_name' not in person:
+                return {"error": "Each person must have 'first_name' and 'last_name'"}
+
+        api_url = f"{self.base_url}/trigger"
+        params = self.discovery_params(additional_params)
+
+        log.info(f"🔍 Triggering LinkedIn name discovery for {len(people)} people...")
+        for i, person in enumerate(people, 1):
+            name_display = f"{person['first_name']} {person['last_name']}"
+            # Add company/location if provided in person data
+            if 'company' in person:
+                name_display += f" (Company: {person['company']})"
+            if 'location' in person:
+                name_display += f" (Location: {person['location']})"
+            log.info(f"   {i}. {name_display}")
+
+        log.debug(f"API URL: {api_url}")
+        log.debug(f"Dataset ID: {self.dataset_id}")
+        log.debug(f"Search parameters: {params}")
+
+        try:
+            with get_tracer().span("brightdata.trigger", dataset_id=self.dataset_id, inputs=len(people)) as span:
+                response = http_post(api_url, headers=self.headers, json=people,
+                                     params=dict(params, **webhook_trigger_params()))
+                span.set(status_code=response.status_code)
+
+            log.debug(f"Response status: {response.status_code}")
+
+            if response.status_code in [200, 201, 202]:
+                result = response.json()
+                log.info(f"✅ Name discovery job triggered successfully!")
+                log.info(f"Snapshot ID: {result.get('snapshot_id')}")
+                if self.job_store is not None and result.get('snapshot_id'):
+                    self.job_store.record_trigger(result['snapshot_id'], self.dataset_id, people,
+                                                  [input_set_key(people)], params)
+                return result
+            else:
+                log.error(f"❌ Request failed: {response.status_code}")
+                log.error(f"Response: {response.text}")
+                return {"error": f"HTTP {response.status_code}", "details": response.text}
+
+        except Exception as e:
+            log.error(f"❌ Error triggering discovery: {e}")
+            return {"error": str(e)}
+
+    def discovery_params(self, additional_params: Optional[Dict] = None) -> Dict:
+        """/trigger query params for name discovery (dataset_id plus any additional search params)"""
+        params = {
+            "dataset_id": self.dataset_id,
+            "include_errors": "true",
+            "type": "discover_new",
+            "discover_by": "name"
+        }
+
+        # Add any additional search parameters
+        if additional_params:
+            params.update(additional_params)
+        return params
+
+    def resume_or_trigger_discovery(self, people: List[Dict[str, str]],
+                                    additional_params: Optional[Dict] = None) -> Dict:
+        """
+        Reuse a running / ready snapshot for exactly these people and params, or trigger a new one
+
+        After a restart (or a timed-out wait) this picks the earlier snapshot_id
+        back up from the job store instead of paying for the same discovery again.
+
+        Returns:
+            Same dict as trigger_name_discovery(), with 'resumed': True for a reused snapshot
+        """
+        if self.job_store is not None and people:
+            existing = self.job_store.find_snapshot(self.dataset_id, input_set_key(people),
+                                                    self.discovery_params(additional_params))
+            if existing is not None:
+                log.info(f"♻️ Resuming discovery snapshot {existing['snapshot_id']} ({existing['status']})")
+                return {"snapshot_id": existing['snapshot_id'], "resumed": True}
+
+        return self.trigger_name_discovery(people, additional_params)
+
+    def record_snapshot_status(self, snapshot_id: str, status: str):
+        """Store a finished snapshot's status (timeouts stay 'running' so a later call can resume them)"""
+        if self.job_store is not None and status in ('ready', 'failed'):
+            self.job_store.update_snapshot(snapshot_id, status)
+
+    def discover_people_batched(self, people: List[Dict[str, str]],
+                                additional_params: Optional[Dict] = None,
+                                max_wait: int = 600,
+                                window_seconds: float = 2.0,
+                                max_batch_size: int = 50) -> Optional[List[Dict]]:
+        """
+        Discover people through the shared TriggerCoalescer
+
+        Concurrent callers (threads, batch workers) with the same search parameters
+        are packed into one /trigger call. Each caller only gets back the records
+        routed to its own people.
+
+        Args:
+            people: List of dictionaries with 'first_name' and 'last_name'
+            additional_params: Optional additional search parameters (location, etc.)
+            max_wait: Maximum wait time in seconds
+            window_seconds: How long to collect people from other callers before triggering
+            max_batch_size: Trigger immediately once this many people are queued
+
+        Returns:
+            Discovered profiles for these people, or None if the job failed
+        """
+        trigger_params = {
+            "include_errors": "true",
+            "type": "discover_new",
+            "discover_by": "name"
+        }
+        if additional_params:
+            trigger_params.update(additional_params)
+
+        coalescer = get_trigger_coalescer(
+            self.api_token,
+            self.dataset_id,
+            trigger_params=trigger_params,
+            key_fn=person_key,
+            window_seconds=window_seconds,
+            max_batch_size=max_batch_size,
+            max_wait=max_wait,
+            base_url=self.base_url,
+            poller=self.poller,
+            job_store=self.job_store
+        )
+
+        log.info(f"🔍 Queueing {len(people)} people for batched name discovery...")
+        futures = [coalescer.submit(person) for person in people]
+
+        profiles = []
+        for person, future in zip(people, futures):
+            try:
+                outcome = future.result(timeout=max_wait + window_seconds + RESULT_GRACE_SECONDS)
+            except FuturesTimeoutError:
+                outcome = {'status': 'timeout', 'records': []}
+            if outcome['status'] != 'success':
+                log.error(f"❌ Discovery for {person['first_name']} {person['last_name']} ended with: {outcome['status']}")
+                return None
+            profiles.extend(outcome['records'])
+
+        log.info(f"✅ Batched discovery returned {len(profiles)} profiles")
+        return profiles
+
+    @traced("brightdata.partial_results")
+    def check_partial_results(self, snapshot_id: str) -> Tuple[Optional[List[Dict]], bool]:
+        """
+        Check for partial results from an ongoing job
+
+        Returns:
+            Tuple of (partial_data, job_complete)
+        """
+        try:
+            # 200 answers are decoded with the dataset's known shape; 202 answers may carry partial records
+            return self.snapshots.poll_records(snapshot_id)
+
+        except Exception as e:
+            log.warning(f"⚠️ Error checking partial results: {e}")
+            return None, False
+
+    def stream_snapshot(self, snapshot_id: str, stats: Optional[Dict[str, int]] = None) -> Iterator[Dict]:
+        """
+        Stream a finished snapshot, yielding one profile at a time
+
+        Args:
+            snapshot_id: The snapshot ID to download
+            stats: Optional dict updated with downloaded "bytes" and "records"
+        """
+        return self.snapshots.iter_records(snapshot_id, stats=stats)
+
+    def stream_matching_profiles(self, snapshot_id: str, pattern, pattern_str: str,
+                                 output_path: Optional[str] = None,
+                                 batch_size: int = 500) -> Iterator[Dict]:
+        """
+        Filter and score a finished snapshot record by record as it downloads
+
+        Only profiles matching the company regex are kept in memory (and appended
+        to output_path as JSON Lines when given); everything else is dropped as soon
+        as it has been checked.
+
+        Args:
+            snapshot_id: The snapshot ID to download
+            pattern: Pre-compiled company regex
+            pattern_str: Original regex string (for display)
+            output_path: Optional JSONL file matches are appended to
+            batch_size: Records filtered / scored together in one bulk pass
+
+        Yields:
+            Matching profiles with '_company_matches' and '_quality_score' set
+        """
+        stats = {}
+        started = time.time()
+        writer = JsonlWriter(output_path) if output_path else None
+
+        def process(batch: List[Dict]) -> List[Dict]:
+            matches = self.filter_profiles_by_company_regex(batch, pattern, pattern_str)
+            for profile, score in zip(matches, self.scorer.score(matches)):
+                profile['_quality_score'] = score
+                if writer:
+                    writer.write(timestamped_record(profile))
+            return matches
+
+        try:
+            batch = []
+            for profile in self.stream_snapshot(snapshot_id, stats):
+                if isinstance(profile, dict):
+                    batch.append(profile)
+                if len(batch) >= batch_size:
+                    yield from process(batch)
+                    batch = []
+            if batch:
+                yield from process(batch)
+        finally:
+            if writer:
+                writer.close()
+            get_tracer().record("brightdata.download", time.time() - started, snapshot_id=snapshot_id,
+                                bytes=stats.get('bytes', 0), records=stats.get('records', 0),
+                                cost_usd=estimate_cost("brightdata", records=stats.get('records', 0)))
+            log.info(f"📥 Streamed {stats.get('records', 0)} profiles ({stats.get('bytes', 0)} bytes)")
+
+    def calculate_quality_score(self, profile: Dict) -> int:
+        """
+        Enhanced quality scoring system for profile completeness (1-10 scale)
+
+        Focuses on actual profile data completeness rather than just connections.
+        The scoring rules live in scraping_core.profile_scoring (FEATURE_WEIGHTS);
+        use filter_quality_profiles to score many profiles in one bulk pass.
+        """
+        return self.scorer.score([profile])[0]
+
+    def filter_quality_profiles(self, profiles: List[Dict], min_quality_score: int = 3) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Filter profiles based on quality score and return both high and low quality lists
+
+        Args:
+            profiles: List of discovered profiles
+            min_quality_score: Minimum score to be considered high-quality (1-10 scale)
+
+        Returns:
+            Tuple of (high_quality_profiles, low_quality_profiles)
+        """
+        if not profiles:
+            return [], []
+
+        # One vectorized pass; profiles already scored in an earlier poll are looked up
+        return self.scorer.split_by_quality(profiles, min_quality_score)
+
+    @traced("discovery.wait_with_early_termination")
+    def wait_with_early_termination(self,
+                                  snapshot_id: str,
+                                  company_pattern: Union[str, re.Pattern],
+                                  case_sensitive: bool = False,
+                                  min_quality_score: int = 4,  # Increased default threshold
+                                  max_wait: int = 600,
+                                  check_interval: int = 15,
+                                  early_check_interval: int = 5,
+                                  output_path: Optional[str] = None,
+                                  top_k: int = 50) -> Optional[List[Dict]]:
+        """
+        Wait for job completion with early termination when high-quality matches are found
+
+        Args:
+            snapshot_id: The snapshot ID to wait for
+            company_pattern: Regex pattern for company filtering (or an already compiled one)
+            case_sensitive: Whether regex should be case sensitive (ignored for a compiled pattern)
+            min_quality_score: Minimum score to trigger early termination (1-10 scale)
+            max_wait: Maximum wait time in seconds
+            check_interval: Longest gap between two job status checks (shared poller)
+            early_check_interval: Frequent check interval for early results
+            output_path: Optional JSONL file the final matches are appended to while streaming
+            top_k: How many of the best early matches to keep (and return on early termination)
+
+        Returns:
+            List of matching profiles or None
+        """
+        start_time = time.time()
+
+        # Compile regex pattern (callers that already compiled it pass the pattern object)
+        if isinstance(company_pattern, re.Pattern):
+            pattern = company_pattern
+            company_pattern = pattern.pattern
+        else:
+            flags = 0 if case_sensitive else re.IGNORECASE
+            try:
+                pattern = re.compile(company_pattern, flags)
+            except re.error as e:
+                log.error(f"❌ Invalid regex pattern '{company_pattern}': {e}")
+                return None
+
+        # Cached scores belong to one snapshot (a record id seen before may now be complete)
+        self.scorer.reset()
+
+        log.info(f"⚡ Smart waiting with early termination enabled")
+        log.info(f"   Target company pattern: '{company_pattern}'")
+        log.info(f"   Minimum quality score for early termination: {min_quality_score}/10")
+        log.info(f"   Early check interval: {early_check_interval}s")
+
+        attempts = 0
+        seen_records = set()            # Profile ids / URLs already evaluated in an earlier check
+        best_matches = []               # Every company match found so far
+        top_matches = TopKProfiles(top_k)
+
+        # The shared poller tracks job completion; early checks below only look at partial data
+        completion = self.poller.track(snapshot_id, max_wait=max_wait, max_interval=check_interval)
+        try:
+            # Phase 1: Frequent early checks (first 60 seconds)
+            phase1_duration = 60
+            while time.time() - start_time < min(phase1_duration, max_wait):
+                attempts += 1
+                elapsed = int(time.time() - start_time)
+
+                log.info(f"🔍 Early check {attempts} ({elapsed}s) - Looking for quick matches...")
+
+                partial_data, job_complete = self.check_partial_results(snapshot_id)
+
+                if partial_data:
+                    # Only records that arrived since the previous check are filtered and scored
+                    delta = new_records(partial_data, seen_records)
+                    log.info(f"📊 Found {len(partial_data)} profiles so far ({len(delta)} new)...")
+
+                    # Apply company filtering to the new partial results
+                    filtered_profiles = self.filter_profiles_by_company_regex(
+                        delta, pattern, company_pattern
+                    )
+
+                    if filtered_profiles:
+                        for profile, score in zip(filtered_profiles, self.scorer.score(filtered_profiles)):
+                            profile['_quality_score'] = score
+                            top_matches.push(profile, score)
+
+                        # Keep track of any matches, even if not high quality yet
+                        best_matches.extend(filtered_profiles)
+
+                        log.info(f"📋 Quality Analysis: {len(best_matches)} matches so far, best score {top_matches.best_score}/10")
+
+                        if top_matches.best_score >= min_quality_score:
+                            best_match = top_matches.best
+                            high_quality = top_matches.ranked(min_score=min_quality_score)
+                            log.info(f"⚡ HIGH QUALITY MATCH FOUND! Terminating early.")
+                            log.info(f"   Name: {best_match.get('name', 'Unknown')}")
+                            log.info(f"   Quality Score: {best_match['_quality_score']}/10")
+                            current_company = best_match.get('current_company', {})
+                            if isinstance(current_company, dict):
+                                company_name = current_company.get('name', 'N/A')
+                            else:
+                                company_name = str(current_company) if current_company else 'N/A'
+                            log.info(f"   Company: {company_name}")
+                            log.info(f"   Time saved: ~{max_wait - elapsed} seconds")
+                            return high_quality
+
+                if job_complete:
+                    log.info(f"✅ Job completed during early phase!")
+                    if best_matches:
+                        # Apply final quality filtering
+                        high_quality, low_quality = self.filter_quality_profiles(best_matches)
+                        return high_quality if high_quality else best_matches
+                    break
+
+                if completion.done():
+                    break  # Finished between checks: the final snapshot is streamed below
+
+                # Sleep until the next early check, but wake up as soon as the job finishes
+                wait_for_futures([completion], timeout=early_check_interval)
+
+            # Phase 2: Wait on the shared poller if no early termination
+            if best_matches:
+                log.info(f"📈 Continuing with normal checks (found {len(best_matches)} matches)")
+            else:
+                log.info(f"⏳ No early matches found, continuing with normal polling...")
+
+            remaining = max(0.0, max_wait - (time.time() - start_time))
+            try:
+                outcome = completion.result(timeout=remaining)
+            except FuturesTimeoutError:
+                outcome = {"status": "timeout", "polls": 0}
+
+            elapsed = int(time.time() - start_time)
+            log.info(f"📊 Job status: {outcome['status']} after {outcome['polls']} status checks ({elapsed}s elapsed)")
+            self.record_snapshot_status(snapshot_id, outcome['status'])
+
+            if outcome['status'] == 'ready':
+                log.info(f"✅ Discovery job {snapshot_id} completed!")
+
+                try:
+                    # Filter + score each record as it arrives; only matches stay in memory
+                    filtered_results = list(self.stream_matching_profiles(
+                        snapshot_id, pattern, company_pattern, output_path=output_path
+                    ))
+                    if filtered_results:
+                        high_quality, low_quality = self.filter_quality_profiles(filtered_results)
+                        return high_quality if high_quality else filtered_results
+                    return filtered_results
+
+                except Exception as e:
+                    log.warning(f"⚠️ Streaming download failed ({e}), falling back to a full download")
+
+                final_data, _ = self.check_partial_results(snapshot_id)
+
+                if final_data:
+                    # Apply company filtering
+                    filtered_results = self.filter_profiles_by_company_regex(
+                        final_data, pattern, company_pattern
+                    )
+
+                    # Apply quality filtering
+                    if filtered_results:
+                        high_quality, low_quality = self.filter_quality_profiles(filtered_results)
+                        return high_quality if high_quality else filtered_results
+
+                    return filtered_results
+
+            elif outcome['status'] == 'failed':
+                log.error(f"❌ Discovery job {snapshot_id} failed")
+
+            log.warning(f"⏰ Timeout reached, returning best matches found so far")
+            if best_matches:
+                high_quality, low_quality = self.filter_quality_profiles(best_matches)
+                return high_quality if high_quality else best_matches
+            return None
+        finally:
+            # Returning early (or timing out) ends this wait; the snapshot is not polled on our behalf any more
+            self.poller.cancel(snapshot_id, completion, remote=False)
+
+    def route_profiles_to_targets(self, profiles: List[Dict], matcher: MultiPatternMatcher,
+                                  targets_by_person: Dict[str, Set[str]],
+                                  active_targets: Optional[Set[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        Route profiles to every target they satisfy in a single pass
+
+        A profile satisfies a target when it belongs to the target's person (via the
+        echoed input or its own name) and one of its companies matches the target's
+        pattern. A profile whose person is unknown is never given to another person's
+        target: it is only routed when every target belongs to one person.
+
+        Args:
+            profiles: Discovered profiles
+            matcher: Combined matcher over all target company patterns
+            targets_by_person: person_key (normalized first + last name) -> ids of that person's targets
+            active_targets: Only route to these targets (targets that terminated early are skipped)
+
+        Returns:
+            Target id -> matching profiles (tagged with '_company_matches' and '_matched_targets')
+        """
+        routed = {target_id: [] for target_id in (active_targets if active_targets is not None else matcher.patterns)}
+        only_person = next(iter(targets_by_person.values())) if len(targets_by_person) == 1 else None
+
+        for profile in profiles:
+            if not isinstance(profile, dict):
+                continue
+
+            echoed_input = profile.get('input')
+            person = person_key(echoed_input) if isinstance(echoed_input, dict) else None
+            if person not in targets_by_person:
+                person = person_key(profile)
+            candidates = targets_by_person.get(person, only_person)
+            if candidates is None:
+                continue
+
+            match_details = []
+            matched_targets = []
+            for label, company in company_mentions(profile):
+                hits = [
+                    target_id for target_id in matcher.targets_for(company)
+                    if target_id in routed and target_id in candidates
+                ]
+                if hits:
+                    match_details.append(f"{label}: {company}")
+                    matched_targets.extend(t for t in hits if t not in matched_targets)
+
+            if matched_targets:
+                profile['_company_matches'] = match_details
+                profile['_matched_targets'] = matched_targets
+                for target_id in matched_targets:
+                    routed[target_id].append(profile)
+
+        return routed
+
+    @traced("discovery.wait_for_targets")
+    def wait_for_targets(self,
+                         snapshot_id: str,
+                         targets: List[Dict[str, str]],
+                         matcher: MultiPatternMatcher,
+                         min_quality_score: int = 4,
+                         max_wait: int = 600,
+                         check_interval: int = 15,
+                         early_check_interval: int = 5,
+                         output_path: Optional[str] = None,
+                         top_k: int = 50) -> Dict[str, List[Dict]]:
+        """
+        Wait for a multi-target discovery job; every target terminates early on its own
+
+        Each check routes only the new partial records to the targets that are still
+        open. A target is closed as soon as it has a match scoring min_quality_score;
+        polling stops once every target is closed or the job finishes.
+
+        Args:
+            snapshot_id: The snapshot ID to wait for
+            targets: Targets with 'id', 'first_name', 'last_name' and 'company_pattern'
+            matcher: Combined matcher over all target company patterns
+            min_quality_score: Score that closes a target early (1-10 scale)
+            max_wait: Maximum wait time in seconds
+            check_interval: Longest gap between two job status checks (shared poller)
+            early_check_interval: Frequent check interval for early results
+            output_path: Optional JSONL file matches from the streamed final snapshot are appended to
+            top_k: How many of the best matches to keep per closed target
+
+        Returns:
+            Target id -> matching profiles (best first; empty list when nothing matched)
+        """
+        start_time = time.time()
+        self.scorer.reset()
+        targets_by_person: Dict[str, Set[str]] = {}
+        for target in targets:
+            targets_by_person.setdefault(person_key(target), set()).add(target['id'])
+
+        seen_records = set()
+        matches = {target['id']: [] for target in targets}
+        top_matches = {target['id']: TopKProfiles(top_k) for target in targets}
+        open_targets = set(matches)
+
+        def absorb(records: List[Dict], writer: Optional[JsonlWriter] = None):
+            routed = self.route_profiles_to_targets(records, matcher, targets_by_person, open_targets)
+            matched = list({id(p): p for profiles in routed.values() for p in profiles}.values())
+            for profile, score in zip(matched, self.scorer.score(matched)):
+                profile['_quality_score'] = score
+                if writer:
+                    writer.write(timestamped_record(profile))
+
+            for target_id, profiles in routed.items():
+                for profile in profiles:
+                    top_matches[target_id].push(profile, profile['_quality_score'])
+                matches[target_id].extend(profiles)
+
+                if top_matches[target_id].best_score >= min_quality_score:
+                    open_targets.discard(target_id)
+                    best = top_matches[target_id].best
+                    log.info(f"⚡ Target '{target_id}' satisfied: {best.get('name', 'Unknown')} "
+                             f"(Quality Score: {best['_quality_score']}/10)")
+
+        log.info(f"⚡ Multi-target waiting for {len(targets)} targets ({len(matcher)} company patterns)")
+        completion = self.poller.track(snapshot_id, max_wait=max_wait, max_interval=check_interval)
+        try:
+            # Phase 1: Frequent early checks until every target is satisfied
+            attempts = 0
+            phase1_duration = 60
+            job_complete = False
+            while open_targets and time.time() - start_time < min(phase1_duration, max_wait):
+                attempts += 1
+                partial_data, job_complete = self.check_partial_results(snapshot_id)
+
+                if partial_data:
+                    delta = new_records(partial_data, seen_records)
+                    log.info(f"🔍 Early check {attempts}: {len(delta)} new profiles, {len(open_targets)} targets still open")
+                    absorb(delta)
+
+                if job_complete or completion.done():
+                    break
+                wait_for_futures([completion], timeout=early_check_interval)
+
+            # Phase 2: Stream whatever the open targets have not seen yet once the job is done
+            if open_targets and not job_complete:
+                remaining = max(0.0, max_wait - (time.time() - start_time))
+                try:
+                    outcome = completion.result(timeout=remaining)
+                except FuturesTimeoutError:
+                    outcome = {"status": "timeout"}
+
+                log.info(f"📊 Job status: {outcome['status']} ({int(time.time() - start_time)}s elapsed)")
+                self.record_snapshot_status(snapshot_id, outcome['status'])
+
+                if outcome['status'] == 'ready':
+                    writer = JsonlWriter(output_path) if output_path else None
+                    try:
+                        batch, position = [], 0
+                        for record in self.stream_snapshot(snapshot_id):
+                            batch.append(record)
+                            if len(batch) >= 500:
+                                absorb(new_records(batch, seen_records, position), writer)
+                                position += len(batch)
+                                batch = []
+                        if batch:
+                            absorb(new_records(batch, seen_records, position), writer)
+                    except Exception as e:
+                        log.warning(f"⚠️ Streaming download failed: {e}")
+                    finally:
+                        if writer:
+                            writer.close()
+        finally:
+            # Returning early (or timing out) ends this wait; the snapshot is not polled on our behalf any more
+            self.poller.cancel(snapshot_id, completion, remote=False)
+
+        results = {}
+        for target_id, profiles in matches.items():
+            if target_id not in open_targets:
+                results[target_id] = top_matches[target_id].ranked(min_score=min_quality_score)
+            elif profiles:
+                high_quality, low_quality = self.filter_quality_profiles(profiles)
+                results[target_id] = high_quality if high_quality else profiles
+            else:
+                results[target_id] = []
+
+        satisfied = sum(1 for target_id in matches if target_id not in open_targets)
+        log.info(f"🏁 {satisfied}/{len(matches)} targets reached the quality threshold, "
+                 f"{sum(1 for r in results.values() if r)} with matches")
+        return results
+
+    def known_matching_profiles(self, people: List[Dict[str, str]], pattern, pattern_str: str,
+                                min_quality_score: int,
+                                max_age: Optional[float] = KNOWN_PROFILE_MAX_AGE) -> Optional[List[Dict]]:
+        """
+        Stored profiles of these people that match the company regex
+
+        Returns:
+            The matches, or None unless every person has a stored match scoring at
+            least min_quality_score (a discovery only skips Bright Data when nothing is missing)
+        """
+        if self.profile_store is None:
+            return None
+
+        known = []
+        for person in people:
+            stored = self.profile_store.find(first_name=person['first_name'], last_name=person['last_name'],
+                                             min_quality_score=min_quality_score, max_age=max_age, limit=None)
+            matches = self.filter_profiles_by_company_regex(stored, pattern, pattern_str)
+            if not matches:
+                return None
+            known.extend(matches)
+        return known
+
+    def store_profiles(self, profiles: Optional[List[Dict]]) -> int:
+        """Upsert discovered profiles into the profile store (no-op without one)"""
+        if self.profile_store is None or not profiles:
+            return 0
+        return self.profile_store.upsert_many(profiles, dataset_id=self.dataset_id, source="name_discovery")
+
+    def resolve_entities(self, profiles: Optional[List[Dict]]) -> Optional[List[Dict]]:
+        """
+        Collapse profiles into one canonical record per person (unchanged without a resolver)
+
+        Each record is merged with the duplicates of the same person found in this and
+        earlier runs, keeping the fields of the highest-quality one (see EntityResolver).
+        """
+        if self.entity_resolver is None or not profiles:
+            return profiles
+        return self.entity_resolver.resolve(profiles)
+
+    def filter_profiles_by_company_regex(self, profiles: List[Dict], pattern, pattern_str: str) -> List[Dict]:
+        """
+        Filter profiles using pre-compiled regex pattern
+
+        The pattern runs once per distinct company name across the whole batch
+        (current + experience companies); profiles checked before are looked up.
+        """
+        if not profiles:
+            return []
+
+        return self.scorer.filter_by_company(profiles, pattern)
+
+    def display_results_analysis(self, all_results: List[Dict], high_quality: List[Dict], low_quality: List[Dict]):
+        """
+        Display detailed analysis of profile quality
+        """
+        print(f"\n📋 LINKEDIN PROFILE ANALYSIS")
+        print("=" * 50)
+        print(f"Total profiles found: {len(all_results)}")
+        print(f"High-quality profiles: {len(high_quality)}")
+        print(f"Low-quality/skeleton profiles: {len(low_quality)}")
+        duplicates = sum(profile.get('_duplicates', 0) for profile in all_results)
+        if duplicates:
+            print(f"Duplicate records merged: {duplicates}")
+
+        if high_quality:
+            print(f"\n✅ HIGH-QUALITY PROFILES ({len(high_quality)} profiles)")
+            print("-" * 40)
+
+            for i, profile in enumerate(high_quality, 1):
+                print(f"\n👤 PROFILE {i} (Quality Score: {profile['_quality_score']}/10):")
+                print(f"   Name: {profile.get('name', 'N/A')}")
+
+                # Current company
+                current_company = profile.get('current_company', {})
+                if isinstance(current_company, dict):
+                    company_name = current_company.get('name', 'N/A')
+                    position = current_company.get('title', 'N/A')
+                else:
+                    company_name = str(current_company) if current_company else 'N/A'
+                    position = profile.get('position', 'N/A')
+
+                print(f"   Current Company: {'✅' if company_name != 'N/A' else '❌'} {company_name}")
+                print(f"   Position: {'✅' if position != 'N/A' else '❌'} {position}")
+
+                # Additional info
+                about_len = len(profile.get('about', ''))
+                print(f"   About Section: {'✅' if about_len > 50 else '❌'} {about_len} characters")
+
+                experience_count = len(profile.get('experience', []))
+                print(f"   Experience: {'✅' if experience_count > 0 else '❌'} {experience_count} entries")
+
+                followers = profile.get('followers', 0) or profile.get('connections', 0)
+                print(f"   Network: {'✅' if followers else '❌'} {followers} connections/followers")
+
+                print(f"   Profile URL: {profile.get('url', 'N/A')}")
+
+        if low_quality:
+            print(f"\n❌ FILTERED OUT {len(low_quality)} LOW-QUALITY PROFILES:")
+            print("-" * 40)
+            for i, profile in enumerate(low_quality, 1):
+                name = profile.get('name', 'Unknown')
+                profile_id = profile.get('url', 'N/A').split('/')[-1] if profile.get('url') else 'N/A'
+                score = profile.get('_quality_score', 0)
+                print(f"{i}. {name} (ID: {profile_id}, Quality: {score}/10)")
+
+
+def discover_linkedin_profiles_with_smart_termination(
+    api_token: str,
+    dataset_id: str,
+    people: List[Dict[str, str]],
+    company_regex_pattern: str,
+    additional_params: Optional[Dict] = None,
+    case_sensitive: bool = False,
+    min_quality_score: int = 4,  # Increased default to filter out skeleton profiles
+    max_wait: int = 600,
+    coalesce: bool = False,
+    output_path: Optional[str] = None,
+    job_store: Optional[JobStore] = None,
+    profile_store: Optional[ProfileStore] = None,
+    known_max_age: Optional[float] = KNOWN_PROFILE_MAX_AGE,
+    entity_resolver: Optional[EntityResolver] = None
+) -> Optional[List[Dict]]:
+    """
+    Optimized LinkedIn profile discovery with smart early termination and quality filtering
+
+    Args:
+        api_token: Your Bright Data API token
+        dataset_id: Your dataset ID
+        people: List of dictionaries with 'first_name' and 'last_name'
+        company_regex_pattern: Regex pattern to match company names
+        additional_params: Optional global search parameters
+        case_sensitive: Whether company name matching should be case sensitive
+        min_quality_score: Score threshold for early termination (1-10 scale)
+        max_wait: Maximum wait time in seconds
+        coalesce: Share one /trigger call with concurrent callers (disables early termination)
+        output_path: Optional JSONL file matches from the streamed final snapshot are appended to
+        job_store: Optional JobStore; a snapshot already triggered for the same people is resumed
+        profile_store: Optional ProfileStore; results are upserted into it, and when every person
+                       already has a matching stored profile (newer than known_max_age) no job is triggered
+        known_max_age: Maximum age in seconds of stored profiles that can replace a discovery
+        entity_resolver: Optional EntityResolver; duplicates (in the results and from earlier
+                         runs) are merged into one canonical record per person
+
+    Returns:
+        List of filtered profile data or None if failed
+    """
+    with run_context(people_run_id(people)), get_tracer().span("name_discovery", people=len(people)):
+        scraper = BrightDataLinkedInNameScraper(api_token, dataset_id, job_store, profile_store, entity_resolver)
+
+        log.info("⚡ SMART LINKEDIN DISCOVERY WITH QUALITY FILTERING")
+        log.info("=" * 60)
+        log.info(f"Company filter: '{company_regex_pattern}'")
+        log.info(f"Quality threshold: {min_quality_score}/10")
+        log.info(f"Max wait time: {max_wait}s")
+
+        # Remove company filter from API params to get broader initial results
+        api_params = additional_params.copy() if additional_params else {}
+        if 'company' in api_params:
+            api_params.pop('company')
+
+        # Compiled once for the stored-profile lookup and every filter below
+        flags = 0 if case_sensitive else re.IGNORECASE
+        try:
+            pattern = re.compile(company_regex_pattern, flags)
+        except re.error as e:
+            log.error(f"❌ Invalid regex pattern '{company_regex_pattern}': {e}")
+            return None
+
+        known = scraper.known_matching_profiles(people, pattern, company_regex_pattern,
+                                                min_quality_score, known_max_age)
+        if known is not None:
+            log.info(f"♻️ All {len(people)} people already have matching stored profiles - no discovery job needed")
+            return scraper.resolve_entities(known)
+
+        if coalesce:
+            # Batched trigger: the shared snapshot is filtered once it is complete (no early termination)
+            profiles = scraper.discover_people_batched(people, api_params, max_wait=max_wait)
+            if profiles is None:
+                return None
+            scraper.store_profiles(profiles)
+
+            filtered_results = scraper.filter_profiles_by_company_regex(profiles, pattern, company_regex_pattern)
+            if filtered_results:
+                high_quality, low_quality = scraper.filter_quality_profiles(filtered_results, min_quality_score)
+                return scraper.resolve_entities(high_quality if high_quality else filtered_results)
+            return filtered_results
+
+        # Trigger discovery (or pick up the snapshot an interrupted run already started)
+        trigger_result = scraper.resume_or_trigger_discovery(people, api_params)
+
+        if trigger_result.get("error"):
+            log.error("❌ Failed to trigger discovery job")
+            return None
+
+        snapshot_id = trigger_result.get("snapshot_id")
+        if not snapshot_id:
+            log.error("❌ No snapshot ID received")
+            return None
+
+        log.info(f"🚀 Job started: {snapshot_id}")
+
+        # Smart waiting with early termination
+        results = scraper.wait_with_early_termination(
+            snapshot_id=snapshot_id,
+            company_pattern=pattern,
+            min_quality_score=min_quality_score,
+            max_wait=max_wait,
+            output_path=output_path
+        )
+        scraper.store_profiles(results)
+
+        return scraper.resolve_entities(results)
+
+
+def discover_linkedin_profiles_for_targets(
+    api_token: str,
+    dataset_id: str,
+    targets: List[Dict[str, str]],
+    additional_params: Optional[Dict] = None,
+    case_sensitive: bool = False,
+    min_quality_score: int = 4,
+    max_wait: int = 600,
+    output_path: Optional[str] = None,
+    job_store: Optional[JobStore] = None,
+    profile_store: Optional[ProfileStore] = None,
+    entity_resolver: Optional[EntityResolver] = None
+) -> Optional[Dict[str, List[Dict]]]:
+    """
+    Discover many people at once, each with their own company pattern
+
+    All people go into one discovery trigger, all company patterns are compiled
+    into one matcher, and each snapshot record is routed to the targets it
+    satisfies in a single pass. Every target terminates early on its own.
+
+    Args:
+        api_token: Your Bright Data API token
+        dataset_id: Your dataset ID
+        targets: Dicts with 'first_name', 'last_name', 'company_pattern' and an optional 'id'
+                 (defaults to "First Last @ pattern"); other keys (location, ...) are sent as input
+        additional_params: Optional global search parameters
+        case_sensitive: Whether company name matching should be case sensitive
+        min_quality_score: Score that lets a target terminate early (1-10 scale)
+        max_wait: Maximum wait time in seconds
+        output_path: Optional JSONL file matches from the streamed final snapshot are appended to
+        job_store: Optional JobStore; a snapshot already triggered for the same people is resumed
+        profile_store: Optional ProfileStore the matched profiles are upserted into
+        entity_resolver: Optional EntityResolver collapsing each target's matches into one
+                         canonical record per person
+
+    Returns:
+        Target id -> filtered profile data, or None if the job could not be started
+    """
+    prepared = []
+    for target in targets:
+        if not target.get('first_name') or not target.get('last_name') or not target.get('company_pattern'):
+            log.error(f"❌ Each target needs 'first_name', 'last_name' and 'company_pattern': {target}")
+            return None
+        target = dict(target)
+        target.setdefault('id', f"{target['first_name']} {target['last_name']} @ {target['company_pattern']}")
+        prepared.append(target)
+
+    try:
+        matcher = MultiPatternMatcher({t['id']: t['company_pattern'] for t in prepared}, case_sensitive)
+    except re.error as e:
+        log.error(f"❌ Invalid company pattern: {e}")
+        return None
+
+    # One discovery input per distinct person, however many company patterns they have
+    people = {}
+    for target in prepared:
+        person = {k: v for k, v in target.items() if k not in ('id', 'company_pattern')}
+        people.setdefault(person_key(person), person)
+
+    with run_context(people_run_id(list(people.values()))), \
+            get_tracer().span("name_discovery", people=len(people), targets=len(prepared)):
+        scraper = BrightDataLinkedInNameScraper(api_token, dataset_id, job_store, profile_store, entity_resolver)
+
+        log.info("⚡ MULTI-TARGET LINKEDIN DISCOVERY")
+        log.info("=" * 60)
+        log.info(f"Targets: {len(prepared)} ({len(people)} distinct people)")
+        log.info(f"Quality threshold: {min_quality_score}/10")
+
+        api_params = additional_params.copy() if additional_params else {}
+        api_params.pop('company', None)
+
+        trigger_result = scraper.resume_or_trigger_discovery(list(people.values()), api_params)
+        snapshot_id = trigger_result.get("snapshot_id")
+        if trigger_result.get("error") or not snapshot_id:
+            log.error("❌ Failed to trigger discovery job")
+            return None
+
+        log.info(f"🚀 Job started: {snapshot_id}")
+
+        results = scraper.wait_for_targets(
+            snapshot_id=snapshot_id,
+            targets=prepared,
+            matcher=matcher,
+            min_quality_score=min_quality_score,
+            max_wait=max_wait,
+            output_path=output_path
+        )
+        if results is None:
+            return None
+        for target_id, matches in results.items():
+            scraper.store_profiles(matches)
+            results[target_id] = scraper.resolve_entities(matches)
+
+        return results
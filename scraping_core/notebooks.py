@@ -0,0 +1,75 @@
+"""
+Load the notebook / script entry points outside Jupyter
+
+Most of the pipeline still lives in notebook cells, so load_notebook()
+executes a notebook's code cells (minus shell magics and demo cells) into a
+namespace that batch jobs and benchmarks call into. load_script() imports a
+standalone .py file (e.g. the name scraper) by path.
+"""
+
+import importlib.util
+import json
+import os
+from types import ModuleType
+from typing import Any, Callable, Dict, Optional, Sequence
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+PIPELINE_NOTEBOOK = "Serper,gemini_and_brightdata.ipynb"
+URL_SCRAPER_NOTEBOOK = "LinkedIn Profile Scrape/URL_Based_Scrapper/BrightData_LinkedIn_Profile_URL_Scrapper.ipynb"
+NAME_SCRAPER_SCRIPT = "LinkedIn Profile Scrape/Name_Profile_Scrapper/regex_name_scraper.py"
+
+
+def repo_path(path: str) -> str:
+    """Absolute path for a path relative to the repo root"""
+    return path if os.path.isabs(path) else os.path.join(REPO_ROOT, path)
+
+
+def load_notebook(path: str,
+                  skip_cells: Sequence[int] = (),
+                  after_cell: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+                  namespace: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Execute a notebook's code cells and return the resulting namespace
+
+    Args:
+        path: .ipynb path (relative to the repo root or absolute)
+        skip_cells: Indexes of code cells not to run (negative indexes count from the end)
+        after_cell: Called with (cell index, namespace) after each cell, e.g. to swap API keys
+        namespace: Namespace to execute into (a fresh one by default)
+    """
+    path = repo_path(path)
+    with open(path, encoding="utf-8") as f:
+        notebook = json.load(f)
+
+    cells = [cell for cell in notebook["cells"] if cell["cell_type"] == "code"]
+    skipped = {index % len(cells) for index in skip_cells}
+    namespace = namespace if namespace is not None else {"__name__": "__notebook__"}
+
+    for index, cell in enumerate(cells):
+        if index in skipped:
+            continue
+        source = "".join(cell["source"])
+        # Shell / magic lines (!pip install ..., %time) are not Python
+        source = "\n".join("" if line.lstrip().startswith(("!", "%")) else line for line in source.split("\n"))
+        exec(compile(source, f"{os.path.basename(path)}[cell {index}]", "exec"), namespace)
+        if after_cell is not None:
+            after_cell(index, namespace)
+
+    return namespace
+
+
+def load_script(path: str, module_name: Optional[str] = None) -> ModuleType:
+    """
+    Import a standalone script by path (its __main__ block does not run)
+
+    Args:
+        path: .py path (relative to the repo root or absolute)
+        module_name: Module name to register it under (defaults to the file name)
+    """
+    path = repo_path(path)
+    module_name = module_name or os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,384 @@
+"""
+Bulk quality scoring and company-regex filtering for discovered LinkedIn profiles
+
+Name discovery can return tens of thousands of profiles, and the early-termination
+loop used to re-walk every profile dict (nested .get()/.strip() calls plus one
+`pattern.search` per company string) on every poll. BulkProfileScorer flattens
+each profile once into a row of quality features, scores a whole batch with one
+matrix product (NumPy when installed, plain Python otherwise), runs the company
+regex once per distinct company name in the batch, and remembers the results by
+profile id / URL so records seen in an earlier poll are never scored twice. The
+memory is bounded and meant for one snapshot wait: a later record with the same
+id (the full version of a partial one) must be scored again, so callers reset()
+the scorer when they start on a new snapshot.
+"""
+
+import functools
+import heapq
+import itertools
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+MAX_QUALITY_SCORE = 10
+
+# Cached scores / regex matches a BulkProfileScorer keeps before dropping the least recently used
+DEFAULT_SCORER_CACHE_ENTRIES = 100_000
+PLACEHOLDER_VALUES = ("n/a", "unknown", "-", "")
+
+# Quality feature columns and the points each one is worth
+FEATURE_WEIGHTS = (
+    ("full_name", 1),         # Complete name (first + last)
+    ("current_company", 2),   # Current company information
+    ("position", 2),          # Job position/title
+    ("about_substantial", 2), # About section > 50 characters
+    ("about_minimal", 1),     # About section 11-50 characters
+    ("experience", 1),        # Experience history with company + title
+    ("education", 1),         # Education with school or degree
+    ("network", 1),           # > 50 followers or connections
+)
+
+
+def profile_key(profile: Dict[str, Any]) -> Optional[str]:
+    """Stable identity of a profile record (Bright Data id, LinkedIn id or profile URL)"""
+    for field in ("id", "linkedin_id", "linkedin_num_id", "url"):
+        value = profile.get(field)
+        if value:
+            return str(value)
+    return None
+
+
+def _text(value: Any) -> str:
+    return value.strip() if isinstance(value, str) else ""
+
+
+def _count(value: Any) -> Optional[float]:
+    """Follower / connection count as a number (None when it cannot be parsed)"""
+    if value is None:
+        return 0.0
+    if isinstance(value, str):
+        try:
+            return float(int(value.replace(',', '').replace('+', '')))
+        except ValueError:
+            return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+def current_company_name(profile: Dict[str, Any]) -> str:
+    """Current company name as stored on the profile (unstripped, '' when missing)"""
+    current_company = profile.get('current_company', {})
+    if isinstance(current_company, dict):
+        name = current_company.get('name', '')
+    else:
+        name = str(current_company) if current_company else ''
+    if not name:
+        name = profile.get('current_company_name', '')
+    return name if isinstance(name, str) else ''
+
+
+def company_mentions(profile: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Every company name on a profile as (label, name): the current one, then each experience entry"""
+    mentions = []
+    company = current_company_name(profile)
+    if company:
+        mentions.append(("Current", company))
+
+    experience = profile.get('experience', [])
+    if isinstance(experience, list):
+        for exp in experience:
+            if isinstance(exp, dict):
+                exp_company = exp.get('company', '')
+                if exp_company and isinstance(exp_company, str):
+                    mentions.append(("Experience", exp_company))
+    return mentions
+
+
+def quality_features(profile: Dict[str, Any]) -> Tuple[int, ...]:
+    """
+    Flatten one profile into its 0/1 quality feature row (see FEATURE_WEIGHTS)
+
+    Every field is looked up exactly once; scoring then happens on whole batches.
+    """
+    name = _text(profile.get('name'))
+    full_name = len(name) > 5 and ' ' in name
+
+    current_company = profile.get('current_company', {})
+    if isinstance(current_company, dict):
+        company = _text(current_company.get('name'))
+    else:
+        company = str(current_company).strip() if current_company else ''
+    if not company:
+        company = _text(profile.get('current_company_name'))
+    has_company = bool(company) and company.lower() not in PLACEHOLDER_VALUES
+
+    position = _text(current_company.get('title')) if isinstance(current_company, dict) else ''
+    for field in ('position', 'current_position', 'headline'):
+        if position:
+            break
+        position = _text(profile.get(field))
+    has_position = bool(position) and position.lower() not in PLACEHOLDER_VALUES
+
+    about_length = len(_text(profile.get('about')))
+
+    experience = profile.get('experience')
+    has_experience = isinstance(experience, list) and any(
+        _text(exp.get('company')) and _text(exp.get('title'))
+        for exp in experience if isinstance(exp, dict)
+    )
+
+    education = profile.get('education')
+    has_education = isinstance(education, list) and any(
+        _text(edu.get('school')) or _text(edu.get('degree'))
+        for edu in education if isinstance(edu, dict)
+    )
+
+    # An unparsable count on either side means no network point
+    followers = _count(profile.get('followers', 0))
+    connections = _count(profile.get('connections', 0))
+    has_network = followers is not None and connections is not None and (followers > 50 or connections > 50)
+
+    return (
+        int(full_name),
+        int(has_company),
+        int(has_position),
+        int(about_length > 50),
+        int(10 < about_length <= 50),
+        int(has_experience),
+        int(has_education),
+        int(has_network),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    # Imported on first use so workers that never score profiles skip NumPy's import cost
+    try:
+        import numpy
+    except ImportError:  # Scoring still works, just without the vectorized path
+        return None
+    return numpy
+
+
+def score_feature_rows(rows: Sequence[Sequence[int]]) -> List[int]:
+    """Quality scores (capped at MAX_QUALITY_SCORE) for a batch of feature rows"""
+    if not rows:
+        return []
+
+    weights = [weight for _, weight in FEATURE_WEIGHTS]
+    np = _numpy()
+    if np is not None:
+        matrix = np.asarray(rows, dtype=np.int16)
+        return np.minimum(matrix @ np.asarray(weights, dtype=np.int16), MAX_QUALITY_SCORE).tolist()
+
+    return [min(sum(value * weight for value, weight in zip(row, weights)), MAX_QUALITY_SCORE) for row in rows]
+
+
+class BulkProfileScorer:
+    def __init__(self, max_entries: int = DEFAULT_SCORER_CACHE_ENTRIES):
+        """
+        Batch scorer / company filter with a per-profile result cache
+
+        Scores are cached by profile_key, regex matches by (pattern, profile_key),
+        so polling the same growing snapshot only evaluates the new records.
+
+        Args:
+            max_entries: Bound on cached scores and on cached matches (least recently
+                         used entries are dropped; 0 disables the cache)
+        """
+        self.max_entries = max_entries
+        self._scores: Dict[str, int] = OrderedDict()
+        self._matches: Dict[Tuple[str, int, str], Optional[List[str]]] = OrderedDict()
+        self.stats = {"scored": 0, "score_cache_hits": 0, "regex_checked": 0, "regex_cache_hits": 0}
+
+    def reset(self):
+        """Forget every cached score / match (call it before scoring a new snapshot)"""
+        self._scores.clear()
+        self._matches.clear()
+
+    def _remember(self, cache: OrderedDict, key: Any, value: Any):
+        if self.max_entries <= 0:
+            return
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+    def score(self, profiles: Sequence[Dict[str, Any]]) -> List[int]:
+        """
+        Quality score (1-10 scale) for every profile, computing only unseen ones
+
+        Args:
+            profiles: Profile dicts
+
+        Returns:
+            Scores in the same order as profiles
+        """
+        keys = [profile_key(profile) for profile in profiles]
+        scores: List[Optional[int]] = [None] * len(profiles)
+        pending_rows = []
+        pending_positions = []
+
+        for position, (profile, key) in enumerate(zip(profiles, keys)):
+            cached = self._scores.get(key) if key is not None else None
+            if cached is not None:
+                self._scores.move_to_end(key)
+                scores[position] = cached
+                self.stats["score_cache_hits"] += 1
+            else:
+                pending_rows.append(quality_features(profile))
+                pending_positions.append(position)
+
+        for position, value in zip(pending_positions, score_feature_rows(pending_rows)):
+            scores[position] = value
+            if keys[position] is not None:
+                self._remember(self._scores, keys[position], value)
+
+        self.stats["scored"] += len(pending_rows)
+        return scores
+
+    def match_companies(self, profiles: Sequence[Dict[str, Any]], pattern) -> List[Optional[List[str]]]:
+        """
+        Company-regex match details for every profile
+
+        The current company and all experience companies of the uncached profiles
+        are gathered into one column and the pattern runs once per distinct name.
+
+        Args:
+            profiles: Profile dicts
+            pattern: Pre-compiled company regex
+
+        Returns:
+            Per profile: list of "Current: ..." / "Experience: ..." details, or None when nothing matched
+        """
+        keys = [None if key is None else (pattern.pattern, pattern.flags, key)
+                for key in (profile_key(profile) for profile in profiles)]
+        results: List[Optional[List[str]]] = [None] * len(profiles)
+
+        # Columnar view: (profile position, label, company) for every company string to check
+        positions: List[int] = []
+        labels: List[str] = []
+        companies: List[str] = []
+        pending = []
+
+        for position, (profile, key) in enumerate(zip(profiles, keys)):
+            if key is not None and key in self._matches:
+                self._matches.move_to_end(key)
+                results[position] = self._matches[key]
+                self.stats["regex_cache_hits"] += 1
+                continue
+
+            pending.append(position)
+            for label, company in company_mentions(profile):
+                positions.append(position)
+                labels.append(label)
+                companies.append(company)
+
+        distinct = {company: bool(pattern.search(company)) for company in set(companies)}
+        self.stats["regex_checked"] += len(distinct)
+
+        np = _numpy()
+        if np is not None and companies:
+            hits = np.fromiter((distinct[company] for company in companies), dtype=bool, count=len(companies))
+            matched_rows = np.flatnonzero(hits).tolist()
+        else:
+            matched_rows = [row for row, company in enumerate(companies) if distinct[company]]
+
+        for row in matched_rows:
+            position = positions[row]
+            if results[position] is None:
+                results[position] = []
+            results[position].append(f"{labels[row]}: {companies[row]}")
+
+        for position in pending:
+            if keys[position] is not None:
+                self._remember(self._matches, keys[position], results[position])
+
+        return results
+
+    def filter_by_company(self, profiles: Sequence[Dict[str, Any]], pattern) -> List[Dict[str, Any]]:
+        """Profiles whose current or past company matches, tagged with '_company_matches'"""
+        matched_profiles = []
+        for profile, details in zip(profiles, self.match_companies(profiles, pattern)):
+            if details:
+                profile['_company_matches'] = list(details)
+                matched_profiles.append(profile)
+        return matched_profiles
+
+    def split_by_quality(self, profiles: Sequence[Dict[str, Any]],
+                         min_quality_score: int = 3) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Tag profiles with '_quality_score' and split them at the threshold
+
+        Returns:
+            Tuple of (high_quality sorted by score descending, low_quality)
+        """
+        high_quality = []
+        low_quality = []
+
+        for profile, score in zip(profiles, self.score(profiles)):
+            profile['_quality_score'] = score
+            if score >= min_quality_score:
+                high_quality.append(profile)
+            else:
+                low_quality.append(profile)
+
+        high_quality.sort(key=lambda x: x['_quality_score'], reverse=True)
+        return high_quality, low_quality
+
+
+class TopKProfiles:
+    def __init__(self, k: int = 50):
+        """
+        Running top-k of scored profiles
+
+        A min-heap of at most k entries keeps the k best profiles seen so far;
+        push is O(log k) and the single best profile is always at hand.
+
+        Args:
+            k: How many profiles to keep
+        """
+        self.k = k
+        self._heap: List[Tuple[int, int, Dict[str, Any]]] = []
+        self._order = itertools.count()
+        self.best: Optional[Dict[str, Any]] = None
+        self.best_score = -1
+
+    def push(self, profile: Dict[str, Any], score: int):
+        # Ties are broken in favour of the profile seen first
+        entry = (score, -next(self._order), profile)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+        if score > self.best_score:
+            self.best, self.best_score = profile, score
+
+    def ranked(self, min_score: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Kept profiles, best first (optionally only those scoring at least min_score)"""
+        entries = sorted(self._heap, key=lambda entry: entry[:2], reverse=True)
+        return [profile for score, _, profile in entries if min_score is None or score >= min_score]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+def new_records(records: Iterable[Any], seen: Set[str], start: int = 0) -> List[Dict[str, Any]]:
+    """
+    Records of a growing snapshot that were not returned by an earlier poll
+
+    Records are identified by profile_key; records without one fall back to
+    their position (partial snapshots only ever grow at the end). `seen` is
+    updated in place; `start` is the position of the first record when a
+    snapshot is processed in chunks.
+    """
+    delta = []
+    for position, record in enumerate(records, start):
+        if not isinstance(record, dict):
+            continue
+        key = profile_key(record) or f"#{position}"
+        if key not in seen:
+            seen.add(key)
+            delta.append(record)
+    return delta
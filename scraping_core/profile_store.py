@@ -0,0 +1,348 @@
+"""
+Indexed SQLite store for scraped LinkedIn profiles
+
+main() in the LinkedIn scrapers used to write every run to its own pretty-printed
+`linkedin_*_{timestamp}.json` file, so nothing could be looked up across runs
+without loading all of them. ProfileStore keeps one row per profile instead:
+
+- upsert by profile id (Bright Data id, LinkedIn id or URL - see profile_key)
+- normalized, indexed columns for the profile URL, name (full, and first / last
+  token) and current company, next to the compact JSON record
+- memory-mapped reads (PRAGMA mmap_size) and a REGEXP function for company
+  patterns, so discovery runs can check locally whether a person is already
+  known before triggering Bright Data
+
+import_json_files() loads the old per-run JSON / JSONL files into the store.
+"""
+
+import glob
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from scraping_core.profile_scoring import BulkProfileScorer, current_company_name, profile_key
+from scraping_core.response_cache import connect_sqlite, normalize_text
+from scraping_core.snapshot_stream import iter_json_records
+
+DEFAULT_PROFILES_PATH = os.environ.get("SCRAPING_PROFILES_PATH", "linkedin_profiles.sqlite3")
+
+# Bytes of the file SQLite may map into memory for reads
+DEFAULT_MMAP_BYTES = 256 * 1024 * 1024
+
+# Keys the old result files keep their profile lists under
+RESULT_FILE_KEYS = ("profiles", "discovered_profiles", "results", "data")
+
+COLUMNS = ("profile_id", "url_key", "name", "name_key", "first_key", "last_key", "company", "company_key",
+           "position", "quality_score", "dataset_id", "source", "scraped_at", "data")
+
+
+def profile_url_key(url: Optional[str]) -> Optional[str]:
+    """
+    Normalized LinkedIn profile URL ("linkedin.com/in/<slug>")
+
+    Scheme, country / www. subdomains, query strings, fragments and the trailing
+    slash are ignored, so every spelling of one profile URL gets the same key.
+    """
+    if not url or not isinstance(url, str):
+        return None
+    key = url.strip().lower().split("#", 1)[0].split("?", 1)[0]
+    key = re.sub(r"^[a-z]+://", "", key)
+    key = re.sub(r"^([a-z0-9-]+\.)?linkedin\.com/", "linkedin.com/", key)
+    return key.rstrip("/") or None
+
+
+def name_tokens(name: str) -> Tuple[str, str, str]:
+    """(full, first, last) normalized name keys"""
+    full = normalize_text(name or "")
+    parts = full.split()
+    return full, parts[0] if parts else "", parts[-1] if parts else ""
+
+
+def _regexp(pattern: str, value: Optional[str]) -> bool:
+    # SQL function REGEXP(pattern, value); re caches the compiled pattern between rows
+    return value is not None and re.search(pattern, value) is not None
+
+
+def _regexp_ignore_case(pattern: str, value: Optional[str]) -> bool:
+    return value is not None and re.search(pattern, value, re.IGNORECASE) is not None
+
+
+class ProfileStore:
+    def __init__(self, path: str = DEFAULT_PROFILES_PATH, mmap_bytes: int = DEFAULT_MMAP_BYTES):
+        """
+        Open (or create) the profile store
+
+        Args:
+            path: SQLite file path
+            mmap_bytes: Memory-map budget for reads (0 disables mmap)
+        """
+        self.path = path
+        # Stored records replace older versions of the same profile, so scores are never reused
+        self.scorer = BulkProfileScorer(max_entries=0)
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(path)
+        self._conn.execute(f"PRAGMA mmap_size={int(mmap_bytes)}")
+        self._conn.create_function("REGEXP", 2, _regexp, deterministic=True)
+        self._conn.create_function("IREGEXP", 2, _regexp_ignore_case, deterministic=True)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS profiles (
+                profile_id TEXT PRIMARY KEY,
+                url_key TEXT,
+                name TEXT,
+                name_key TEXT,
+                first_key TEXT,
+                last_key TEXT,
+                company TEXT,
+                company_key TEXT,
+                position TEXT,
+                quality_score INTEGER,
+                dataset_id TEXT,
+                source TEXT,
+                first_seen REAL NOT NULL,
+                scraped_at REAL NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_profiles_url ON profiles (url_key);
+            CREATE INDEX IF NOT EXISTS idx_profiles_name ON profiles (name_key);
+            CREATE INDEX IF NOT EXISTS idx_profiles_person ON profiles (last_key, first_key);
+            CREATE INDEX IF NOT EXISTS idx_profiles_company ON profiles (company_key);
+        """)
+        self._conn.commit()
+        self.counters = {"upserts": 0, "lookups": 0, "hits": 0}
+
+    def _row(self, profile: Dict[str, Any], quality_score: int, dataset_id: Optional[str],
+             source: Optional[str], scraped_at: float) -> Optional[Tuple]:
+        profile_id = profile_key(profile)
+        if profile_id is None:
+            return None
+        name = profile.get("name") or " ".join(
+            part for part in (profile.get("first_name"), profile.get("last_name")) if part)
+        name = name if isinstance(name, str) else ""
+        full, first, last = name_tokens(name)
+        company = current_company_name(profile).strip()
+        position = profile.get("position")
+        record = {key: value for key, value in profile.items() if key != "_scraped_at"}
+        record["_quality_score"] = quality_score
+        return (profile_id, profile_url_key(profile.get("url") or profile.get("input_url")), name, full, first, last,
+                company, normalize_text(company) if company else None,
+                position if isinstance(position, str) else None, quality_score, dataset_id, source, scraped_at,
+                json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str))
+
+    def upsert_many(self, profiles: Iterable[Dict[str, Any]], dataset_id: Optional[str] = None,
+                    source: Optional[str] = None, scraped_at: Optional[float] = None,
+                    batch_size: int = 500) -> int:
+        """
+        Insert or update profiles by profile id
+
+        Args:
+            profiles: Profile records (a '_quality_score' is computed when missing)
+            dataset_id: Bright Data dataset the records came from
+            source: Free-form origin label (url_scrape, name_discovery, import, ...)
+            scraped_at: Epoch seconds the records were downloaded (defaults to now)
+            batch_size: Records written per transaction
+
+        Returns:
+            Number of profiles written (records without any id are skipped)
+        """
+        scraped_at = time.time() if scraped_at is None else scraped_at
+        written = 0
+        batch: List[Dict[str, Any]] = []
+
+        def flush():
+            nonlocal written
+            scores = self.scorer.score([p for p in batch if "_quality_score" not in p])
+            missing = iter(scores)
+            rows = []
+            for profile in batch:
+                score = profile["_quality_score"] if "_quality_score" in profile else next(missing)
+                row = self._row(profile, score, dataset_id, source, scraped_at)
+                if row is not None:
+                    rows.append(row)
+            with self._lock:
+                self._conn.executemany(f"""
+                    INSERT INTO profiles ({', '.join(COLUMNS)}, first_seen)
+                    VALUES ({', '.join('?' * len(COLUMNS))}, ?)
+                    ON CONFLICT(profile_id) DO UPDATE SET
+                        {', '.join(f'{column} = excluded.{column}' for column in COLUMNS[1:])}
+                """, [row + (scraped_at,) for row in rows])
+                self._conn.commit()
+            written += len(rows)
+            batch.clear()
+
+        for profile in profiles:
+            if isinstance(profile, dict):
+                batch.append(profile)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+        self.counters["upserts"] += written
+        return written
+
+    def upsert(self, profile: Dict[str, Any], **kwargs) -> bool:
+        """Insert or update one profile (see upsert_many)"""
+        return self.upsert_many([profile], **kwargs) == 1
+
+    def _select(self, where: str, params: Sequence[Any], limit: Optional[int] = None,
+                order: str = "quality_score DESC, scraped_at DESC") -> List[Dict[str, Any]]:
+        sql = f"SELECT data, scraped_at FROM profiles WHERE {where} ORDER BY {order}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(sql, list(params)).fetchall()
+        self.counters["lookups"] += 1
+        self.counters["hits"] += bool(rows)
+        return [dict(json.loads(data), _scraped_at=scraped_at) for data, scraped_at in rows]
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Stored profile by id, with '_scraped_at' (epoch seconds) added"""
+        rows = self._select("profile_id = ?", [profile_id], limit=1)
+        return rows[0] if rows else None
+
+    def get_by_url(self, url: str) -> Optional[Dict[str, Any]]:
+        """Most recently scraped profile for a profile URL (any spelling)"""
+        rows = self._select("url_key = ?", [profile_url_key(url)], limit=1, order="scraped_at DESC")
+        return rows[0] if rows else None
+
+    def get_many_by_url(self, urls: Sequence[str], max_age: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Stored profiles for many URLs at once
+
+        Args:
+            urls: Profile URLs (any spelling)
+            max_age: Ignore profiles scraped more than this many seconds ago
+
+        Returns:
+            Normalized URL key -> most recently scraped profile
+        """
+        keys = sorted({key for key in map(profile_url_key, urls) if key})
+        found: Dict[str, Dict[str, Any]] = {}
+        cutoff = time.time() - max_age if max_age is not None else 0.0
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT url_key, data, scraped_at FROM profiles "
+                    f"WHERE url_key IN ({', '.join('?' * len(chunk))}) AND scraped_at >= ? "
+                    f"ORDER BY scraped_at", chunk + [cutoff]
+                ).fetchall()
+            for url_key, data, scraped_at in rows:
+                found[url_key] = dict(json.loads(data), _scraped_at=scraped_at)
+        self.counters["lookups"] += 1
+        self.counters["hits"] += len(found)
+        return found
+
+    def find(self,
+             name: Optional[str] = None,
+             first_name: Optional[str] = None,
+             last_name: Optional[str] = None,
+             company: Optional[str] = None,
+             company_pattern: Optional[str] = None,
+             case_sensitive: bool = False,
+             min_quality_score: Optional[int] = None,
+             max_age: Optional[float] = None,
+             limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """
+        Look up stored profiles (best quality first)
+
+        Args:
+            name: Exact full name (normalized)
+            first_name / last_name: First and last name token (middle names are ignored)
+            company: Exact current company name (normalized)
+            company_pattern: Regex matched against the current company name
+            case_sensitive: Whether company_pattern is case sensitive
+            min_quality_score: Only profiles scoring at least this
+            max_age: Only profiles scraped within this many seconds
+            limit: Maximum profiles returned (None for all)
+        """
+        where, params = [], []
+        if name:
+            where.append("name_key = ?")
+            params.append(name_tokens(name)[0])
+        if first_name:
+            where.append("first_key = ?")
+            params.append(normalize_text(first_name).split()[0])
+        if last_name:
+            where.append("last_key = ?")
+            params.append(normalize_text(last_name).split()[-1])
+        if company:
+            where.append("company_key = ?")
+            params.append(normalize_text(company))
+        if company_pattern:
+            where.append(f"{'REGEXP' if case_sensitive else 'IREGEXP'}(?, company)")
+            params.append(company_pattern)
+        if min_quality_score is not None:
+            where.append("quality_score >= ?")
+            params.append(min_quality_score)
+        if max_age is not None:
+            where.append("scraped_at >= ?")
+            params.append(time.time() - max_age)
+        return self._select(" AND ".join(where) or "1", params, limit=limit)
+
+    def iter_profiles(self, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Every stored profile, read in id order one batch at a time"""
+        last_id = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT profile_id, data, scraped_at FROM profiles WHERE profile_id > ? "
+                    "ORDER BY profile_id LIMIT ?", (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for profile_id, data, scraped_at in rows:
+                yield dict(json.loads(data), _scraped_at=scraped_at)
+            last_id = rows[-1][0]
+
+    def import_json_files(self, pattern: str = "linkedin_*.json*", source: str = "import") -> int:
+        """
+        Load old per-run result files (pretty-printed JSON or JSON Lines) into the store
+
+        Args:
+            pattern: Glob of files to import
+            source: Source label stored with the imported profiles
+
+        Returns:
+            Number of profiles written
+        """
+        written = 0
+        for path in sorted(glob.glob(pattern)):
+            with open(path, "rb") as f:
+                records = []
+                for record in iter_json_records(iter(lambda: f.read(64 * 1024), b"")):
+                    wrapped = next((record[key] for key in RESULT_FILE_KEYS
+                                    if isinstance(record, dict) and isinstance(record.get(key), list)), None)
+                    records.extend(wrapped if wrapped is not None else [record])
+            written += self.upsert_many(records, source=source, scraped_at=os.path.getmtime(path))
+        return written
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"profiles": len(self), "path": self.path, **self.counters}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_stores: Dict[str, ProfileStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_profile_store(path: str = DEFAULT_PROFILES_PATH) -> ProfileStore:
+    """Return the shared profile store for a file path (opened on first use)"""
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = ProfileStore(path)
+            _stores[path] = store
+        return store
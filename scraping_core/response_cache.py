@@ -0,0 +1,346 @@
+"""
+Persistent, content-addressed cache for paid / slow API responses
+
+Serper searches, Gemini completions and Bright Data scrapes are stored in a
+local SQLite file keyed by a hash of the normalized request (query, prompt +
+model, URL + dataset_id, ...). Every source has its own TTL, the file is kept
+under a size limit with least-recently-used eviction, and hit/miss counters
+show how much network work a re-run skipped.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+DEFAULT_CACHE_PATH = os.environ.get("SCRAPING_CACHE_PATH", "scraping_cache.sqlite3")
+
+DAY = 24 * 60 * 60
+
+# Time-to-live per source in seconds
+DEFAULT_TTLS = {
+    "serper": 7 * DAY,
+    "gemini": 30 * DAY,
+    "brightdata": 7 * DAY,
+    "brightdata_snapshot": 30 * DAY,
+    "brightdata_format": 30 * DAY,
+    "domain_pipeline": 7 * DAY,
+}
+DEFAULT_TTL = DAY
+
+# last_access only orders LRU eviction: a hit records it at this resolution, and the
+# recorded hits are written in one batch instead of one write transaction per read
+ACCESS_RESOLUTION_SECONDS = 60
+ACCESS_FLUSH_SECONDS = 30
+ACCESS_FLUSH_BATCH = 256
+
+
+def connect_sqlite(path: str, timeout: float = 30.0, **kwargs) -> sqlite3.Connection:
+    """
+    Open a SQLite file in WAL mode; safe when several processes open it at once
+
+    Switching a new file to WAL needs exclusive access for a moment and SQLite
+    reports "database is locked" without waiting, so the switch is retried.
+    """
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=timeout, **kwargs)
+    for attempt in range(20):
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            break
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) or attempt == 19:
+                raise
+            time.sleep(0.05 * (attempt + 1))
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and lower-case free text such as search queries"""
+    return " ".join(str(text).split()).lower()
+
+
+def make_cache_key(source: str, key_parts: Sequence[Any]) -> str:
+    """Stable content hash of a source name plus its normalized request parts"""
+    canonical = json.dumps([source, list(key_parts)], sort_keys=True, ensure_ascii=False, default=str)
+    return f"{source}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+
+class ResponseCache:
+    def __init__(self,
+                 path: str = DEFAULT_CACHE_PATH,
+                 max_bytes: int = 512 * 1024 * 1024,
+                 ttls: Optional[Dict[str, int]] = None):
+        """
+        Open (or create) the on-disk response cache
+
+        Args:
+            path: SQLite file path
+            max_bytes: Size budget for stored values; least recently used entries are evicted beyond it
+            ttls: Per-source TTL overrides in seconds (merged over DEFAULT_TTLS)
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_expires_at ON responses (expires_at)")
+        self._create_size_total()
+
+        self.counters: Dict[str, Dict[str, int]] = {}
+        # key -> last access time not yet written to the file
+        self._pending_access: Dict[str, float] = {}
+        self._access_flushed_at = time.time()
+
+    def _create_size_total(self):
+        """
+        Keep the stored byte total in a one-row table, maintained by triggers
+
+        Worker processes share the file, so the total has to live in it; the triggers
+        update it in the same transaction as every INSERT / DELETE. Summing `size`
+        instead would read the whole file on each write (it is stored after `value`).
+        An existing file is summed once, when the table is created.
+        """
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_meta (id INTEGER PRIMARY KEY CHECK (id = 1), total_bytes INTEGER NOT NULL)")
+            self._conn.execute(
+                "INSERT OR IGNORE INTO cache_meta (id, total_bytes) SELECT 1, COALESCE(SUM(size), 0) FROM responses")
+            self._conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS responses_size_insert AFTER INSERT ON responses BEGIN
+                    UPDATE cache_meta SET total_bytes = total_bytes + NEW.size WHERE id = 1;
+                END
+            """)
+            self._conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS responses_size_delete AFTER DELETE ON responses BEGIN
+                    UPDATE cache_meta SET total_bytes = total_bytes - OLD.size WHERE id = 1;
+                END
+            """)
+            self._conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS responses_size_update AFTER UPDATE OF size ON responses BEGIN
+                    UPDATE cache_meta SET total_bytes = total_bytes - OLD.size + NEW.size WHERE id = 1;
+                END
+            """)
+            self._conn.commit()
+        except Exception:
+            self._conn.rollback()
+            raise
+
+    def _count(self, source: str, event: str):
+        counter = self.counters.setdefault(source, {"hits": 0, "misses": 0, "stores": 0, "evictions": 0})
+        counter[event] += 1
+
+    def get(self, source: str, key_parts: Sequence[Any]) -> Optional[Any]:
+        """
+        Look up a cached value
+
+        Args:
+            source: Cache namespace (serper, gemini, brightdata, ...)
+            key_parts: Normalized request parts identifying the response
+
+        Returns:
+            The cached JSON value, or None on a miss / expired entry
+        """
+        key = make_cache_key(source, key_parts)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, last_access FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self._count(source, "misses")
+                return None
+
+            value, expires_at, last_access = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._count(source, "misses")
+                return None
+
+            if now - last_access >= ACCESS_RESOLUTION_SECONDS:
+                self._pending_access[key] = now
+                if (len(self._pending_access) >= ACCESS_FLUSH_BATCH
+                        or now - self._access_flushed_at >= ACCESS_FLUSH_SECONDS):
+                    self._flush_access_locked()
+                    self._conn.commit()
+            self._count(source, "hits")
+
+        return json.loads(value)
+
+    def set(self, source: str, key_parts: Sequence[Any], value: Any, ttl: Optional[int] = None):
+        """
+        Store a JSON-serializable value
+
+        Args:
+            source: Cache namespace
+            key_parts: Normalized request parts identifying the response
+            value: JSON-serializable response
+            ttl: Optional TTL override in seconds
+        """
+        key = make_cache_key(source, key_parts)
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttls.get(source, DEFAULT_TTL))
+
+        with self._lock:
+            try:
+                self._flush_access_locked()
+                # DELETE + INSERT rather than INSERT OR REPLACE: REPLACE skips the delete trigger
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.execute(
+                    "INSERT INTO responses (key, source, value, size, created_at, expires_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, source, payload, size, now, expires_at, now)
+                )
+                self._evict_locked()
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            self._count(source, "stores")
+
+    def get_or_compute(self,
+                       source: str,
+                       key_parts: Sequence[Any],
+                       compute: Callable[[], Any],
+                       encode: Callable[[Any], Any] = lambda value: value,
+                       decode: Callable[[Any], Any] = lambda value: value,
+                       should_cache: Callable[[Any], bool] = lambda value: True) -> Any:
+        """
+        Return the cached response, or compute it and cache it when it is worth keeping
+
+        Args:
+            source: Cache namespace
+            key_parts: Normalized request parts identifying the response
+            compute: Function performing the real (network) call
+            encode: Converts the computed result into a JSON value (e.g. model.model_dump())
+            decode: Rebuilds the result from the cached JSON value
+            should_cache: Predicate rejecting failures / fallbacks from the cache
+        """
+        cached = self.get(source, key_parts)
+        if cached is not None:
+            return decode(cached)
+
+        result = compute()
+        if should_cache(result):
+            self.set(source, key_parts, encode(result))
+        return result
+
+    def _flush_access_locked(self):
+        """Write the recorded hits' last_access times (the caller commits)"""
+        if self._pending_access:
+            self._conn.executemany(
+                "UPDATE responses SET last_access = ? WHERE key = ? AND last_access < ?",
+                [(accessed_at, key, accessed_at) for key, accessed_at in self._pending_access.items()])
+            self._pending_access.clear()
+        self._access_flushed_at = time.time()
+
+    def _total_bytes(self) -> int:
+        return self._conn.execute("SELECT total_bytes FROM cache_meta WHERE id = 1").fetchone()[0]
+
+    def _evict_locked(self):
+        # Read inside the write transaction of the INSERT that called us, so the total
+        # includes every other process's writes
+        total_bytes = self._total_bytes()
+        if total_bytes <= self.max_bytes:
+            return
+
+        # Drop expired entries first, then the least recently used ones
+        now = time.time()
+        expired = self._conn.execute(
+            "SELECT key, source, size FROM responses WHERE expires_at <= ?", (now,)
+        ).fetchall()
+        target = int(self.max_bytes * 0.9)
+        victims = list(expired)
+
+        freed = sum(size for _, _, size in victims)
+        if total_bytes - freed > target:
+            for row in self._conn.execute(
+                    "SELECT key, source, size FROM responses WHERE expires_at > ? ORDER BY last_access", (now,)):
+                victims.append(row)
+                freed += row[2]
+                if total_bytes - freed <= target:
+                    break
+
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key, _, _ in victims])
+        for _, source, _ in victims:
+            self._count(source, "evictions")
+
+    def purge_expired(self) -> int:
+        """Delete expired entries, returning how many were removed"""
+        with self._lock:
+            now = time.time()
+            removed = self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,)).rowcount
+            self._conn.commit()
+            return removed
+
+    def clear(self, source: Optional[str] = None):
+        """Remove every entry (or only one source's entries)"""
+        with self._lock:
+            if source:
+                self._conn.execute("DELETE FROM responses WHERE source = ?", (source,))
+            else:
+                self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per source plus current entry count and size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            total_bytes = self._total_bytes()
+        return {
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+            "sources": {source: dict(counter) for source, counter in self.counters.items()},
+        }
+
+    def close(self):
+        with self._lock:
+            self._flush_access_locked()
+            self._conn.commit()
+            self._conn.close()
+
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(path: str = DEFAULT_CACHE_PATH, **kwargs) -> ResponseCache:
+    """
+    Return the shared cache for a file path (opened on first use)
+
+    Args:
+        path: SQLite file path
+        **kwargs: Extra ResponseCache settings (only used when the cache is opened)
+    """
+    path = os.path.abspath(path)
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = ResponseCache(path, **kwargs)
+            _caches[path] = cache
+        return cache
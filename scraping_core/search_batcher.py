@@ -0,0 +1,224 @@
+"""
+Micro-batched Serper searches
+
+Serper's /search endpoint also accepts a JSON array of search objects and
+answers with one response object per query, in the same order. A
+SearchBatcher collects the queries concurrent callers submit during a short
+window and sends them as a single request, so a batch of emails pays one
+round-trip and one rate-limit slot per batch instead of per query. Every
+caller gets the complete response object for its own query back (organic
+results plus knowledgeGraph, relatedSearches, ...). Queries the batch did not
+answer, or a batch request that failed as a whole, are retried one by one.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from scraping_core.http_client import http_post
+from scraping_core.response_cache import normalize_text
+from scraping_core.telemetry import estimate_cost, get_logger, get_tracer
+
+SERPER_SEARCH_URL = "https://google.serper.dev/search"
+
+# Serper answers at most this many queries per array request
+SERPER_MAX_QUERIES_PER_REQUEST = 100
+
+log = get_logger("serper")
+
+
+def search_key(payload: Dict[str, Any]) -> tuple:
+    """Identity of a search (normalized query + parameters), used to answer duplicates once"""
+    return (normalize_text(str(payload.get("q", ""))),) + tuple(sorted(
+        (key, str(value)) for key, value in payload.items() if key != "q"))
+
+
+def is_search_response(answer: Any) -> bool:
+    """True for a usable per-query answer (Serper reports per-query failures as {"message": ...})"""
+    return isinstance(answer, dict) and ("organic" in answer or "searchParameters" in answer) \
+        and not answer.get("error")
+
+
+class _PendingSearch:
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+        self.key = search_key(payload)
+        self.future: Future = Future()
+
+
+class SearchBatcher:
+    def __init__(self,
+                 api_key: str,
+                 num_results: int = 5,
+                 window_seconds: float = 0.3,
+                 max_batch_size: int = 50,
+                 url: str = SERPER_SEARCH_URL,
+                 timeout: int = 30):
+        """
+        Initialize a batcher for Serper searches
+
+        Args:
+            api_key: Your Serper API key
+            num_results: Default "num" sent with every query
+            window_seconds: How long to wait for more queries before sending a batch
+            max_batch_size: Send as soon as this many distinct queries are queued
+            url: Serper search endpoint
+            timeout: Request timeout in seconds
+        """
+        self.api_key = api_key
+        self.num_results = num_results
+        self.window_seconds = window_seconds
+        self.max_batch_size = min(max_batch_size, SERPER_MAX_QUERIES_PER_REQUEST)
+        self.url = url
+        self.timeout = timeout
+        self.headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
+
+        self._pending: List[_PendingSearch] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._executor = ThreadPoolExecutor(max_workers=4)
+        self.stats = {"queries": 0, "requests": 0, "batched_queries": 0, "single_retries": 0, "failed": 0}
+
+    def submit(self, query: str, **params) -> Future:
+        """
+        Queue one search
+
+        Args:
+            query: Search query
+            **params: Extra Serper parameters (num, gl, hl, ...)
+
+        Returns:
+            Future resolving to Serper's response dict for this query, or None if it failed
+        """
+        self.stats["queries"] += 1
+        search = _PendingSearch(dict({"q": query, "num": self.num_results}, **params))
+
+        with self._lock:
+            self._pending.append(search)
+            distinct = len({pending.key for pending in self._pending})
+
+            if distinct >= self.max_batch_size:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        return search.future
+
+    def search(self, query: str, timeout: Optional[float] = None, **params) -> Optional[Dict[str, Any]]:
+        """Blocking helper: submit one query and wait for its response"""
+        return self.submit(query, **params).result(timeout=timeout)
+
+    def search_many(self, queries: Sequence[str], **params) -> List[Optional[Dict[str, Any]]]:
+        """Search a list of queries right away (batched) and return the responses in order"""
+        futures = [self.submit(query, **params) for query in queries]
+        self.flush()
+        return [future.result() for future in futures]
+
+    def flush(self):
+        """Send whatever is queued right now"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+            self._executor.submit(self._send_batch, batch)
+
+    def _post(self, payload: Any):
+        self.stats["requests"] += 1
+        return http_post(self.url, headers=self.headers, json=payload, timeout=self.timeout)
+
+    def _search_single(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        self.stats["single_retries"] += 1
+        try:
+            response = self._post(payload)
+            if response.status_code == 200:
+                answer = response.json()
+                if is_search_response(answer):
+                    return answer
+            log.error(f"❌ Serper search failed for '{payload['q']}': {response.status_code}")
+        except Exception as e:
+            log.error(f"❌ Serper search failed for '{payload['q']}': {e}")
+        return None
+
+    def _send_batch(self, batch: List[_PendingSearch]):
+        # Identical searches from different callers are only sent once
+        payloads: Dict[tuple, Dict[str, Any]] = {}
+        for search in batch:
+            payloads.setdefault(search.key, search.payload)
+        keys = list(payloads)
+
+        answers: Dict[tuple, Dict[str, Any]] = {}
+        with get_tracer().span("serper.batch", queries=len(keys), callers=len(batch),
+                               cost_usd=estimate_cost("serper", queries=len(keys))) as span:
+            if len(keys) == 1:
+                answer = self._search_single(payloads[keys[0]])
+                if answer is not None:
+                    answers[keys[0]] = answer
+            else:
+                log.info(f"🔍 Sending batched Serper request: {len(keys)} queries for {len(batch)} callers")
+                try:
+                    response = self._post([payloads[key] for key in keys])
+                    if response.status_code == 200 and isinstance(response.json(), list):
+                        answers = self._match_answers(keys, payloads, response.json())
+                        self.stats["batched_queries"] += len(answers)
+                    else:
+                        log.warning(f"⚠️ Batched Serper request answered {response.status_code}, "
+                                    f"retrying {len(keys)} queries one by one")
+                except Exception as e:
+                    span.set(error=str(e))
+                    log.warning(f"⚠️ Batched Serper request failed ({e}), retrying {len(keys)} queries one by one")
+
+                # Degrade to single requests for every query the batch did not answer
+                for key in keys:
+                    if key not in answers:
+                        answer = self._search_single(payloads[key])
+                        if answer is not None:
+                            answers[key] = answer
+            span.set(answered=len(answers))
+
+        for search in batch:
+            if not search.future.done():
+                answer = answers.get(search.key)
+                if answer is None:
+                    self.stats["failed"] += 1
+                search.future.set_result(answer)
+
+    @staticmethod
+    def _match_answers(keys: List[tuple], payloads: Dict[tuple, Dict[str, Any]],
+                       answers: List[Any]) -> Dict[tuple, Dict[str, Any]]:
+        """Pair array answers with their queries (by position, or by the echoed query if the counts differ)"""
+        if len(answers) == len(keys):
+            return {key: answer for key, answer in zip(keys, answers) if is_search_response(answer)}
+
+        by_query = {}
+        for answer in answers:
+            if is_search_response(answer):
+                query = normalize_text(str(answer.get("searchParameters", {}).get("q", "")))
+                by_query.setdefault(query, answer)
+        return {key: by_query[key[0]] for key in keys if key[0] in by_query}
+
+
+_batchers: Dict[tuple, SearchBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_search_batcher(api_key: str, **kwargs) -> SearchBatcher:
+    """
+    Return the process-wide batcher for a Serper API key (created on first use)
+
+    Args:
+        api_key: Your Serper API key
+        **kwargs: Extra SearchBatcher settings (only used when the batcher is created)
+    """
+    with _batchers_lock:
+        batcher = _batchers.get((api_key,))
+        if batcher is None:
+            batcher = SearchBatcher(api_key, **kwargs)
+            _batchers[(api_key,)] = batcher
+        return batcher
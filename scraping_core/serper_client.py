@@ -0,0 +1,139 @@
+"""
+Serper search client returning SearchResultsOutput models
+
+Wraps google.serper.dev/search with the response cache (a repeated query
+costs nothing) and, optionally, the shared SearchBatcher so concurrent
+callers share array-payload requests. Used by the notebook's Serper chain and
+by the LangChain-free EmailPipeline.
+"""
+
+from scraping_core.http_client import http_post
+from scraping_core.models import SearchResult, SearchResultsOutput
+from scraping_core.response_cache import normalize_text
+from scraping_core.search_batcher import SERPER_SEARCH_URL, get_search_batcher
+from scraping_core.telemetry import estimate_cost, get_logger, get_tracer
+
+log = get_logger("serper")
+
+
+def search_output_from_response(query: str, data: dict, num_results: int = 5) -> SearchResultsOutput:
+    """Turn one Serper response object into a SearchResultsOutput (top organic results + the other blocks)"""
+    results = []
+    for result in data.get('organic', [])[:num_results]:
+        results.append(SearchResult(
+            title=result.get('title', ''),
+            url=result.get('link', ''),
+            snippet=result.get('snippet', '')
+        ))
+
+    related = [item.get('query', '') for item in data.get('relatedSearches', []) if item.get('query')]
+    extras = {key: value for key, value in data.items()
+              if key not in ('organic', 'knowledgeGraph', 'relatedSearches', 'searchParameters', 'credits')}
+
+    return SearchResultsOutput(
+        results=results,
+        query_used=query,
+        knowledge_graph=data.get('knowledgeGraph') or {},
+        related_searches=related,
+        extras=extras
+    )
+
+
+class SerperClient:
+    def __init__(self,
+                 api_key: str,
+                 num_results: int = 5,
+                 cache=None,
+                 batched: bool = True,
+                 batch_window_seconds: float = 0.3,
+                 max_batch_size: int = 50,
+                 timeout: int = 30):
+        """
+        Initialize a Serper client
+
+        Args:
+            api_key: Your Serper API key
+            num_results: Organic results requested and kept per query
+            cache: Optional ResponseCache; searches with results are cached under "serper"
+            batched: Send queries through the shared SearchBatcher
+            batch_window_seconds: How long the batcher collects queries before sending
+            max_batch_size: Batch size that is sent immediately
+            timeout: Request timeout in seconds (unbatched searches)
+        """
+        self.api_key = api_key
+        self.num_results = num_results
+        self.cache = cache
+        self.batched = batched
+        self.batch_window_seconds = batch_window_seconds
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+
+    def search(self, query: str) -> SearchResultsOutput:
+        """Search one query (served from the response cache when possible)"""
+        with get_tracer().span("serper.search", cache_hit=True) as span:
+            def search():
+                if self.batched:
+                    # The batcher's own "serper.batch" span carries the request cost
+                    span.set(cache_hit=False, batched=True)
+                    return self._search_batched(query)
+                span.set(cache_hit=False, cost_usd=estimate_cost("serper", queries=1))
+                return self._search_single(query)
+
+            if self.cache is None:
+                output = search()
+            else:
+                output = self.cache.get_or_compute(
+                    "serper",
+                    [normalize_text(query), self.num_results],
+                    compute=search,
+                    encode=lambda output: output.model_dump(),
+                    decode=lambda cached: SearchResultsOutput(**cached),
+                    should_cache=lambda output: len(output.results) > 0
+                )
+            span.set(results=len(output.results))
+            return output
+
+    def _search_batched(self, query: str) -> SearchResultsOutput:
+        log.info(f"🔍 Queueing Serper search: '{query}' (batched)")
+        batcher = get_search_batcher(
+            self.api_key,
+            num_results=self.num_results,
+            window_seconds=self.batch_window_seconds,
+            max_batch_size=self.max_batch_size
+        )
+        data = batcher.search(query)
+
+        if data is None:
+            log.error(f"❌ Serper search failed for '{query}'")
+            return SearchResultsOutput(results=[], query_used=query)
+
+        output = search_output_from_response(query, data, self.num_results)
+        log.info(f"✅ Found {len(output.results)} results")
+        return output
+
+    def _search_single(self, query: str) -> SearchResultsOutput:
+        headers = {
+            "X-API-KEY": self.api_key,
+            "Content-Type": "application/json"
+        }
+        payload = {"q": query, "num": self.num_results}
+
+        try:
+            log.info(f"🔍 Searching Serper API: '{query}'")
+            response = http_post(SERPER_SEARCH_URL, headers=headers, json=payload, timeout=self.timeout)
+
+            if response.status_code == 200:
+                output = search_output_from_response(query, response.json(), self.num_results)
+                log.info(f"✅ Found {len(output.results)} results")
+                return output
+
+            log.error(f"❌ Serper API Error: {response.status_code}")
+            if response.status_code == 401:
+                log.warning("💡 Check your API key is correct")
+            elif response.status_code == 429:
+                log.warning("💡 Rate limit exceeded - wait a moment")
+            return SearchResultsOutput(results=[], query_used=query)
+
+        except Exception as e:
+            log.error(f"❌ Serper API Exception: {e}")
+            return SearchResultsOutput(results=[], query_used=query)
@@ -0,0 +1,64 @@
+"""
+Single-flight deduplication of concurrent work
+
+Ten contacts at the same company used to start ten identical search → select →
+scrape → summarize runs, several of them at the same time. SingleFlight lets
+the first caller for a key (e.g. a domain) do the work while every concurrent
+caller with the same key waits for and shares that one result. Combined with
+the persistent response cache (source "domain_pipeline"), later callers reuse
+the stored result until it expires.
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    def __init__(self):
+        """Collapse concurrent calls that share a key into one execution"""
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"executions": 0, "shared": 0}
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run func for key unless a call for the same key is already in flight
+
+        Args:
+            key: Deduplication key
+            func: Work to run (only by the first caller)
+
+        Returns:
+            Tuple of (result, shared) - shared is True when another caller's run was reused.
+            If the shared run raised, every waiting caller gets the same exception.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.stats["executions"] += 1
+            else:
+                self.stats["shared"] += 1
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed"""
+        with self._lock:
+            return len(self._calls)
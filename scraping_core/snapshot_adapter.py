@@ -0,0 +1,376 @@
+"""
+Per-dataset snapshot download negotiation
+
+Bright Data snapshots can be fetched from several endpoints (/snapshot/{id}
+with format=ndjson or json, /download/{id}, /snapshot/{id} without a format,
+the older /datasets/snapshots/{id}/download) and datasets answer in different
+shapes: NDJSON, a record array, a {"data": [...]} wrapper, a single object or
+plain text / HTML. The first download for a dataset_id tries the endpoints in
+order and remembers the one that answered, the payload shape and the field the
+scraped page lives in; later downloads and polls go straight to that endpoint
+and decode with the known shape. Learned formats are kept in the response
+cache, so new processes skip the probing as well. Snapshots a webhook receiver
+already delivered are read from their spool file without any request.
+"""
+
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+from scraping_core.http_client import http_get
+from scraping_core.response_cache import ResponseCache, get_response_cache
+from scraping_core.snapshot_poller import BRIGHTDATA_BASE_URL
+from scraping_core.snapshot_stream import WRAPPER_KEYS, SnapshotNotReadyError, iter_json_records
+from scraping_core.telemetry import get_logger
+from scraping_core.webhook_receiver import delivered_snapshot_path
+
+# Download endpoints in the order they are tried: name -> (path below the base URL, query params).
+# "../" paths are relative to the datasets API root instead of /v3.
+ENDPOINTS: Dict[str, Tuple[str, Dict[str, str]]] = {
+    "snapshot_ndjson": ("snapshot/{snapshot_id}", {"format": "ndjson"}),
+    "snapshot_json": ("snapshot/{snapshot_id}", {"format": "json"}),
+    "download": ("download/{snapshot_id}", {}),
+    "snapshot": ("snapshot/{snapshot_id}", {}),
+    "legacy_download": ("../snapshots/{snapshot_id}/download", {}),
+}
+
+# Record fields page-scrape datasets keep the scraped page in, in the order they are checked
+CONTENT_FIELDS = ("html", "page_html", "content", "body", "raw_html")
+# Keys of a 202 "still building" answer that hold the records collected so far
+PARTIAL_KEYS = ("partial_results", "current_results")
+# Wrapper key of a 200 answer that only holds part of the snapshot
+PARTIAL_WRAPPER_KEY = "partial_data"
+# Text / HTML answers are returned as one record with the body under this field
+TEXT_FIELD = "content"
+
+FORMAT_CACHE_SOURCE = "brightdata_format"
+
+log = get_logger("snapshot_adapter")
+
+
+def endpoint_url(base_url: str, endpoint: str, snapshot_id: str) -> str:
+    """Full download URL for one of the ENDPOINTS"""
+    path, _ = ENDPOINTS[endpoint]
+    base = base_url.rstrip("/")
+    if path.startswith("../"):
+        base, path = base.rsplit("/", 1)[0], path[3:]
+    return f"{base}/{path.format(snapshot_id=snapshot_id)}"
+
+
+class SnapshotFormat:
+    def __init__(self, endpoint: str, shape: Optional[str] = None, wrapper_key: Optional[str] = None,
+                 content_field: Optional[str] = None, partial_key: Optional[str] = None):
+        """
+        What a dataset's snapshot downloads look like
+
+        Args:
+            endpoint: Key of ENDPOINTS that answered
+            shape: Payload shape (ndjson, array, object, wrapper or text; None until seen in full)
+            wrapper_key: Key holding the record list when shape is "wrapper"
+            content_field: Record field holding the scraped page (page-scrape datasets)
+            partial_key: Key of 202 answers holding the records collected so far
+        """
+        self.endpoint = endpoint
+        self.shape = shape
+        self.wrapper_key = wrapper_key
+        self.content_field = content_field
+        self.partial_key = partial_key
+
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Optional["SnapshotFormat"]:
+        if not isinstance(data, dict) or data.get("endpoint") not in ENDPOINTS:
+            return None
+        return cls(**{key: data.get(key) for key in ("endpoint", "shape", "wrapper_key", "content_field",
+                                                      "partial_key")})
+
+    def __repr__(self) -> str:
+        return f"SnapshotFormat({self.endpoint!r}, shape={self.shape!r}, content_field={self.content_field!r})"
+
+
+# Learned formats per (base_url, dataset_id), shared by every adapter in the process
+_formats: Dict[Tuple[str, str], SnapshotFormat] = {}
+_formats_lock = threading.Lock()
+
+
+class SnapshotAdapter:
+    def __init__(self,
+                 api_token: str,
+                 dataset_id: str,
+                 base_url: str = BRIGHTDATA_BASE_URL,
+                 cache: Optional[ResponseCache] = None,
+                 timeout: int = 120,
+                 chunk_size: int = 64 * 1024):
+        """
+        Download and decode snapshots of one dataset
+
+        Args:
+            api_token: Your Bright Data API token
+            dataset_id: Dataset the snapshots belong to (formats are learned per dataset)
+            base_url: Bright Data datasets API base URL
+            cache: ResponseCache learned formats are persisted in (the shared one by default)
+            timeout: Request timeout in seconds
+            chunk_size: Bytes read per network chunk
+        """
+        self.api_token = api_token
+        self.dataset_id = dataset_id
+        self.base_url = base_url.rstrip("/")
+        self.cache = cache if cache is not None else get_response_cache()
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.headers = {"Authorization": f"Bearer {api_token}"}
+        self._key = (self.base_url, dataset_id)
+        self.stats = {"requests": 0, "probes": 0, "learned": 0}
+
+        with _formats_lock:
+            if self._key not in _formats:
+                learned = SnapshotFormat.from_dict(self.cache.get(FORMAT_CACHE_SOURCE, list(self._key)))
+                if learned is not None:
+                    _formats[self._key] = learned
+
+    @property
+    def format(self) -> Optional[SnapshotFormat]:
+        """The learned format (None until the first successful download)"""
+        return _formats.get(self._key)
+
+    def forget(self):
+        """Drop the learned format, so the next download probes the endpoints again"""
+        with _formats_lock:
+            _formats.pop(self._key, None)
+        self.cache.set(FORMAT_CACHE_SOURCE, list(self._key), {}, ttl=0)
+
+    def _learn(self, endpoint: str, **fields):
+        with _formats_lock:
+            current = _formats.get(self._key)
+            if current is None or current.endpoint != endpoint:
+                current = SnapshotFormat(endpoint)
+            before = current.to_dict()
+            for name, value in fields.items():
+                if value is not None:
+                    setattr(current, name, value)
+            if current.to_dict() == before and _formats.get(self._key) is current:
+                return
+            _formats[self._key] = current
+            learned = current.to_dict()
+
+        self.stats["learned"] += 1
+        self.cache.set(FORMAT_CACHE_SOURCE, list(self._key), learned)
+        log.debug(f"📐 Snapshot format for {self.dataset_id}: {learned}")
+
+    def _open(self, snapshot_id: str) -> Tuple[requests.Response, str]:
+        """
+        Request the snapshot from the learned endpoint, probing the others when it is unknown or fails
+
+        Returns:
+            (response answered 200 or 202, endpoint name)
+        """
+        known = self.format.endpoint if self.format else None
+        candidates = ([known] if known else []) + [name for name in ENDPOINTS if name != known]
+
+        failed = None
+        for attempt, endpoint in enumerate(candidates):
+            if attempt:
+                self.stats["probes"] += 1
+            self.stats["requests"] += 1
+            response = http_get(endpoint_url(self.base_url, endpoint, snapshot_id), headers=self.headers,
+                                params=ENDPOINTS[endpoint][1], stream=True, timeout=self.timeout)
+            if response.status_code in (200, 202):
+                return response, endpoint
+
+            response.close()
+            failed = response
+            log.debug(f"🔗 {endpoint} answered {response.status_code} for snapshot {snapshot_id}")
+
+        failed.raise_for_status()
+        raise requests.HTTPError(f"No download endpoint answered for snapshot {snapshot_id}", response=failed)
+
+    def _decode(self, response: requests.Response, endpoint: str, stats: Optional[Dict[str, Any]] = None,
+                shape: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        learned = self.format if self.format and self.format.endpoint == endpoint else None
+        shape = shape if shape is not None else {}
+
+        def counted_chunks():
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if stats is not None:
+                    stats["bytes"] = stats.get("bytes", 0) + len(chunk)
+                yield chunk
+
+        chunks = counted_chunks()
+        first = b""
+        for first in chunks:
+            if first.strip():
+                break
+
+        try:
+            if first.lstrip()[:1] not in (b"[", b"{"):
+                body = first + b"".join(chunks)
+                shape["shape"] = "text"
+                if stats is not None:
+                    stats["records"] = stats.get("records", 0) + 1
+                yield {TEXT_FIELD: body.decode(response.encoding or "utf-8", errors="replace")}
+                return
+
+            # A known shape decodes without looking for wrappers it does not use
+            if learned is not None and learned.shape is not None:
+                wrapper_keys = (learned.wrapper_key,) if learned.shape == "wrapper" else ()
+            else:
+                wrapper_keys = WRAPPER_KEYS
+            wrapper_keys = tuple(wrapper_keys) + (PARTIAL_WRAPPER_KEY,)
+
+            def all_chunks():
+                yield first
+                yield from chunks
+
+            for record in iter_json_records(all_chunks(), wrapper_keys, shape):
+                if stats is not None:
+                    stats["records"] = stats.get("records", 0) + 1
+                yield record
+        finally:
+            response.close()
+            # Partial answers say nothing about the finished snapshot's shape
+            if shape.get("wrapper_key") == PARTIAL_WRAPPER_KEY:
+                self._learn(endpoint)
+            else:
+                self._learn(endpoint, shape=shape.get("shape"), wrapper_key=shape.get("wrapper_key"))
+
+    def _read_delivered(self, path: str, stats: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """Decode a snapshot a webhook delivered to a spool file"""
+        with open(path, "rb") as f:
+            def counted_chunks():
+                for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                    if stats is not None:
+                        stats["bytes"] = stats.get("bytes", 0) + len(chunk)
+                    yield chunk
+
+            chunks = counted_chunks()
+            first = b""
+            for first in chunks:
+                if first.strip():
+                    break
+
+            if first.lstrip()[:1] not in (b"[", b"{"):
+                body = first + b"".join(chunks)
+                records = [{TEXT_FIELD: body.decode("utf-8", errors="replace")}] if body.strip() else []
+            else:
+                def all_chunks():
+                    yield first
+                    yield from chunks
+
+                records = iter_json_records(all_chunks(), WRAPPER_KEYS)
+
+            for record in records:
+                if stats is not None:
+                    stats["records"] = stats.get("records", 0) + 1
+                yield record
+
+    def iter_records(self, snapshot_id: str, stats: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """
+        Stream a finished snapshot record by record
+
+        Args:
+            snapshot_id: Snapshot to download
+            stats: Optional dict updated with "bytes" and "records" counters
+
+        Yields:
+            Snapshot records as they are decoded (text answers as one {"content": ...} record)
+
+        Raises:
+            SnapshotNotReadyError: The snapshot is still being built (HTTP 202)
+            requests.HTTPError: No endpoint answered
+        """
+        delivered = delivered_snapshot_path(snapshot_id)
+        if delivered:
+            yield from self._read_delivered(delivered, stats)
+            return
+
+        response, endpoint = self._open(snapshot_id)
+        if response.status_code == 202:
+            response.close()
+            raise SnapshotNotReadyError(snapshot_id)
+        yield from self._decode(response, endpoint, stats)
+
+    def records(self, snapshot_id: str, stats: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """All records of a finished snapshot (see iter_records)"""
+        return list(self.iter_records(snapshot_id, stats))
+
+    def poll_records(self, snapshot_id: str) -> Tuple[Optional[List[Any]], bool]:
+        """
+        Records collected so far for a snapshot that may still be running
+
+        Returns:
+            Tuple of (records or None, snapshot complete)
+        """
+        delivered = delivered_snapshot_path(snapshot_id)
+        if delivered:
+            return list(self._read_delivered(delivered)), True
+
+        response, endpoint = self._open(snapshot_id)
+        if response.status_code == 202:
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+            finally:
+                response.close()
+            if not isinstance(body, dict):
+                return None, False
+
+            known = self.format.partial_key if self.format else None
+            key = known if known in body else next((key for key in PARTIAL_KEYS if key in body), None)
+            if key is None:
+                return None, False
+            if key != known:
+                self._learn(endpoint, partial_key=key)
+            return body[key], False
+
+        shape: Dict[str, Any] = {}
+        records = list(self._decode(response, endpoint, shape=shape))
+        return records, shape.get("wrapper_key") != PARTIAL_WRAPPER_KEY
+
+    def content_of(self, record: Any) -> str:
+        """
+        The scraped page of a page-scrape record
+
+        The field is looked up once per dataset (CONTENT_FIELDS); records without
+        any of those fields are returned as a string.
+        """
+        if not isinstance(record, dict):
+            return str(record)
+
+        known = self.format.content_field if self.format else None
+        if known and known in record:
+            return str(record[known])
+
+        for field in CONTENT_FIELDS:
+            if field in record:
+                if self.format is not None:
+                    self._learn(self.format.endpoint, content_field=field)
+                return str(record[field])
+        return str(record)
+
+
+_adapters: Dict[Tuple[str, str, str], SnapshotAdapter] = {}
+_adapters_lock = threading.Lock()
+
+
+def get_snapshot_adapter(api_token: str, dataset_id: str, base_url: str = BRIGHTDATA_BASE_URL,
+                         **kwargs) -> SnapshotAdapter:
+    """
+    Return the process-wide adapter for an API token and dataset (created on first use)
+
+    Args:
+        api_token: Your Bright Data API token
+        dataset_id: Dataset the snapshots belong to
+        base_url: Bright Data datasets API base URL
+        **kwargs: Extra SnapshotAdapter settings (only used when the adapter is created)
+    """
+    key = (api_token, dataset_id, base_url.rstrip("/"))
+    with _adapters_lock:
+        adapter = _adapters.get(key)
+        if adapter is None:
+            adapter = SnapshotAdapter(api_token, dataset_id, base_url, **kwargs)
+            _adapters[key] = adapter
+        return adapter
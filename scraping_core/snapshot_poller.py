@@ -0,0 +1,416 @@
+"""
+Shared, multiplexed poller for Bright Data snapshot jobs
+
+Instead of every caller running its own `while True: ...; time.sleep(30)` loop
+for a single snapshot_id, callers register snapshot_ids with one SnapshotPoller.
+A single background thread checks `/progress/{snapshot_id}` for all due jobs in
+small concurrent batches, on a per-job adaptive backoff schedule (fast at first,
+slower for long-running jobs), and resolves a Future / runs callbacks as soon as
+each snapshot is ready. Every caller waiting on a snapshot has its own Future
+and deadline: a caller that times out or cancels only stops its own wait, and a
+snapshot is dropped (and, on cancel, cancelled remotely) once nobody waits for
+it any more. When a webhook receiver is running, pushed "ready"
+notifications resolve jobs immediately and polling slows to the receiver's
+fallback interval.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Callable, Dict, List, Optional
+
+from scraping_core.http_client import http_get, http_post
+from scraping_core.telemetry import current_run_id, get_logger, get_tracer
+from scraping_core.webhook_receiver import get_webhook_receiver
+
+BRIGHTDATA_BASE_URL = "https://api.brightdata.com/datasets/v3"
+
+READY_STATUSES = ("ready", "done")
+FAILED_STATUSES = ("failed",)
+
+# How long a push for a snapshot nobody tracks yet is kept (it may arrive before track())
+PUSH_RETENTION_SECONDS = 60 * 60
+
+# How long result() waits past a waiter's deadline for the poller thread to expire it
+DEADLINE_SLACK_SECONDS = 5
+
+log = get_logger("poller")
+
+
+class _Waiter:
+    def __init__(self, deadline: Optional[float], callback: Optional[Callable[[Dict], None]]):
+        self.future: Future = Future()
+        self.callback = callback
+        self.deadline = deadline
+        self.started_at = time.time()
+        self.run_id = current_run_id()
+        self.done = False       # Claimed by the first _finish_waiters() (resolve, timeout or cancel)
+
+
+class _PollJob:
+    def __init__(self, snapshot_id: str, interval: float, max_interval: float):
+        self.snapshot_id = snapshot_id
+        self.waiters: List[_Waiter] = []
+        self.interval = interval
+        self.max_interval = max_interval
+        self.next_check = time.time()
+        self.polls = 0
+        self.errors = 0
+        self.last_progress: Dict = {}
+        self.resolved = False   # Claimed by the first _resolve() (poll, push or stop), or when the last waiter left
+
+
+class SnapshotPoller:
+    def __init__(self,
+                 api_token: str,
+                 base_url: str = BRIGHTDATA_BASE_URL,
+                 min_interval: float = 2.0,
+                 max_interval: float = 30.0,
+                 backoff_factor: float = 1.5,
+                 max_concurrent_checks: int = 8,
+                 max_errors: int = 3,
+                 request_timeout: int = 30):
+        """
+        Initialize the shared snapshot poller
+
+        Args:
+            api_token: Your Bright Data API token
+            base_url: Bright Data datasets API base URL
+            min_interval: First poll delay for a new job (seconds)
+            max_interval: Upper bound for the per-job poll delay (seconds)
+            backoff_factor: Multiplier applied to a job's delay after each "still running" answer
+            max_concurrent_checks: How many /progress requests may run in one batch
+            max_errors: Consecutive request errors before a job is resolved as "error"
+            request_timeout: Timeout for each /progress request (seconds)
+        """
+        self.api_token = api_token
+        self.base_url = base_url.rstrip("/")
+        self.headers = {
+            "Authorization": f"Bearer {api_token}",
+            "Content-Type": "application/json"
+        }
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.max_concurrent_checks = max_concurrent_checks
+        self.max_errors = max_errors
+        self.request_timeout = request_timeout
+
+        self._jobs: Dict[str, _PollJob] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._receiver = None
+        self._pushed: Dict[str, tuple] = {}
+        self.stats = {"tracked": 0, "polls": 0, "pushed": 0, "ready": 0, "failed": 0, "timeouts": 0, "cancelled": 0,
+                      "errors": 0}
+
+    # ------------------------------------------------------------------ public API
+
+    def track(self,
+              snapshot_id: str,
+              callback: Optional[Callable[[Dict], None]] = None,
+              max_wait: Optional[float] = None,
+              max_interval: Optional[float] = None) -> Future:
+        """
+        Start waiting for a snapshot_id (tracking the same id twice shares one poll stream)
+
+        Args:
+            snapshot_id: Bright Data snapshot ID returned by /trigger
+            callback: Optional function called with this waiter's outcome dict
+            max_wait: Stop this wait after this many seconds (resolves with status "timeout");
+                      other waiters of the same snapshot keep their own deadlines
+            max_interval: Optional cap on the poll delay for this job
+
+        Returns:
+            This waiter's Future, resolving to a dict with snapshot_id, status ("ready",
+            "failed", "timeout", "cancelled" or "error"), progress (last /progress payload),
+            polls, waited and delivery ("poll" or "webhook")
+        """
+        receiver = get_webhook_receiver()
+        if receiver is not None and receiver is not self._receiver:
+            receiver.add_listener(self.push)
+            self._receiver = receiver
+
+        pushed = None
+        with self._lock:
+            job = self._jobs.get(snapshot_id)
+            if job is None:
+                job = _PollJob(snapshot_id, self.min_interval, min(max_interval or self.max_interval, self.max_interval))
+                if receiver is not None:
+                    # The push normally finishes the job; after the first check, poll only as a fallback
+                    job.interval = job.max_interval = max(job.max_interval, receiver.fallback_interval)
+                self._jobs[snapshot_id] = job
+                self.stats["tracked"] += 1
+                pushed = self._pushed.pop(snapshot_id, None)
+
+            waiter = _Waiter(time.time() + max_wait if max_wait else None, callback)
+            job.waiters.append(waiter)
+            self._ensure_running()
+
+        if pushed is not None:
+            self._resolve(job, pushed[0], delivery="webhook")
+        self._wakeup.set()
+        return waiter.future
+
+    def push(self, snapshot_id: str, status: str, details: Optional[Dict] = None):
+        """
+        Resolve a job from a pushed status (webhook notification) instead of waiting for its next poll
+
+        Args:
+            snapshot_id: Bright Data snapshot ID
+            status: Pushed snapshot status; anything but ready / failed is ignored
+            details: Extra push information (unused, kept for the listener signature)
+        """
+        status = str(status).lower()
+        if status in READY_STATUSES:
+            outcome = "ready"
+        elif status in FAILED_STATUSES:
+            outcome = "failed"
+        else:
+            return
+
+        self.stats["pushed"] += 1
+        with self._lock:
+            job = self._jobs.get(snapshot_id)
+            if job is None:
+                now = time.time()
+                self._pushed = {key: value for key, value in self._pushed.items()
+                                if now - value[1] < PUSH_RETENTION_SECONDS}
+                self._pushed[snapshot_id] = (outcome, now)
+                return
+        self._resolve(job, outcome, delivery="webhook")
+
+    def wait(self, snapshot_id: str, timeout: Optional[float] = None) -> Dict:
+        """
+        Block until the snapshot resolves (convenience wrapper around track() + result())
+
+        Args:
+            snapshot_id: Bright Data snapshot ID
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Outcome dict (see track())
+        """
+        return self.result(snapshot_id, self.track(snapshot_id, max_wait=timeout), timeout)
+
+    def result(self, snapshot_id: str, waiter: Future, timeout: Optional[float] = None) -> Dict:
+        """
+        Block until a waiter returned by track() resolves, at most `timeout` seconds
+
+        Returns:
+            Outcome dict (see track()); status "timeout" once the time is up
+        """
+        try:
+            return waiter.result(timeout=timeout + DEADLINE_SLACK_SECONDS if timeout else None)
+        except FuturesTimeoutError:
+            # The poller thread normally expires the waiter itself; never block past the deadline
+            self._detach(snapshot_id, waiter, "timeout")
+            return waiter.result()
+
+    async def wait_async(self, snapshot_id: str, timeout: Optional[float] = None) -> Dict:
+        """
+        Await the snapshot outcome from asyncio code without blocking the event loop
+        """
+        return await asyncio.wrap_future(self.track(snapshot_id, max_wait=timeout))
+
+    def cancel(self, snapshot_id: str, waiter: Optional[Future] = None, remote: bool = True) -> bool:
+        """
+        Stop one caller's wait for a snapshot (e.g. the loser of a hedged scrape)
+
+        Other callers waiting on the same snapshot keep waiting; the snapshot is only
+        dropped, and cancelled at Bright Data, once nobody waits for it any more.
+
+        Args:
+            snapshot_id: Bright Data snapshot ID
+            waiter: The Future track() returned to this caller (None cancels every waiter)
+            remote: Ask Bright Data to cancel the collection when this was the last waiter
+
+        Returns:
+            True if the snapshot is no longer tracked (the cancelled waiters get status "cancelled")
+        """
+        last = self._detach(snapshot_id, waiter, "cancelled")
+        if last and remote:
+            try:
+                response = http_post(f"{self.base_url}/snapshot/{snapshot_id}/cancel", headers=self.headers,
+                                     timeout=self.request_timeout, retries=0)
+                if not response.ok:
+                    log.debug(f"🛑 Cancelling snapshot {snapshot_id} answered {response.status_code}")
+            except Exception as e:
+                log.debug(f"🛑 Cancelling snapshot {snapshot_id} failed: {e}")
+        return last
+
+    def pending(self) -> List[str]:
+        """Snapshot IDs still being polled"""
+        with self._lock:
+            return list(self._jobs)
+
+    def stop(self):
+        """Stop the background thread (pending futures are resolved with status "error")"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+            self._jobs.clear()
+            thread = self._thread
+            self._thread = None
+        self._wakeup.set()
+        for job in jobs:
+            self._resolve(job, "error")
+        if thread:
+            thread.join(timeout=5)
+        if self._executor:
+            self._executor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------ internals
+
+    def _ensure_running(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent_checks)
+            self._thread = threading.Thread(target=self._run, name="SnapshotPoller", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        me = threading.current_thread()
+        while True:
+            with self._lock:
+                if self._thread is not me:
+                    break
+                now = time.time()
+                expired = [(job, waiter) for job in self._jobs.values() for waiter in job.waiters
+                           if waiter.deadline and now >= waiter.deadline]
+                active = list(self._jobs.values())
+                upcoming = [job.next_check for job in active if job.next_check > now]
+                deadlines = [waiter.deadline for job in active for waiter in job.waiters
+                             if waiter.deadline and waiter.deadline > now]
+
+            # Expire waiters that ran out of time; a job nobody waits for any more is not polled again
+            for job, waiter in expired:
+                self._detach(job.snapshot_id, waiter.future, "timeout")
+            due = [job for job in active if not job.resolved and job.next_check <= now]
+
+            if due:
+                # One batch of concurrent /progress checks for every due job
+                list(self._executor.map(self._check, due))
+                continue
+
+            wake_times = upcoming + deadlines
+            self._wakeup.clear()
+            if wake_times:
+                self._wakeup.wait(max(0.0, min(wake_times) - time.time()))
+            else:
+                self._wakeup.wait()
+
+    def _check(self, job: _PollJob):
+        job.polls += 1
+        self.stats["polls"] += 1
+        progress_url = f"{self.base_url}/progress/{job.snapshot_id}"
+
+        try:
+            response = http_get(progress_url, headers=self.headers, timeout=self.request_timeout, retries=0)
+
+            if not response.ok:
+                raise RuntimeError(f"HTTP {response.status_code}")
+
+            progress = response.json()
+            job.last_progress = progress
+            job.errors = 0
+            status = str(progress.get("status", "unknown")).lower()
+
+            if status in READY_STATUSES:
+                self._resolve(job, "ready")
+                return
+            if status in FAILED_STATUSES:
+                self._resolve(job, "failed")
+                return
+
+        except Exception as e:
+            job.errors += 1
+            if job.errors >= self.max_errors:
+                log.error(f"❌ Snapshot {job.snapshot_id}: giving up after {job.errors} poll errors ({e})")
+                self._resolve(job, "error")
+                return
+
+        # Still running (or a transient error) - back off before the next check
+        job.next_check = time.time() + job.interval
+        job.interval = min(job.interval * self.backoff_factor, job.max_interval)
+
+    def _resolve(self, job: _PollJob, status: str, delivery: str = "poll"):
+        # A push (webhook thread) and a poll can finish the same job at once - only the first claim resolves it
+        with self._lock:
+            if job.resolved:
+                return
+            job.resolved = True
+            if self._jobs.get(job.snapshot_id) is job:
+                del self._jobs[job.snapshot_id]
+            waiters, job.waiters = job.waiters, []
+        self._finish_waiters(job, waiters, status, delivery)
+
+    def _detach(self, snapshot_id: str, future: Optional[Future], status: str) -> bool:
+        """Resolve one waiter (or every waiter when future is None) on its own; True when none is left"""
+        with self._lock:
+            job = self._jobs.get(snapshot_id)
+            if job is None:
+                return False
+            waiters = [waiter for waiter in job.waiters if future is None or waiter.future is future]
+            if not waiters:
+                return False
+            job.waiters = [waiter for waiter in job.waiters if waiter not in waiters]
+            last = not job.waiters
+            if last:
+                job.resolved = True
+                del self._jobs[snapshot_id]
+        self._finish_waiters(job, waiters, status, "poll")
+        return last
+
+    def _finish_waiters(self, job: _PollJob, waiters: List[_Waiter], status: str, delivery: str):
+        for waiter in waiters:
+            with self._lock:
+                if waiter.done:
+                    continue
+                waiter.done = True
+
+            outcome = {
+                "snapshot_id": job.snapshot_id,
+                "status": status,
+                "progress": job.last_progress,
+                "polls": job.polls,
+                "waited": time.time() - waiter.started_at,
+                "delivery": delivery,
+            }
+            stats_key = {"ready": "ready", "failed": "failed", "timeout": "timeouts",
+                         "cancelled": "cancelled"}.get(status, "errors")
+            self.stats[stats_key] += 1
+            # Polling runs on the poller thread, so the wait is recorded against the run that registered it
+            get_tracer().record("brightdata.wait", outcome["waited"], status="ok" if status == "ready" else status,
+                                run_id=waiter.run_id, snapshot_id=job.snapshot_id, polls=job.polls,
+                                delivery=delivery)
+
+            waiter.future.set_result(outcome)
+            if waiter.callback:
+                try:
+                    waiter.callback(outcome)
+                except Exception as e:
+                    log.warning(f"⚠️ Snapshot poller callback failed for {job.snapshot_id}: {e}")
+
+
+_pollers: Dict[tuple, SnapshotPoller] = {}
+_pollers_lock = threading.Lock()
+
+
+def get_snapshot_poller(api_token: str, base_url: str = BRIGHTDATA_BASE_URL, **kwargs) -> SnapshotPoller:
+    """
+    Return the process-wide poller for an API token (created on first use)
+
+    Args:
+        api_token: Your Bright Data API token
+        base_url: Bright Data datasets API base URL
+        **kwargs: Extra SnapshotPoller settings (only used when the poller is created)
+    """
+    key = (api_token, base_url.rstrip("/"))
+    with _pollers_lock:
+        poller = _pollers.get(key)
+        if poller is None:
+            poller = SnapshotPoller(api_token, base_url, **kwargs)
+            _pollers[key] = poller
+        return poller
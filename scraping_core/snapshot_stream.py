@@ -0,0 +1,214 @@
+"""
+Streaming snapshot downloads and append-only JSONL output
+
+Bright Data snapshots can hold thousands of records. Instead of calling
+`response.json()` on the whole body (and keeping every profile dict in memory),
+these helpers request the NDJSON format, stream the body and decode one record
+at a time, so filtering/scoring can start on the first record and results can
+be appended to disk as they are found.
+"""
+
+import codecs
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
+
+from scraping_core.http_client import http_get
+from scraping_core.snapshot_poller import BRIGHTDATA_BASE_URL
+
+WRAPPER_KEYS = ("data", "results")
+
+
+class SnapshotNotReadyError(Exception):
+    """Raised when a snapshot download is answered with 202 (still building)"""
+
+
+def iter_json_records(chunks: Iterable[bytes],
+                      wrapper_keys: Sequence[str] = WRAPPER_KEYS,
+                      shape: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """
+    Incrementally decode records from a byte stream
+
+    Handles NDJSON (one object per line), a top-level JSON array, and a single
+    wrapper object like {"data": [...]} (whose list items are yielded).
+
+    Args:
+        chunks: Iterable of raw byte chunks (e.g. response.iter_content())
+        wrapper_keys: Keys of a single top-level object that hold the record list
+                      (empty when the shape is already known not to be a wrapper)
+        shape: Optional dict filled with the detected "shape" (array, ndjson, object,
+               wrapper) and "wrapper_key"
+
+    Yields:
+        Decoded records, one at a time
+    """
+    shape = shape if shape is not None else {}
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    in_array = False
+    started = False
+    held = None       # First top-level object, held back until we know it is not a wrapper
+    top_level_count = 0
+
+    def decoded_chunks():
+        for chunk in chunks:
+            if chunk:
+                yield text_decoder.decode(chunk)
+        yield text_decoder.decode(b"", final=True)
+
+    for text in decoded_chunks():
+        buffer += text
+        pos = 0
+
+        while True:
+            # Skip whitespace and array separators
+            while pos < len(buffer) and (buffer[pos].isspace() or (in_array and buffer[pos] == ",")):
+                pos += 1
+            if pos >= len(buffer):
+                break
+
+            if not started:
+                started = True
+                if buffer[pos] == "[":
+                    in_array = True
+                    shape["shape"] = "array"
+                    pos += 1
+                    continue
+                if buffer[pos] != "{":
+                    raise ValueError("Snapshot body is not JSON / NDJSON")
+
+            if in_array and buffer[pos] == "]":
+                pos += 1
+                continue
+
+            try:
+                obj, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # Need more data
+
+            if in_array:
+                yield obj
+                continue
+
+            top_level_count += 1
+            if top_level_count == 1:
+                held = obj
+                continue
+            if held is not None:
+                shape["shape"] = "ndjson"
+                yield held
+                held = None
+            yield obj
+
+        buffer = buffer[pos:]
+
+    if buffer.strip() and buffer.strip() != "]":
+        raise ValueError(f"Truncated JSON at end of snapshot stream: {buffer[:100]!r}")
+
+    if held is not None:
+        # A single top-level object may be a wrapper around the record list
+        if top_level_count == 1 and isinstance(held, dict):
+            for key in wrapper_keys:
+                if isinstance(held.get(key), list):
+                    shape.update(shape="wrapper", wrapper_key=key)
+                    yield from held[key]
+                    return
+        shape["shape"] = "object"
+        yield held
+
+
+def iter_snapshot_records(api_token: str,
+                          snapshot_id: str,
+                          base_url: str = BRIGHTDATA_BASE_URL,
+                          format_type: str = "ndjson",
+                          chunk_size: int = 64 * 1024,
+                          timeout: int = 120,
+                          stats: Optional[Dict[str, int]] = None) -> Iterator[Any]:
+    """
+    Stream a Bright Data snapshot record by record
+
+    Args:
+        api_token: Your Bright Data API token
+        snapshot_id: Snapshot to download
+        base_url: Bright Data datasets API base URL
+        format_type: Snapshot format to request (ndjson keeps memory flat; json also works)
+        chunk_size: Bytes read per network chunk
+        timeout: Request timeout in seconds
+        stats: Optional dict updated with "bytes" and "records" counters
+
+    Yields:
+        Snapshot records as they are decoded
+
+    Raises:
+        SnapshotNotReadyError: The snapshot is still being built (HTTP 202)
+        requests.HTTPError: Any other non-200 answer
+    """
+    headers = {"Authorization": f"Bearer {api_token}"}
+    url = f"{base_url.rstrip('/')}/snapshot/{snapshot_id}"
+
+    with http_get(url, headers=headers, params={"format": format_type},
+                  stream=True, timeout=timeout) as response:
+        if response.status_code == 202:
+            raise SnapshotNotReadyError(snapshot_id)
+        response.raise_for_status()
+
+        def counted_chunks():
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if stats is not None:
+                    stats["bytes"] = stats.get("bytes", 0) + len(chunk)
+                yield chunk
+
+        for record in iter_json_records(counted_chunks()):
+            if stats is not None:
+                stats["records"] = stats.get("records", 0) + 1
+            yield record
+
+
+class JsonlWriter:
+    def __init__(self, path: str, flush_every: int = 50):
+        """
+        Append-only JSON Lines writer
+
+        Args:
+            path: Output file; created if missing, appended to otherwise
+            flush_every: Flush to disk after this many records
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.count = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str))
+        self._file.write("\n")
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield records back from a JSONL file written by JsonlWriter"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def timestamped_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a record tagged with when it was written"""
+    return dict(record, _saved_at=datetime.now().isoformat())
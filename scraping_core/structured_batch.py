@@ -0,0 +1,196 @@
+"""
+Micro-batched, schema-constrained LLM calls
+
+Each email used to cost one Gemini round-trip per LLM stage (search query, URL
+selection, summary), answered as free text and parsed with regexes. A
+StructuredBatcher collects the prompts concurrent callers submit for one stage
+during a short window, sends them as a single request whose response is
+constrained to a JSON array schema derived from the stage's Pydantic model, and
+hands every caller back its own validated model instance.
+"""
+
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
+
+from scraping_core.telemetry import get_logger, get_tracer
+
+log = get_logger("gemini")
+
+# Python annotation -> OpenAPI schema type used by Gemini's response_schema
+_SCHEMA_TYPES = {str: "STRING", float: "NUMBER", int: "INTEGER", bool: "BOOLEAN"}
+
+
+def response_schema(model: Type, exclude_fields: Sequence[str] = ()) -> Dict[str, Any]:
+    """
+    JSON array schema for a batch of `model` answers, each tagged with its task id
+
+    Args:
+        model: Pydantic model with str / float / int / bool fields
+        exclude_fields: Fields the caller fills in itself (e.g. timestamps)
+    """
+    properties = {"id": {"type": "STRING"}}
+    for name, field in model.model_fields.items():
+        if name in exclude_fields:
+            continue
+        properties[name] = {"type": _SCHEMA_TYPES.get(field.annotation, "STRING")}
+        if field.description:
+            properties[name]["description"] = field.description
+
+    return {
+        "type": "ARRAY",
+        "items": {"type": "OBJECT", "properties": properties, "required": list(properties)},
+    }
+
+
+def build_batch_prompt(tasks: Dict[str, str]) -> str:
+    """Wrap independent task prompts into one request answered as a JSON array"""
+    parts = [
+        f"You will receive {len(tasks)} independent tasks. Solve each one on its own, following its instructions.",
+        'Return a JSON array with exactly one object per task, containing the task\'s "id" and the requested fields.',
+    ]
+    for task_id, prompt in tasks.items():
+        parts.append(f"### Task id: {task_id}\n{prompt.strip()}")
+    return "\n\n".join(parts)
+
+
+class _PendingTask:
+    def __init__(self, prompt: str):
+        self.prompt = prompt
+        self.future: Future = Future()
+
+
+class StructuredBatcher:
+    def __init__(self,
+                 generate_json: Callable[[str, Dict[str, Any]], str],
+                 output_model: Type,
+                 exclude_fields: Sequence[str] = (),
+                 defaults: Optional[Callable[[], Dict[str, Any]]] = None,
+                 window_seconds: float = 0.5,
+                 max_batch_size: int = 10,
+                 cache=None,
+                 cache_key_prefix: Sequence[Any] = ()):
+        """
+        Initialize a batcher for one LLM stage
+
+        Args:
+            generate_json: Sends (prompt, response schema) to the model and returns the JSON text
+            output_model: Pydantic model every answer is validated into
+            exclude_fields: Model fields not requested from the LLM
+            defaults: Returns values for the excluded fields when an answer is built
+            window_seconds: How long to wait for more prompts before sending a batch
+            max_batch_size: Send as soon as this many distinct prompts are queued
+            cache: Optional ResponseCache; answers are cached per prompt under "gemini"
+            cache_key_prefix: Extra cache key parts (model name, temperature, ...)
+        """
+        self.generate_json = generate_json
+        self.output_model = output_model
+        self.exclude_fields = tuple(exclude_fields)
+        self.defaults = defaults
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self.cache = cache
+        self.cache_key_prefix = list(cache_key_prefix) + ["batched", output_model.__name__]
+        self.schema = response_schema(output_model, self.exclude_fields)
+
+        self._pending: List[_PendingTask] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._executor = ThreadPoolExecutor(max_workers=4)
+        self.stats = {"tasks": 0, "requests": 0, "cache_hits": 0, "failed": 0}
+
+    def _build(self, values: Dict[str, Any]):
+        values = {name: values[name] for name in self.schema["items"]["properties"] if name != "id"}
+        if self.defaults:
+            values.update(self.defaults())
+        return self.output_model(**values)
+
+    def submit(self, prompt: str) -> Future:
+        """
+        Queue one rendered prompt
+
+        Returns:
+            Future resolving to an output_model instance, or None if the batch failed
+            (callers then fall back to their single-prompt path)
+        """
+        self.stats["tasks"] += 1
+        task = _PendingTask(prompt)
+
+        if self.cache is not None:
+            cached = self.cache.get("gemini", self.cache_key_prefix + [prompt.strip()])
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                task.future.set_result(self._build(cached))
+                return task.future
+
+        with self._lock:
+            self._pending.append(task)
+            distinct_prompts = len({t.prompt for t in self._pending})
+
+            if distinct_prompts >= self.max_batch_size:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        return task.future
+
+    def run(self, prompt: str, timeout: Optional[float] = None):
+        """Blocking helper: submit one prompt and wait for its answer"""
+        return self.submit(prompt).result(timeout=timeout)
+
+    def flush(self):
+        """Send whatever is queued right now"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending:
+            batch, self._pending = self._pending, []
+            self._executor.submit(self._send_batch, batch)
+
+    def _send_batch(self, batch: List[_PendingTask]):
+        # Identical prompts from different callers are only asked once
+        task_ids: Dict[str, str] = {}
+        for task in batch:
+            task_ids.setdefault(task.prompt, f"t{len(task_ids)}")
+        tasks = {task_id: prompt for prompt, task_id in task_ids.items()}
+
+        log.info(f"🧠 Sending batched Gemini request: {len(tasks)} prompts for {len(batch)} callers")
+
+        answers: Dict[str, Dict[str, Any]] = {}
+        with get_tracer().span("gemini.batch", prompts=len(tasks), callers=len(batch)) as span:
+            try:
+                self.stats["requests"] += 1
+                parsed = json.loads(self.generate_json(build_batch_prompt(tasks), self.schema))
+                if isinstance(parsed, dict):
+                    parsed = next((v for v in parsed.values() if isinstance(v, list)), [parsed])
+                for answer in parsed:
+                    if isinstance(answer, dict) and answer.get("id") in tasks:
+                        answers[answer["id"]] = answer
+            except Exception as e:
+                span.set(error=str(e))
+                log.warning(f"⚠️ Batched Gemini request failed: {e}")
+            span.set(answers=len(answers))
+
+        for task in batch:
+            if task.future.done():
+                continue
+            answer = answers.get(task_ids[task.prompt])
+            result = None
+            if answer is not None:
+                try:
+                    result = self._build(answer)
+                    if self.cache is not None:
+                        stored = {k: v for k, v in answer.items() if k != "id"}
+                        self.cache.set("gemini", self.cache_key_prefix + [task.prompt.strip()], stored)
+                except Exception as e:
+                    log.warning(f"⚠️ Invalid batched answer for task {task_ids[task.prompt]}: {e}")
+            if result is None:
+                self.stats["failed"] += 1
+            task.future.set_result(result)
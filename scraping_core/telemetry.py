@@ -0,0 +1,425 @@
+"""
+Per-stage timing, tracing, cost estimates and leveled logging
+
+The only visibility into a run used to be emoji `print` calls, so there was no
+way to tell where the time (or the money) went under load. This module adds:
+
+- get_logger(): loggers under "scraping" that print the same emoji lines by
+  default (message only, to stdout) but honor levels - SCRAPING_LOG_LEVEL or
+  configure_logging("WARNING") silences progress chatter in batch runs
+- Tracer.span(): timed spans for each stage (domain extraction, Serper search,
+  Gemini call, Bright Data trigger / poll / download, HTML extraction, ...)
+  tagged with the current run id (usually the email) and nested via contextvars
+- estimate_cost(): rough per-call USD cost from DEFAULT_COSTS
+- sinks: JSONL file, Prometheus text exposition (optionally served on a port)
+  and OpenTelemetry (when the opentelemetry package is installed)
+"""
+
+import contextvars
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+LOGGER_NAME = "scraping"
+
+# Rough list prices in USD - adjust to your plans
+DEFAULT_COSTS = {
+    "serper": {"queries": 0.001},                                        # $1 per 1k searches
+    "gemini": {"prompt_tokens": 0.075 / 1e6, "response_tokens": 0.30 / 1e6},
+    "brightdata": {"records": 0.0015},                                   # $1.5 per 1k records
+}
+
+# Numeric span attributes that are summed into Prometheus counters
+COUNTED_ATTRIBUTES = ("bytes", "records", "polls", "prompt_tokens", "response_tokens", "cost_usd", "retries")
+
+# Histogram buckets for span durations (seconds)
+DURATION_BUCKETS = (0.005, 0.025, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("scraping_current_span", default=None)
+_current_run: contextvars.ContextVar = contextvars.ContextVar("scraping_current_run", default=None)
+_span_ids = itertools.count(1)
+
+
+# ---------------------------------------------------------------------- logging
+
+def configure_logging(level: Optional[str] = None, fmt: str = "%(message)s",
+                      handler: Optional[logging.Handler] = None) -> logging.Logger:
+    """
+    Set up the "scraping" logger hierarchy
+
+    Args:
+        level: Level name or number (defaults to SCRAPING_LOG_LEVEL, then INFO)
+        fmt: Log line format (the default keeps the notebooks' emoji output unchanged)
+        handler: Handler to use instead of printing to stdout
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    for existing in list(logger.handlers):
+        logger.removeHandler(existing)
+
+    handler = handler or logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter(fmt))
+    logger.addHandler(handler)
+    logger.setLevel(level or os.environ.get("SCRAPING_LOG_LEVEL", "INFO"))
+    logger.propagate = False
+    return logger
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger "scraping.<name>" (the hierarchy is configured on first use)"""
+    if not logging.getLogger(LOGGER_NAME).handlers:
+        configure_logging()
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+log = get_logger("telemetry")
+
+
+# ---------------------------------------------------------------------- spans
+
+def estimate_cost(service: str, **usage: float) -> float:
+    """USD estimate for one call, e.g. estimate_cost("gemini", prompt_tokens=900, response_tokens=60)"""
+    prices = DEFAULT_COSTS.get(service, {})
+    return round(sum(prices.get(unit, 0.0) * amount for unit, amount in usage.items()), 8)
+
+
+class Span:
+    __slots__ = ("name", "span_id", "parent_id", "run_id", "start", "end", "attributes", "status", "error")
+
+    def __init__(self, name: str, run_id: Optional[str], parent_id: Optional[int], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = next(_span_ids)
+        self.parent_id = parent_id
+        self.run_id = run_id
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.attributes = attributes
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.time()) - self.start
+
+    def set(self, **attributes: Any) -> "Span":
+        self.attributes.update(attributes)
+        return self
+
+    def add(self, key: str, amount: float = 1) -> "Span":
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "run_id": self.run_id,
+            "start": self.start,
+            "duration": round(self.duration, 6),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class Tracer:
+    def __init__(self, sinks: Optional[List[Any]] = None, enabled: bool = True):
+        """
+        Create spans and hand finished ones to the sinks
+
+        Args:
+            sinks: Objects with on_end(span) and optionally on_start(span)
+            enabled: When False, span() still yields a Span but nothing is recorded
+        """
+        self.sinks = list(sinks or [])
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.totals: Dict[str, Dict[str, float]] = {}
+
+    def add_sink(self, sink: Any):
+        self.sinks.append(sink)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """
+        Time a block as a span of the current run
+
+        Exceptions mark the span as failed and are re-raised.
+        """
+        parent = _current_span.get()
+        span = Span(name, _current_run.get(), parent.span_id if parent else None, attributes)
+        token = _current_span.set(span)
+        self._notify("on_start", span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            self._finish(span)
+
+    def record(self, name: str, duration: float, status: str = "ok", run_id: Optional[str] = None,
+               **attributes: Any) -> Span:
+        """
+        Add an already measured span (e.g. a wait reported by the SnapshotPoller)
+
+        Args:
+            name: Span name
+            duration: Seconds the span lasted (it ends now)
+            status: "ok" or an error status
+            run_id: Run to attribute it to when recording from another thread
+            **attributes: Span attributes
+        """
+        parent = _current_span.get()
+        span = Span(name, run_id or _current_run.get(), parent.span_id if parent else None, attributes)
+        span.start -= duration
+        span.status = status
+        self._notify("on_start", span)
+        self._finish(span)
+        return span
+
+    def _finish(self, span: Span):
+        span.end = time.time()
+        if not self.enabled:
+            return
+        with self._lock:
+            total = self.totals.setdefault(span.name, {"count": 0, "seconds": 0.0, "errors": 0})
+            total["count"] += 1
+            total["seconds"] += span.duration
+            total["errors"] += span.status != "ok"
+        self._notify("on_end", span)
+
+    def _notify(self, hook: str, span: Span):
+        if not self.enabled:
+            return
+        for sink in self.sinks:
+            handler = getattr(sink, hook, None)
+            if handler is None:
+                continue
+            try:
+                handler(span)
+            except Exception as e:
+                log.warning(f"⚠️ Telemetry sink {type(sink).__name__} failed: {e}")
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, total / mean seconds and errors per span name, slowest first"""
+        with self._lock:
+            rows = {name: dict(total, mean=total["seconds"] / total["count"]) for name, total in self.totals.items()}
+        return dict(sorted(rows.items(), key=lambda item: item[1]["seconds"], reverse=True))
+
+
+@contextmanager
+def run_context(run_id: str) -> Iterator[None]:
+    """Tag every span started inside the block with run_id (e.g. the email being analyzed)"""
+    token = _current_run.set(run_id)
+    try:
+        yield
+    finally:
+        _current_run.reset(token)
+
+
+def current_run_id() -> Optional[str]:
+    return _current_run.get()
+
+
+def traced(name: Optional[str] = None, **attributes: Any) -> Callable:
+    """Decorator: run the function inside a span (named after the function by default)"""
+    def decorate(func):
+        span_name = name or func.__qualname__
+
+        def wrapper(*args, **kwargs):
+            with get_tracer().span(span_name, **attributes):
+                return func(*args, **kwargs)
+
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
+    return decorate
+
+
+# ---------------------------------------------------------------------- sinks
+
+class JsonlSpanSink:
+    def __init__(self, path: str):
+        """Append every finished span to a JSON Lines file"""
+        # Imported here: snapshot_stream -> http_client imports this module
+        from scraping_core.snapshot_stream import JsonlWriter
+
+        self.path = os.path.abspath(path)
+        self.writer = JsonlWriter(path, flush_every=1)
+        self._lock = threading.Lock()
+
+    def on_end(self, span: Span):
+        with self._lock:
+            self.writer.write(span.to_dict())
+
+    def close(self):
+        self.writer.close()
+
+
+class PrometheusSink:
+    def __init__(self, namespace: str = "scraping"):
+        """
+        Aggregate spans into Prometheus metrics
+
+        - <namespace>_span_duration_seconds histogram per span name and status
+        - <namespace>_span_<attribute>_total counters for COUNTED_ATTRIBUTES
+        """
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], List[float]] = {}   # (name, status) -> bucket counts + sum + count
+        self._counters: Dict[Tuple[str, str], float] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def on_end(self, span: Span):
+        with self._lock:
+            values = self._histograms.setdefault((span.name, span.status), [0.0] * (len(DURATION_BUCKETS) + 2))
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if span.duration <= bound:
+                    values[index] += 1
+            values[-2] += span.duration
+            values[-1] += 1
+            for attribute in COUNTED_ATTRIBUTES:
+                value = span.attributes.get(attribute)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    self._counters[(span.name, attribute)] = self._counters.get((span.name, attribute), 0) + value
+
+    def render(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        metric = f"{self.namespace}_span_duration_seconds"
+        lines = [f"# TYPE {metric} histogram"]
+        with self._lock:
+            for (name, status), values in sorted(self._histograms.items()):
+                labels = f'span="{name}",status="{status}"'
+                for index, bound in enumerate(DURATION_BUCKETS):
+                    lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {values[index]:g}')
+                lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {values[-1]:g}')
+                lines.append(f"{metric}_sum{{{labels}}} {values[-2]:.6f}")
+                lines.append(f"{metric}_count{{{labels}}} {values[-1]:g}")
+
+            for attribute in COUNTED_ATTRIBUTES:
+                rows = [(name, value) for (name, key), value in sorted(self._counters.items()) if key == attribute]
+                if rows:
+                    counter = f"{self.namespace}_span_{attribute}_total"
+                    lines.append(f"# TYPE {counter} counter")
+                    lines.extend(f'{counter}{{span="{name}"}} {value:g}' for name, value in rows)
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 9464, host: str = "0.0.0.0") -> str:
+        """Expose render() at http://host:port/metrics from a background thread"""
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                body = sink.render().encode("utf-8")
+                self.send_response(200 if self.path.startswith("/metrics") else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        url = f"http://{host}:{self._server.server_address[1]}/metrics"
+        log.info(f"📈 Prometheus metrics at {url}")
+        return url
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+
+
+class OpenTelemetrySink:
+    def __init__(self, tracer_name: str = "scraping"):
+        """
+        Mirror spans into OpenTelemetry (configure the SDK / exporter yourself)
+
+        Raises:
+            ImportError: opentelemetry is not installed
+        """
+        # Imported here so processes that never export spans skip the OpenTelemetry import
+        try:
+            from opentelemetry import trace as otel_trace
+        except ImportError:
+            raise ImportError("opentelemetry-api is not installed (pip install opentelemetry-sdk)")
+        self.otel_trace = otel_trace
+        self.tracer = otel_trace.get_tracer(tracer_name)
+        self._open: Dict[int, Any] = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span):
+        with self._lock:
+            parent = self._open.get(span.parent_id)
+        context = self.otel_trace.set_span_in_context(parent) if parent is not None else None
+        otel_span = self.tracer.start_span(span.name, context=context, start_time=int(span.start * 1e9))
+        with self._lock:
+            self._open[span.span_id] = otel_span
+
+    def on_end(self, span: Span):
+        with self._lock:
+            otel_span = self._open.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        if span.run_id:
+            otel_span.set_attribute("run_id", span.run_id)
+        for key, value in span.attributes.items():
+            if isinstance(value, (str, bool, int, float)):
+                otel_span.set_attribute(key, value)
+        if span.status != "ok":
+            otel_span.set_status(self.otel_trace.Status(self.otel_trace.StatusCode.ERROR, span.error or ""))
+        otel_span.end(end_time=int(span.end * 1e9))
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer (no sinks until configure_telemetry() adds some)"""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer()
+        return _tracer
+
+
+def configure_telemetry(jsonl_path: Optional[str] = None,
+                        prometheus_port: Optional[int] = None,
+                        opentelemetry: bool = False,
+                        log_level: Optional[str] = None) -> Tracer:
+    """
+    Attach sinks to the shared tracer
+
+    Args:
+        jsonl_path: Append finished spans to this JSON Lines file
+        prometheus_port: Serve Prometheus metrics on this port (0 picks a free one)
+        opentelemetry: Mirror spans into the OpenTelemetry SDK configured in this process
+        log_level: Optional level for the "scraping" loggers (DEBUG, INFO, WARNING, ...)
+    """
+    if log_level:
+        configure_logging(log_level)
+
+    tracer = get_tracer()
+    # Re-running a notebook cell must not attach the same sink twice
+    if jsonl_path and not any(isinstance(sink, JsonlSpanSink) and sink.path == os.path.abspath(jsonl_path)
+                              for sink in tracer.sinks):
+        tracer.add_sink(JsonlSpanSink(jsonl_path))
+    if prometheus_port is not None and not any(isinstance(sink, PrometheusSink) for sink in tracer.sinks):
+        sink = PrometheusSink()
+        sink.serve(prometheus_port)
+        tracer.add_sink(sink)
+    if opentelemetry and not any(isinstance(sink, OpenTelemetrySink) for sink in tracer.sinks):
+        tracer.add_sink(OpenTelemetrySink())
+    return tracer
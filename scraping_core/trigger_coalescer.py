@@ -0,0 +1,395 @@
+"""
+Micro-batching for Bright Data `/datasets/v3/trigger` calls
+
+Every scrape request used to become its own trigger with a one-element payload,
+so each URL or person paid the full trigger + snapshot latency on its own.
+TriggerCoalescer collects requests from concurrent callers for a short window
+(or until a batch is full), sends them as one trigger, waits for the snapshot on
+the shared SnapshotPoller, downloads it once and hands each caller back only the
+records that belong to its input.
+
+With a JobStore attached, every trigger is recorded, and a request whose input
+is already covered by a running / ready snapshot (e.g. one triggered before a
+kernel restart) waits for that snapshot instead of triggering a new one.
+"""
+
+import re
+import threading
+import unicodedata
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+from scraping_core.http_client import http_post
+from scraping_core.snapshot_poller import BRIGHTDATA_BASE_URL, SnapshotPoller, get_snapshot_poller
+from scraping_core.snapshot_adapter import get_snapshot_adapter
+from scraping_core.telemetry import get_logger, get_tracer
+from scraping_core.webhook_receiver import webhook_trigger_params
+
+log = get_logger("coalescer")
+
+# Time scrape() allows for the trigger window and the snapshot download on top of max_wait
+RESULT_GRACE_SECONDS = 300
+
+
+def url_key(item: Dict[str, Any]) -> Optional[str]:
+    """Routing key for URL inputs / records (scheme, www. and trailing slash are ignored)"""
+    url = item.get("url") or item.get("input_url") or ""
+    url = url.strip().lower()
+    for prefix in ("https://", "http://"):
+        if url.startswith(prefix):
+            url = url[len(prefix):]
+    if url.startswith("www."):
+        url = url[4:]
+    return url.rstrip("/") or None
+
+
+# Tokens that are not part of a person's first / last name ("Dr. John A. Smith Jr.", "Jane Doe CPA")
+NAME_AFFIXES = frozenset({
+    "mr", "mrs", "ms", "miss", "dr", "prof", "sir",
+    "jr", "sr", "ii", "iii", "iv", "v",
+    "phd", "md", "mba", "cpa", "cfa", "pmp", "esq", "pe", "rn", "dds", "jd", "msc", "bsc",
+})
+
+
+def name_parts(name: str) -> List[str]:
+    """
+    Normalized name tokens without titles, credentials and suffixes
+
+    Accents are folded, anything after a comma ("Jane Doe, CPA") or in brackets
+    ("(she/her)") is dropped, as is punctuation other than hyphens inside a token.
+    """
+    text = unicodedata.normalize("NFKD", str(name or "")).split(",")[0]
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    text = re.sub(r"\([^)]*\)|\[[^\]]*\]", " ", text)
+    tokens = (token.strip("-") for token in re.sub(r"[^\w\s-]", "", text).split())
+    return [token for token in tokens if token and token not in NAME_AFFIXES]
+
+
+def person_key(item: Dict[str, Any]) -> Optional[str]:
+    """
+    Routing key for name-discovery inputs / records: "<first token> <last token>" of the name
+
+    Inputs give "first_name" + "last_name", discovered profiles often only the full
+    "name"; middle names / initials, titles, credentials and suffixes are left out,
+    so "John A. Smith" and "Jane Doe, CPA" match the inputs John / Smith and Jane / Doe.
+    Two people who differ only in a middle name share a key.
+    """
+    first = name_parts(item.get("first_name") or "")
+    last = name_parts(item.get("last_name") or "")
+    if not (first and last):
+        # Discovered profiles only carry the full name
+        parts = name_parts(item.get("name") or "")
+        if len(parts) < 2:
+            return None
+        first, last = parts[:1], parts[-1:]
+    return f"{first[0]} {last[-1]}"
+
+
+class _PendingRequest:
+    def __init__(self, item: Dict[str, Any], key: Any):
+        self.item = item
+        self.key = key
+        self.future: Future = Future()
+
+
+class TriggerCoalescer:
+    def __init__(self,
+                 api_token: str,
+                 dataset_id: str,
+                 trigger_params: Optional[Dict[str, str]] = None,
+                 key_fn: Callable[[Dict[str, Any]], Any] = url_key,
+                 max_batch_size: int = 100,
+                 window_seconds: float = 2.0,
+                 max_wait: int = 600,
+                 base_url: str = BRIGHTDATA_BASE_URL,
+                 poller: Optional[SnapshotPoller] = None,
+                 job_store=None):
+        """
+        Initialize the trigger coalescer
+
+        Args:
+            api_token: Your Bright Data API token
+            dataset_id: Dataset every batched trigger is sent to
+            trigger_params: Extra /trigger query params (e.g. type/discover_by for name discovery)
+            key_fn: Maps an input item, or a record's echoed input, to its routing key
+            max_batch_size: Send the batch as soon as it holds this many distinct inputs
+            window_seconds: How long to wait for more requests before sending a batch
+            max_wait: Maximum seconds to wait for each snapshot
+            base_url: Bright Data datasets API base URL
+            poller: SnapshotPoller to use (defaults to the shared one for this token)
+            job_store: Optional JobStore used to record triggers and resume their snapshots
+        """
+        self.api_token = api_token
+        self.dataset_id = dataset_id
+        self.trigger_params = dict(trigger_params or {})
+        self.key_fn = key_fn
+        self.max_batch_size = max_batch_size
+        self.window_seconds = window_seconds
+        self.max_wait = max_wait
+        self.base_url = base_url.rstrip("/")
+        self.headers = {
+            "Authorization": f"Bearer {api_token}",
+            "Content-Type": "application/json"
+        }
+        self.poller = poller or get_snapshot_poller(api_token, self.base_url)
+        self.job_store = job_store
+
+        self._pending: List[_PendingRequest] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._executor = ThreadPoolExecutor(max_workers=4)
+        self.stats = {"requests": 0, "triggers": 0, "inputs_sent": 0, "unrouted_records": 0, "resumed": 0}
+
+    def submit(self, item: Dict[str, Any]) -> Future:
+        """
+        Queue one input (e.g. {"url": ...} or {"first_name": ..., "last_name": ...})
+
+        Returns:
+            Future resolving to a dict with snapshot_id, status ("success", "trigger_failed",
+            "failed", "timeout", "error", "download_failed") and records (this input's records)
+        """
+        request = _PendingRequest(item, self.key_fn(item))
+
+        if self.job_store is not None and request.key is not None:
+            existing = self.job_store.find_snapshot(self.dataset_id, request.key, self.trigger_params)
+            if existing is not None:
+                self._attach(request, existing["snapshot_id"])
+                return request.future
+
+        with self._lock:
+            self._pending.append(request)
+            self.stats["requests"] += 1
+            distinct_inputs = len({id(r) if r.key is None else r.key for r in self._pending})
+
+            if distinct_inputs >= self.max_batch_size:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        return request.future
+
+    def scrape(self, item: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Blocking helper: submit one input and wait for its records
+
+        Args:
+            item: Input to scrape
+            timeout: Seconds to wait (default: max_wait plus RESULT_GRACE_SECONDS); a caller
+                     that gives up gets status "timeout" while the snapshot keeps running
+        """
+        if timeout is None:
+            timeout = self.max_wait + self.window_seconds + RESULT_GRACE_SECONDS
+        try:
+            return self.submit(item).result(timeout=timeout)
+        except FuturesTimeoutError:
+            log.warning(f"⏰ No batched result after {timeout:.0f}s")
+            return {"snapshot_id": None, "status": "timeout", "records": []}
+
+    def flush(self):
+        """Send whatever is queued right now"""
+        with self._lock:
+            self._flush_locked()
+
+    def _attach(self, request: _PendingRequest, snapshot_id: str):
+        # Records of an earlier (possibly multi-input) trigger are routed strictly by key
+        self.stats["requests"] += 1
+        self.stats["resumed"] += 1
+        log.info(f"♻️ Resuming snapshot {snapshot_id} for an input it already covers")
+        self.poller.track(
+            snapshot_id,
+            callback=lambda outcome: self._executor.submit(self._complete_batch, [request], outcome, True),
+            max_wait=self.max_wait
+        )
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending:
+            batch, self._pending = self._pending, []
+            self._executor.submit(self._send_batch, batch)
+
+    def _send_batch(self, batch: List[_PendingRequest]):
+        # Runs in the executor: an exception would otherwise leave every caller of the batch waiting forever
+        try:
+            self._trigger_batch(batch)
+        except Exception as e:
+            log.error(f"❌ Batched trigger failed unexpectedly: {type(e).__name__}: {e}")
+            self._resolve_all(batch, {"snapshot_id": None, "status": "error", "error": str(e)})
+
+    def _trigger_batch(self, batch: List[_PendingRequest]):
+        # Identical inputs from different callers are only sent once
+        payload = []
+        seen_keys = set()
+        for request in batch:
+            if request.key is None or request.key not in seen_keys:
+                payload.append(request.item)
+                seen_keys.add(request.key)
+
+        params = {"dataset_id": self.dataset_id}
+        params.update(self.trigger_params)
+        params.update(webhook_trigger_params())
+
+        log.info(f"📦 Triggering batched Bright Data job: {len(payload)} inputs for {len(batch)} requests")
+
+        with get_tracer().span("brightdata.trigger", dataset_id=self.dataset_id, inputs=len(payload),
+                               requests=len(batch)) as span:
+            try:
+                response = http_post(f"{self.base_url}/trigger", headers=self.headers,
+                                     params=params, json=payload, timeout=30)
+                result = response.json() if response.ok else {}
+                snapshot_id = result.get("snapshot_id")
+
+                if not snapshot_id:
+                    error = f"HTTP {response.status_code}: {response.text[:200]}"
+                    span.set(error=error)
+                    log.error(f"❌ Batched trigger failed: {error}")
+                    self._resolve_all(batch, {"snapshot_id": None, "status": "trigger_failed", "error": error})
+                    return
+
+            except Exception as e:
+                span.set(error=str(e))
+                log.error(f"❌ Batched trigger error: {e}")
+                self._resolve_all(batch, {"snapshot_id": None, "status": "trigger_failed", "error": str(e)})
+                return
+            span.set(snapshot_id=snapshot_id)
+
+        self.stats["triggers"] += 1
+        self.stats["inputs_sent"] += len(payload)
+        log.info(f"✅ Batched job triggered! Snapshot ID: {snapshot_id}")
+
+        if self.job_store is not None:
+            self.job_store.record_trigger(snapshot_id, self.dataset_id, payload,
+                                          [key for key in seen_keys if key is not None], self.trigger_params)
+
+        self.poller.track(
+            snapshot_id,
+            callback=lambda outcome: self._executor.submit(self._complete_batch, batch, outcome),
+            max_wait=self.max_wait
+        )
+
+    def _complete_batch(self, batch: List[_PendingRequest], outcome: Dict[str, Any], strict: bool = False):
+        error = "snapshot could not be collected"
+        try:
+            self._collect_batch(batch, outcome, strict)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            log.error(f"❌ Collecting snapshot {outcome.get('snapshot_id')} failed: {error}")
+        finally:
+            # Whatever went wrong, no caller of the batch is left waiting
+            self._resolve_all(batch, {"snapshot_id": outcome.get("snapshot_id"), "status": "error", "error": error})
+
+    def _collect_batch(self, batch: List[_PendingRequest], outcome: Dict[str, Any], strict: bool = False):
+        snapshot_id = outcome["snapshot_id"]
+        status = outcome["status"]
+
+        # A local timeout leaves the snapshot 'running' in the store, so a later run can still collect it
+        if self.job_store is not None and status in ("ready", "failed"):
+            self.job_store.update_snapshot(snapshot_id, status)
+
+        if status != "ready":
+            self._resolve_all(batch, {"snapshot_id": snapshot_id, "status": status})
+            return
+
+        records = self._download(snapshot_id)
+        if records is None:
+            self._resolve_all(batch, {"snapshot_id": snapshot_id, "status": "download_failed"})
+            return
+
+        # A resumed snapshot stays 'ready' - its other inputs may still be waiting to be resumed
+        if self.job_store is not None and not strict:
+            self.job_store.update_snapshot(snapshot_id, "collected")
+
+        routed = self.route_records(batch, records, strict)
+        for request in batch:
+            if not request.future.done():
+                request.future.set_result({
+                    "snapshot_id": snapshot_id,
+                    "status": "success",
+                    "records": routed.get(request.key, [])
+                })
+
+    def route_records(self, batch: List[_PendingRequest], records: List[Dict],
+                      strict: bool = False) -> Dict[Any, List[Dict]]:
+        """
+        Split snapshot records back to the inputs they belong to
+
+        Records are matched through the echoed `input` object Bright Data attaches
+        to each record, falling back to the record's own fields. With a single
+        distinct input in the batch every record belongs to it, unless strict
+        is set (the snapshot may also hold other callers' inputs).
+        """
+        keys = {request.key for request in batch}
+        routed: Dict[Any, List[Dict]] = {key: [] for key in keys}
+
+        if len(keys) == 1 and not strict:
+            routed[next(iter(keys))] = list(records)
+            return routed
+
+        unrouted = 0
+        for record in records:
+            echoed_input = record.get("input") if isinstance(record, dict) else None
+            key = self.key_fn(echoed_input) if isinstance(echoed_input, dict) else None
+            if key not in routed and isinstance(record, dict):
+                key = self.key_fn(record)
+
+            if key in routed:
+                routed[key].append(record)
+            else:
+                unrouted += 1
+
+        if unrouted and not strict:
+            self.stats["unrouted_records"] += unrouted
+            log.warning(f"⚠️ {unrouted} records could not be matched to a batched input")
+
+        return routed
+
+    def _download(self, snapshot_id: str) -> Optional[List[Dict]]:
+        with get_tracer().span("brightdata.download", snapshot_id=snapshot_id) as span:
+            try:
+                # The dataset's learned endpoint / shape is used directly (no probing after the first download)
+                adapter = get_snapshot_adapter(self.api_token, self.dataset_id, self.base_url)
+                return adapter.records(snapshot_id, stats=span.attributes)
+
+            except Exception as e:
+                span.set(error=str(e))
+                log.error(f"❌ Snapshot download error: {e}")
+                return None
+
+    def _resolve_all(self, batch: List[_PendingRequest], outcome: Dict[str, Any]):
+        for request in batch:
+            if not request.future.done():
+                try:
+                    request.future.set_result(dict(outcome, records=[]))
+                except InvalidStateError:  # Resolved by another thread in between
+                    pass
+
+
+_coalescers: Dict[tuple, TriggerCoalescer] = {}
+_coalescers_lock = threading.Lock()
+
+
+def get_trigger_coalescer(api_token: str, dataset_id: str,
+                          trigger_params: Optional[Dict[str, str]] = None,
+                          **kwargs) -> TriggerCoalescer:
+    """
+    Return the shared coalescer for a token / dataset / trigger params combination
+
+    Only requests with identical trigger params can share a trigger, so each
+    combination gets its own coalescer (created on first use).
+
+    Args:
+        api_token: Your Bright Data API token
+        dataset_id: Dataset ID
+        trigger_params: Extra /trigger query params
+        **kwargs: Extra TriggerCoalescer settings (only used when the coalescer is created)
+    """
+    key = (api_token, dataset_id, tuple(sorted((trigger_params or {}).items())))
+    with _coalescers_lock:
+        coalescer = _coalescers.get(key)
+        if coalescer is None:
+            coalescer = TriggerCoalescer(api_token, dataset_id, trigger_params, **kwargs)
+            _coalescers[key] = coalescer
+        return coalescer
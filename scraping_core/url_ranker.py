@@ -0,0 +1,195 @@
+"""
+Deterministic ranking of search results for the company-website selection step
+
+For most corporate emails the official site is simply the organic result whose
+host is the email's domain, yet every email paid a Gemini round-trip to pick
+it. rank_search_results() scores each result on host match, path depth,
+title/snippet similarity to the brand name and a blocklist of directory /
+social sites, and select_url() turns the best one into a URL selection with a
+confidence value, so the LLM is only needed when the answer is not obvious.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+# Sites that list companies but are never the company's own website
+DIRECTORY_HOSTS = (
+    "linkedin.com", "facebook.com", "twitter.com", "x.com", "instagram.com", "youtube.com",
+    "wikipedia.org", "crunchbase.com", "zoominfo.com", "bloomberg.com", "glassdoor.com",
+    "glassdoor.co.in", "indeed.com", "yelp.com", "dnb.com", "opencorporates.com", "zaubacorp.com",
+    "tofler.in", "justdial.com", "indiamart.com", "ambitionbox.com", "rocketreach.co", "apollo.io",
+    "pitchbook.com", "craft.co", "owler.com", "manta.com", "bbb.org", "yellowpages.com",
+    "signalhire.com", "cbinsights.com", "tracxn.com", "trustpilot.com", "github.com", "medium.com",
+)
+
+# Second-level labels of country domains such as .co.uk / .com.au
+SECOND_LEVEL_LABELS = {"co", "com", "net", "org", "ac", "gov", "edu", "ltd", "plc"}
+
+# Weights of the individual signals (they add up to 1.0)
+HOST_WEIGHT = 0.6
+PATH_WEIGHT = 0.15
+TEXT_WEIGHT = 0.15
+RANK_WEIGHT = 0.1
+DIRECTORY_PENALTY = 0.2   # Score multiplier for directory / social hosts
+
+
+def _host(url: str) -> str:
+    host = urlparse(url if "://" in url else f"https://{url}").netloc.lower().split(":")[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+def _brand(domain: str) -> str:
+    """Brand label of a domain: acme.co.uk -> acme, mail.acme.com -> acme"""
+    labels = domain.lower().split(".")
+    if len(labels) >= 3 and labels[-2] in SECOND_LEVEL_LABELS and len(labels[-1]) == 2:
+        return labels[-3]  # Second-level country domains like .co.uk / .com.au
+    return labels[-2] if len(labels) >= 2 else labels[0]
+
+
+def _alnum(text: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(max(len(text) - 2, 1))}
+
+
+def host_score(host: str, domain: str) -> float:
+    """1.0 exact host, 0.7 subdomain, 0.4 same brand on another TLD, 0 otherwise"""
+    domain = _host(domain)
+    if host == domain:
+        return 1.0
+    if host.endswith("." + domain):
+        return 0.7
+    if _brand(host) == _brand(domain):
+        return 0.4
+    return 0.0
+
+
+def path_score(url: str) -> float:
+    """1.0 for the homepage, decreasing with every path segment"""
+    segments = [segment for segment in urlparse(url).path.split("/") if segment]
+    return 1.0 / (1 + len(segments))
+
+
+def text_score(title: str, snippet: str, domain: str) -> float:
+    """How strongly title / snippet mention the brand name (1.0 when it appears verbatim)"""
+    brand = _alnum(_brand(_host(domain)))
+    if not brand:
+        return 0.0
+    if brand in _alnum(title) or brand in _alnum(snippet):
+        return 1.0
+
+    brand_grams = _trigrams(brand)
+    best = 0.0
+    for word in re.findall(r"[a-z0-9]+", f"{title} {snippet}".lower()):
+        grams = _trigrams(word)
+        best = max(best, len(brand_grams & grams) / len(brand_grams | grams))
+    return best
+
+
+def is_directory(host: str) -> bool:
+    return any(host == blocked or host.endswith("." + blocked) for blocked in DIRECTORY_HOSTS)
+
+
+def _field(result: Any, name: str) -> str:
+    value = result.get(name) if isinstance(result, dict) else getattr(result, name, "")
+    return value or ""
+
+
+def rank_search_results(domain: str, results: Sequence[Any]) -> List[Dict[str, Any]]:
+    """
+    Score search results as candidates for the domain's official website
+
+    Args:
+        domain: Domain extracted from the email
+        results: Search results (SearchResult models or dicts with title / url / snippet)
+
+    Returns:
+        Dicts with url, score and the individual signals, best first
+    """
+    ranked = []
+    for position, result in enumerate(results):
+        url = _field(result, "url")
+        if not url:
+            continue
+        host = _host(url)
+        signals = {
+            "host": host_score(host, domain),
+            "path": path_score(url),
+            "text": text_score(_field(result, "title"), _field(result, "snippet"), domain),
+            "rank": 1.0 / (1 + position),
+            "directory": is_directory(host),
+        }
+        score = (HOST_WEIGHT * signals["host"] + PATH_WEIGHT * signals["path"]
+                 + TEXT_WEIGHT * signals["text"] + RANK_WEIGHT * signals["rank"])
+        if signals["directory"]:
+            score *= DIRECTORY_PENALTY
+        ranked.append({"url": url, "score": round(score, 3), "signals": signals})
+
+    ranked.sort(key=lambda candidate: candidate["score"], reverse=True)
+    return ranked
+
+
+def site_root(url: str) -> str:
+    """scheme://host of a URL (the URL itself if it cannot be parsed)"""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}" if parsed.scheme and parsed.netloc else url
+
+
+def candidate_sites(domain: str, results: Sequence[Any], limit: int = 3,
+                    preferred: Optional[str] = None) -> List[str]:
+    """
+    Distinct site roots worth scraping for the domain, best first
+
+    Args:
+        domain: Domain extracted from the email
+        results: Search results (SearchResult models or dicts)
+        limit: Maximum number of sites
+        preferred: URL to put first (e.g. the one URL selection picked)
+
+    Returns:
+        Root URLs; directory / social sites are left out
+    """
+    sites = [site_root(preferred)] if preferred else []
+    for candidate in rank_search_results(domain, results):
+        root = site_root(candidate["url"])
+        if len(sites) >= limit:
+            break
+        if root not in sites and not candidate["signals"]["directory"]:
+            sites.append(root)
+    return sites[:limit]
+
+
+def select_url(domain: str, results: Sequence[Any]) -> Optional[Dict[str, Any]]:
+    """
+    Pick the most likely official website without an LLM
+
+    Returns:
+        Dict with selected_url, reasoning and confidence_score (the best candidate's
+        score), or None when there are no usable results
+    """
+    ranked = rank_search_results(domain, results)
+    if not ranked:
+        return None
+
+    best = ranked[0]
+    signals = best["signals"]
+    reasons = []
+    if signals["host"] == 1.0:
+        reasons.append(f"host matches {domain}")
+    elif signals["host"] > 0:
+        reasons.append(f"host is related to {domain}")
+    if signals["path"] == 1.0:
+        reasons.append("homepage")
+    if signals["text"] == 1.0:
+        reasons.append("brand named in title/snippet")
+    if signals["directory"]:
+        reasons.append("directory site")
+
+    return {
+        "selected_url": best["url"],
+        "reasoning": f"Local ranking: {', '.join(reasons) or 'best overall signal'} (score {best['score']})",
+        "confidence_score": best["score"],
+    }
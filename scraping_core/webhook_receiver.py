@@ -0,0 +1,375 @@
+"""
+Push delivery of Bright Data snapshots to a local webhook receiver
+
+A /trigger call can name a `notify` URL (Bright Data POSTs {"snapshot_id",
+"status"} when the snapshot is finished) and an `endpoint` URL (Bright Data
+POSTs the snapshot itself). A WebhookReceiver is a small asyncio HTTP server
+running in a background thread that accepts both. Delivered bodies are
+streamed to a spool file, never held in memory, and every push is handed to
+the listeners (the shared SnapshotPoller resolves the waiting caller at once).
+SnapshotAdapter reads a delivered snapshot from its spool file instead of
+downloading it again. Polling stays on as a slow fallback for pushes that
+never arrive.
+
+The receiver must be reachable from the internet: pass the public URL of a
+tunnel (ngrok, cloudflared, ...) pointing at its port as `public_url`.
+"""
+
+import asyncio
+import hmac
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from scraping_core.telemetry import get_logger
+
+# Headers a data delivery may carry its snapshot ID in (besides ?snapshot_id=)
+SNAPSHOT_ID_HEADERS = ("snapshot-id", "x-snapshot-id", "dca-snapshot-id")
+
+# Largest notify body read into memory
+MAX_NOTIFY_BYTES = 1024 * 1024
+
+# Pushes are replayed to listeners added this long after they arrived
+REPLAY_SECONDS = 60 * 60
+
+log = get_logger("webhook")
+
+# snapshot_id -> spool file of every delivery received by this process
+_deliveries: Dict[str, str] = {}
+_deliveries_lock = threading.Lock()
+
+
+def delivered_snapshot_path(snapshot_id: str) -> Optional[str]:
+    """Spool file of a snapshot delivered by webhook, or None"""
+    with _deliveries_lock:
+        path = _deliveries.get(snapshot_id)
+    return path if path and os.path.exists(path) else None
+
+
+def _safe_name(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", text)[:120]
+
+
+class _BadRequest(Exception):
+    pass
+
+
+class WebhookReceiver:
+    def __init__(self,
+                 public_url: Optional[str] = None,
+                 host: str = "0.0.0.0",
+                 port: int = 8765,
+                 spool_dir: str = "brightdata_webhooks",
+                 auth_token: Optional[str] = None,
+                 deliver_data: bool = True,
+                 fallback_interval: float = 60.0,
+                 chunk_size: int = 64 * 1024,
+                 read_timeout: float = 300.0):
+        """
+        Initialize the webhook receiver (call start() to listen)
+
+        Args:
+            public_url: URL Bright Data reaches this receiver at (defaults to the local address)
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+            spool_dir: Directory delivered snapshots are written to
+            auth_token: Value Bright Data must send in the Authorization header (sent as auth_header)
+            deliver_data: Ask for the snapshot itself, not only the "ready" notification
+            fallback_interval: Poll delay for snapshots waiting on a push (seconds)
+            chunk_size: Bytes read from the socket per write to the spool file
+            read_timeout: Give up on a delivery that stalls this long (seconds)
+        """
+        self.public_url = public_url.rstrip("/") if public_url else None
+        self.host = host
+        self.port = port
+        self.spool_dir = spool_dir
+        self.auth_token = auth_token
+        self.deliver_data = deliver_data
+        self.fallback_interval = fallback_interval
+        self.chunk_size = chunk_size
+        self.read_timeout = read_timeout
+
+        self._listeners: List[Callable[[str, str, Dict[str, Any]], None]] = []
+        self._recent: Dict[str, tuple] = {}
+        self._recent_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"notifications": 0, "deliveries": 0, "bytes": 0, "unmatched": 0, "rejected": 0}
+
+    # ------------------------------------------------------------------ public API
+
+    @property
+    def url(self) -> str:
+        """Base URL handed to Bright Data"""
+        if self.public_url:
+            return self.public_url
+        host = "127.0.0.1" if self.host in ("0.0.0.0", "") else self.host
+        return f"http://{host}:{self.port}"
+
+    def trigger_params(self) -> Dict[str, str]:
+        """Extra /trigger query params that make Bright Data push to this receiver"""
+        params = {"notify": f"{self.url}/notify"}
+        if self.deliver_data:
+            params.update({"endpoint": f"{self.url}/webhook", "uncompressed_webhook": "true"})
+        if self.auth_token:
+            params["auth_header"] = self.auth_token
+        return params
+
+    def add_listener(self, listener: Callable[[str, str, Dict[str, Any]], None]):
+        """
+        Call listener(snapshot_id, status, details) for every push (details may hold "delivered_path")
+
+        Pushes from the last REPLAY_SECONDS are replayed to a new listener right away.
+        """
+        with self._recent_lock:
+            if listener in self._listeners:
+                return
+            self._listeners.append(listener)
+            recent = list(self._recent.items())
+        for snapshot_id, (status, details, _) in recent:
+            listener(snapshot_id, status, details)
+
+    def start(self) -> "WebhookReceiver":
+        """Start listening in a background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+
+        os.makedirs(self.spool_dir, exist_ok=True)
+        started = threading.Event()
+        failure: List[BaseException] = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._server = self._loop.run_until_complete(
+                    asyncio.start_server(self._handle, self.host, self.port))
+                self.port = self._server.sockets[0].getsockname()[1]
+            except BaseException as e:
+                failure.append(e)
+                started.set()
+                return
+            started.set()
+            try:
+                self._loop.run_forever()
+            finally:
+                self._server.close()
+                self._loop.run_until_complete(self._server.wait_closed())
+                self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="WebhookReceiver", daemon=True)
+        self._thread.start()
+        started.wait()
+        if failure:
+            raise failure[0]
+
+        log.info(f"📬 Webhook receiver listening on {self.host}:{self.port} (Bright Data pushes to {self.url})")
+        return self
+
+    def stop(self):
+        """Stop listening"""
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    # ------------------------------------------------------------------ HTTP handling
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        status, message = 500, "error"
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.read_timeout)
+            lines = head.decode("latin-1").split("\r\n")
+            method, target = lines[0].split(" ")[:2]
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    name, value = line.split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+            parsed = urlparse(target)
+            query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+            path = parsed.path.rstrip("/")
+
+            if self.auth_token and not hmac.compare_digest(
+                    headers.get("authorization", "").encode("latin-1"),
+                    self.auth_token.encode("utf-8")):
+                self.stats["rejected"] += 1
+                status, message = 401, "unauthorized"
+            elif method != "POST" or path not in ("/notify", "/webhook"):
+                status, message = 404, "not found"
+            else:
+                if headers.get("expect", "").lower() == "100-continue":
+                    writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                    await writer.drain()
+                body = self._body(reader, headers)
+                if path == "/notify":
+                    await self._notify(body, query)
+                else:
+                    await self._webhook(body, headers, query)
+                status, message = 200, "ok"
+        except _BadRequest as e:
+            status, message = 400, str(e)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError) as e:
+            log.warning(f"⚠️ Webhook request aborted: {type(e).__name__}")
+            writer.close()
+            return
+        except Exception as e:
+            log.error(f"❌ Webhook request failed: {type(e).__name__}: {e}")
+
+        payload = message.encode("utf-8")
+        writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                     f"Content-Type: text/plain\r\nContent-Length: {len(payload)}\r\n"
+                     f"Connection: close\r\n\r\n".encode("latin-1") + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _body(self, reader: asyncio.StreamReader, headers: Dict[str, str]) -> AsyncIterator[bytes]:
+        """Request body in chunks (Content-Length or chunked transfer, gzip undone)"""
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS) \
+            if headers.get("content-encoding", "").lower() == "gzip" else None
+
+        async def read(size: int) -> bytes:
+            data = await asyncio.wait_for(reader.read(size), self.read_timeout)
+            if not data:
+                raise asyncio.IncompleteReadError(b"", size)
+            return data
+
+        async def raw() -> AsyncIterator[bytes]:
+            if headers.get("transfer-encoding", "").lower() == "chunked":
+                while True:
+                    size_line = await asyncio.wait_for(reader.readline(), self.read_timeout)
+                    try:
+                        size = int(size_line.split(b";")[0].strip() or b"0", 16)
+                    except ValueError:
+                        raise _BadRequest("bad chunk size")
+                    if size == 0:
+                        # Skip trailers up to the closing blank line
+                        while (await asyncio.wait_for(reader.readline(), self.read_timeout)).strip():
+                            pass
+                        return
+                    while size:
+                        data = await read(min(size, self.chunk_size))
+                        size -= len(data)
+                        yield data
+                    await reader.readline()
+            else:
+                remaining = int(headers.get("content-length") or 0)
+                while remaining > 0:
+                    data = await read(min(remaining, self.chunk_size))
+                    remaining -= len(data)
+                    yield data
+
+        async for data in raw():
+            self.stats["bytes"] += len(data)
+            yield decoder.decompress(data) if decoder else data
+        if decoder:
+            yield decoder.flush()
+
+    async def _notify(self, body: AsyncIterator[bytes], query: Dict[str, str]):
+        parts, size = [], 0
+        async for data in body:
+            size += len(data)
+            if size > MAX_NOTIFY_BYTES:
+                raise _BadRequest("notification too large")
+            parts.append(data)
+
+        try:
+            payload = json.loads(b"".join(parts) or b"{}")
+        except ValueError:
+            raise _BadRequest("notification is not JSON")
+        if not isinstance(payload, dict):
+            payload = {}
+
+        snapshot_id = payload.get("snapshot_id") or query.get("snapshot_id")
+        if not snapshot_id:
+            raise _BadRequest("snapshot_id missing")
+        self.stats["notifications"] += 1
+        status = str(payload.get("status") or query.get("status") or "ready").lower()
+        log.debug(f"📬 Notification for snapshot {snapshot_id}: {status}")
+        await self._publish(str(snapshot_id), status, {"notification": payload})
+
+    async def _webhook(self, body: AsyncIterator[bytes], headers: Dict[str, str], query: Dict[str, str]):
+        snapshot_id = query.get("snapshot_id") or next(
+            (headers[name] for name in SNAPSHOT_ID_HEADERS if headers.get(name)), None)
+        name = _safe_name(snapshot_id) if snapshot_id else f"unmatched-{int(time.time() * 1000)}"
+        path = os.path.join(self.spool_dir, f"{name}.json")
+
+        size = 0
+        with open(path + ".part", "wb") as f:
+            async for data in body:
+                f.write(data)
+                size += len(data)
+        os.replace(path + ".part", path)
+
+        if not snapshot_id:
+            # Without an ID the waiting caller cannot be found; its notification / poll still finishes it
+            self.stats["unmatched"] += 1
+            log.warning(f"⚠️ Webhook delivery without a snapshot ID saved to {path}")
+            return
+
+        self.stats["deliveries"] += 1
+        with _deliveries_lock:
+            _deliveries[snapshot_id] = path
+        log.info(f"📬 Snapshot {snapshot_id} delivered by webhook ({size:,} bytes)")
+        await self._publish(snapshot_id, "ready", {"delivered_path": path})
+
+    async def _publish(self, snapshot_id: str, status: str, details: Dict[str, Any]):
+        # Listeners may block (poller callbacks download records), so they run off the event loop
+        loop = asyncio.get_running_loop()
+        with self._recent_lock:
+            now = time.time()
+            self._recent = {key: value for key, value in self._recent.items() if now - value[2] < REPLAY_SECONDS}
+            self._recent[snapshot_id] = (status, details, now)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                await loop.run_in_executor(None, listener, snapshot_id, status, details)
+            except Exception as e:
+                log.warning(f"⚠️ Webhook listener failed for {snapshot_id}: {e}")
+
+
+_receiver: Optional[WebhookReceiver] = None
+_receiver_lock = threading.Lock()
+
+
+def start_webhook_receiver(public_url: Optional[str] = None, **kwargs) -> WebhookReceiver:
+    """
+    Start the process-wide receiver (returns the running one if already started)
+
+    Args:
+        public_url: URL Bright Data reaches the receiver at (e.g. your tunnel's URL)
+        **kwargs: Extra WebhookReceiver settings (only used when the receiver is created)
+    """
+    global _receiver
+    with _receiver_lock:
+        if _receiver is None:
+            _receiver = WebhookReceiver(public_url, **kwargs).start()
+        return _receiver
+
+
+def get_webhook_receiver() -> Optional[WebhookReceiver]:
+    """The process-wide receiver, or None when push delivery is off"""
+    return _receiver
+
+
+def stop_webhook_receiver():
+    """Stop the process-wide receiver; later triggers go back to polling only"""
+    global _receiver
+    with _receiver_lock:
+        if _receiver is not None:
+            _receiver.stop()
+            _receiver = None
+
+
+def webhook_trigger_params() -> Dict[str, str]:
+    """/trigger query params for the running receiver ({} when push delivery is off)"""
+    receiver = _receiver
+    return receiver.trigger_params() if receiver is not None else {}
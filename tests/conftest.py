@@ -0,0 +1,33 @@
+"""
+Shared fixtures: one local MockAPIServer per test session, no network access
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.mock_servers import MockAPIServer, MockConfig
+from scraping_core.snapshot_poller import SnapshotPoller
+
+
+@pytest.fixture(scope="session")
+def mock_server():
+    config = MockConfig(latency_ms=0, latency_jitter_ms=0, ready_delay=0.5, html_bytes=2_000,
+                        profiles_per_person=4, about_chars=50)
+    with MockAPIServer(config) as server:
+        yield server
+
+
+@pytest.fixture
+def brightdata_url(mock_server) -> str:
+    return f"{mock_server.url}/brightdata/datasets/v3"
+
+
+@pytest.fixture
+def poller(brightdata_url):
+    poller = SnapshotPoller("test-token", brightdata_url, min_interval=0.1, max_interval=0.2)
+    yield poller
+    poller.stop()
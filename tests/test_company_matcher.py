@@ -0,0 +1,67 @@
+import re
+
+import pytest
+
+from benchmarks.mock_servers import COMPANIES, MockConfig, fake_profile
+from scraping_core.company_matcher import MultiPatternMatcher
+from scraping_core.name_scraper import BrightDataLinkedInNameScraper
+from scraping_core.profile_scoring import BulkProfileScorer
+
+PATTERNS = {
+    "plain": "acme",
+    "alternation": "globex|initech",
+    "anchored": r"^stark\b",
+    "end": r"group$",
+    "word": r"\bhoo",
+    "class": r"w[a-z]+e enterprises",
+    "lookahead": r"(?!acme)\w+ corp",
+    "empty_match": r"x*",
+    "groups": r"(um)(brella)",
+    "no_match": "zzz-not-a-company",
+}
+
+TEXTS = COMPANIES + ["", "ACME", "Not Acme Corp", "Hooli XYZ", "The Stark Group", "Stark", "acme corp\nglobex",
+                     "Foo Corp", "Wayne  Enterprises", "Umbrella"]
+
+
+@pytest.mark.parametrize("case_sensitive", [False, True])
+def test_combined_regex_matches_like_each_pattern(case_sensitive):
+    matcher = MultiPatternMatcher(PATTERNS, case_sensitive=case_sensitive)
+    assert matcher.combined is not None
+    flags = 0 if case_sensitive else re.IGNORECASE
+
+    for text in TEXTS:
+        expected = {target_id for target_id, pattern in PATTERNS.items() if re.search(pattern, text, flags)}
+        assert matcher.targets_for(text) == expected, text
+        assert matcher.targets_for(text) == expected, text   # Cached verdict
+
+
+def test_backreferences_fall_back_to_per_pattern_search():
+    patterns = {"double": r"(o)\1", "named": r"(?P<c>l)(?P=c)", "plain": "acme"}
+    matcher = MultiPatternMatcher(patterns)
+
+    assert matcher.combined is None
+    assert matcher.targets_for("Hooli") == {"double"}
+    assert matcher.targets_for("Globex Hollow Acme") == {"named", "plain"}
+
+
+def test_invalid_pattern_names_the_target():
+    with pytest.raises(re.error, match="'broken'"):
+        MultiPatternMatcher({"ok": "acme", "broken": "acme("})
+
+
+def test_routing_finds_the_profiles_the_per_pattern_filter_finds():
+    config = MockConfig(profiles_per_person=60, match_rate=0.3)
+    person = {"first_name": "John", "last_name": "Smith"}
+    profiles = [fake_profile("John", "Smith", index, config, person=person) for index in range(60)]
+    patterns = {"acme": "acme", "big": r"globex|initech|hooli", "group": r"group$", "none": "zzz"}
+    scraper = BrightDataLinkedInNameScraper("test-token")
+
+    routed = scraper.route_profiles_to_targets([dict(p) for p in profiles], MultiPatternMatcher(patterns),
+                                               {"john smith": set(patterns)})
+
+    scorer = BulkProfileScorer()
+    for target_id, pattern in patterns.items():
+        expected = scorer.filter_by_company([dict(p) for p in profiles], re.compile(pattern, re.IGNORECASE))
+        assert [p["id"] for p in routed[target_id]] == [p["id"] for p in expected], target_id
+    assert routed["acme"] and not routed["none"]
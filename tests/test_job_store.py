@@ -0,0 +1,116 @@
+import sqlite3
+import time
+
+import pytest
+
+from scraping_core.batch_engine import Stage
+from scraping_core.job_store import JobRunner, JobStore, input_set_key
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_claim_is_exclusive_until_the_lease_runs_out(store):
+    job_id = store.enqueue("email", "a@example.com", {"email": "a@example.com"})
+    assert store.enqueue("email", "a@example.com", {"email": "changed"}) == job_id
+
+    job = store.claim("email", "worker-1", lease_seconds=0.2)
+    assert job["job_id"] == job_id and job["input"] == {"email": "a@example.com"}
+    assert store.claim("email", "worker-2") is None
+
+    time.sleep(0.3)
+    reclaimed = store.claim("email", "worker-2")
+    assert reclaimed["job_id"] == job_id and reclaimed["worker"] == "worker-2"
+    assert reclaimed["attempts"] == 2
+
+
+def test_job_resumes_after_its_last_checkpoint(store):
+    calls = []
+
+    def stage(name, fail=False):
+        def run(state):
+            calls.append(name)
+            if fail:
+                raise RuntimeError(f"{name} broke")
+            return {name: state["input"] + 1 if name == "first" else state["first"] * 10}
+        return Stage(name, run)
+
+    store.enqueue("numbers", "1", 1)
+    broken = JobRunner(store, "numbers", [stage("first"), stage("second", fail=True)], max_attempts=1)
+    assert broken.run()["failed"] == 1
+    job = store.jobs("numbers")[0]
+    assert (job["status"], job["stage"], job["state"]) == ("failed", "first", {"input": 1, "first": 2})
+
+    store.fail(job["job_id"], "manual retry", retry=True)
+    fixed = JobRunner(store, "numbers", [stage("first"), stage("second")])
+    assert fixed.run() == {"claimed": 1, "completed": 1, "failed": 0, "resumed": 1, "reused": 0}
+    assert calls == ["first", "second", "second"]
+    assert store.get(job["job_id"])["result"] == {"input": 1, "first": 2, "second": 20}
+
+
+def test_failed_jobs_are_retried_with_backoff(store):
+    attempts = []
+
+    def flaky(state):
+        attempts.append(time.time())
+        if len(attempts) < 3:
+            raise RuntimeError("upstream 503")
+
+    store.enqueue("flaky", "x", {})
+    stats = JobRunner(store, "flaky", [Stage("call", flaky)], max_attempts=3, retry_backoff=0.2).run()
+
+    assert stats["completed"] == 1 and stats["failed"] == 2
+    gaps = [later - earlier for earlier, later in zip(attempts, attempts[1:])]
+    assert gaps[0] >= 0.2 and gaps[1] >= 0.4
+
+
+def test_delayed_retry_is_not_claimable_early(store):
+    job_id = store.enqueue("email", "a", {})
+    store.claim("email", "worker")
+    store.fail(job_id, "boom", retry_delay=60)
+
+    assert store.claim("email", "worker") is None
+    assert store.next_retry_at("email") > time.time() + 50
+    assert store.requeue_running("email") == 0
+
+
+def test_record_trigger_rolls_back_on_error(store):
+    store._conn.execute(
+        "CREATE TRIGGER reject_inputs BEFORE INSERT ON snapshot_inputs BEGIN SELECT RAISE(ABORT, 'disk full'); END")
+    with pytest.raises(sqlite3.DatabaseError):
+        store.record_trigger("s_1", "gd_test", [{"url": "u"}], ["u"])
+
+    assert not store._conn.in_transaction
+    assert store.pending_snapshots() == []
+    store._conn.execute("DROP TRIGGER reject_inputs")
+
+    store.record_trigger("s_2", "gd_test", [{"url": "u"}], ["u", input_set_key([{"url": "u"}])])
+    assert store.find_snapshot("gd_test", "u")["snapshot_id"] == "s_2"
+
+
+def test_collected_snapshots_are_not_reused(store):
+    store.record_trigger("s_1", "gd_test", [{"url": "u"}], ["u"], params={"type": "discover_new"})
+    assert store.find_snapshot("gd_test", "u") is None   # Other params
+    assert store.find_snapshot("gd_test", "u", {"type": "discover_new"})["status"] == "running"
+
+    store.update_snapshot("s_1", "collected")
+
+    assert store.find_snapshot("gd_test", "u", {"type": "discover_new"}) is None
+    assert store._conn.execute("SELECT COUNT(*) FROM snapshot_inputs").fetchone()[0] == 0
+
+
+def test_prune_drops_old_finished_work(store):
+    done = store.enqueue("email", "done", {})
+    store.complete(done, "ok")
+    store.enqueue("email", "pending", {})
+    store.record_trigger("s_old", "gd_test", [], ["k"])
+    store.update_snapshot("s_old", "failed")
+    store._conn.execute("UPDATE jobs SET updated_at = 0")
+    store._conn.execute("UPDATE snapshots SET updated_at = 0")
+
+    assert store.prune() == {"jobs": 1, "snapshots": 1}
+    assert [job["input_key"] for job in store.jobs()] == ["pending"]
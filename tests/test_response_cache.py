@@ -0,0 +1,101 @@
+import sqlite3
+
+import pytest
+
+from scraping_core import response_cache
+from scraping_core.response_cache import ResponseCache, make_cache_key
+
+VALUE = "x" * 1_000   # ~1 KB per entry once JSON-encoded
+
+
+@pytest.fixture
+def cache_path(tmp_path) -> str:
+    return str(tmp_path / "cache.sqlite3")
+
+
+def stored_bytes(cache: ResponseCache) -> int:
+    return cache._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+
+def test_round_trip_and_expiry(cache_path):
+    cache = ResponseCache(cache_path)
+    cache.set("serper", ["query"], {"organic": [1, 2]})
+    cache.set("gemini", ["prompt"], "answer", ttl=-1)
+
+    assert cache.get("serper", ["query"]) == {"organic": [1, 2]}
+    assert cache.get("gemini", ["prompt"]) is None
+    assert cache.stats()["sources"]["serper"] == {"hits": 1, "misses": 0, "stores": 1, "evictions": 0}
+    cache.close()
+
+
+def test_size_cap_evicts_least_recently_used(cache_path, monkeypatch):
+    monkeypatch.setattr(response_cache, "ACCESS_RESOLUTION_SECONDS", 0)
+    cache = ResponseCache(cache_path, max_bytes=10_000)
+    for index in range(9):
+        cache.set("serper", [index], VALUE)
+    assert cache.get("serper", [0]) == VALUE   # Now the most recently used entry
+
+    cache.set("serper", [9], VALUE)   # Over the cap: shrinks to 90% of it, oldest access first
+
+    assert [index for index in range(10) if cache.get("serper", [index]) is None] == [1, 2]
+    assert cache.stats()["sources"]["serper"]["evictions"] == 2
+    cache.close()
+
+
+def test_size_cap_holds_under_many_writes(cache_path):
+    cache = ResponseCache(cache_path, max_bytes=10_000)
+    for index in range(100):
+        cache.set("serper", [index], VALUE * (1 + index % 3))
+        assert stored_bytes(cache) <= cache.max_bytes
+    assert cache.stats()["bytes"] == stored_bytes(cache)
+    assert cache.get("serper", [99]) is not None
+    cache.close()
+
+
+def test_expired_entries_are_evicted_first(cache_path):
+    cache = ResponseCache(cache_path, max_bytes=5_600)
+    cache.set("serper", ["stale"], VALUE, ttl=-1)
+    for index in range(4):
+        cache.set("serper", [index], VALUE)
+    cache.set("serper", [4], VALUE)   # Over the cap: only the expired entry has to go
+
+    keys = {row[0] for row in cache._conn.execute("SELECT key FROM responses")}
+    assert make_cache_key("serper", ["stale"]) not in keys
+    assert keys == {make_cache_key("serper", [index]) for index in range(5)}
+    cache.close()
+
+
+def test_size_total_follows_every_write(cache_path):
+    first = ResponseCache(cache_path, max_bytes=8_000)
+    second = ResponseCache(cache_path, max_bytes=8_000)   # Another process on the same file
+
+    for index in range(12):
+        (first if index % 2 else second).set("brightdata", [index], VALUE * (1 + index % 3))
+    first.set("brightdata", [11], "small")   # Overwrite
+    second.clear("gemini")
+    first.purge_expired()
+
+    for cache in (first, second):
+        assert cache.stats()["bytes"] == stored_bytes(cache)
+        assert cache.stats()["bytes"] <= cache.max_bytes
+    first.clear()
+    assert second.stats()["bytes"] == 0
+    first.close()
+    second.close()
+
+
+def test_existing_file_gets_its_total_on_open(cache_path):
+    # A cache file written before the size total existed
+    conn = sqlite3.connect(cache_path)
+    conn.execute("CREATE TABLE responses (key TEXT PRIMARY KEY, source TEXT NOT NULL, value TEXT NOT NULL, "
+                 "size INTEGER NOT NULL, created_at REAL NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)")
+    conn.executemany("INSERT INTO responses VALUES (?, 'serper', '\"v\"', ?, 0, 1e12, 0)",
+                     [("a", 300), ("b", 700)])
+    conn.commit()
+    conn.close()
+
+    cache = ResponseCache(cache_path)
+    assert cache.stats()["bytes"] == 1_000
+    cache.set("serper", ["c"], VALUE)
+    assert cache.stats()["bytes"] == stored_bytes(cache)
+    cache.close()
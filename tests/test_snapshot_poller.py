@@ -0,0 +1,78 @@
+import time
+
+from scraping_core.snapshot_poller import SnapshotPoller
+
+
+def trigger(mock_server) -> str:
+    return mock_server.trigger({"dataset_id": "gd_test"}, [{"url": "https://example.com"}])["snapshot_id"]
+
+
+def test_every_waiter_resolves_from_one_poll_stream(mock_server, poller):
+    snapshot_id = trigger(mock_server)
+    waiters = [poller.track(snapshot_id, max_wait=30) for _ in range(3)]
+
+    outcomes = [poller.result(snapshot_id, waiter, 30) for waiter in waiters]
+
+    assert [outcome["status"] for outcome in outcomes] == ["ready"] * 3
+    assert len({outcome["polls"] for outcome in outcomes}) == 1
+    assert poller.stats["tracked"] == 1
+    assert poller.pending() == []
+
+
+def test_cancel_only_stops_one_waiter(mock_server, poller):
+    snapshot_id = trigger(mock_server)
+    first = poller.track(snapshot_id, max_wait=30)
+    second = poller.track(snapshot_id, max_wait=30)
+
+    assert poller.cancel(snapshot_id, first) is False
+    assert first.result(timeout=1)["status"] == "cancelled"
+    assert not mock_server.snapshots[snapshot_id].cancelled
+
+    assert poller.result(snapshot_id, second, 30)["status"] == "ready"
+
+
+def test_last_waiter_cancels_the_snapshot_remotely(mock_server, poller):
+    snapshot_id = trigger(mock_server)
+    first = poller.track(snapshot_id, max_wait=30)
+    second = poller.track(snapshot_id, max_wait=30)
+
+    assert poller.cancel(snapshot_id, first) is False
+    assert poller.cancel(snapshot_id, second) is True
+
+    assert second.result(timeout=1)["status"] == "cancelled"
+    assert mock_server.snapshots[snapshot_id].cancelled
+    assert snapshot_id not in poller.pending()
+
+
+def test_local_cancel_leaves_the_snapshot_running(mock_server, poller):
+    snapshot_id = trigger(mock_server)
+    waiter = poller.track(snapshot_id, max_wait=30)
+
+    assert poller.cancel(snapshot_id, waiter, remote=False) is True
+    assert not mock_server.snapshots[snapshot_id].cancelled
+
+
+def test_waiter_deadlines_are_independent(mock_server, poller):
+    snapshot_id = trigger(mock_server)
+    short = poller.track(snapshot_id, max_wait=0.1)
+    long = poller.track(snapshot_id, max_wait=30)
+
+    started = time.time()
+    assert poller.result(snapshot_id, short, 0.1)["status"] == "timeout"
+    assert time.time() - started < 1  # Expired by the poller thread, not by result()'s slack
+
+    assert poller.result(snapshot_id, long, 30)["status"] == "ready"
+    assert not mock_server.snapshots[snapshot_id].cancelled
+
+
+def test_push_resolves_without_waiting_for_a_poll(mock_server, brightdata_url):
+    poller = SnapshotPoller("test-token", brightdata_url, min_interval=60, max_interval=60)
+    try:
+        snapshot_id = trigger(mock_server)
+        poller.push(snapshot_id, "ready")  # Arrives before track()
+        outcome = poller.result(snapshot_id, poller.track(snapshot_id, max_wait=5), 5)
+    finally:
+        poller.stop()
+
+    assert outcome["status"] == "ready"
+    assert outcome["delivery"] == "webhook"
@@ -0,0 +1,101 @@
+from concurrent.futures import wait
+
+import pytest
+
+from scraping_core.company_matcher import MultiPatternMatcher
+from scraping_core.name_scraper import BrightDataLinkedInNameScraper
+from scraping_core.trigger_coalescer import TriggerCoalescer, _PendingRequest, person_key, url_key
+
+
+@pytest.mark.parametrize("item", [
+    {"first_name": "John", "last_name": "Smith"},
+    {"name": "John Smith"},
+    {"name": "John A. Smith"},
+    {"name": "Dr. John Smith Jr."},
+    {"name": "John Smith, MBA"},
+    {"name": "John Smith (he/him)"},
+    {"first_name": "John Andrew", "last_name": "Smith"},
+])
+def test_person_key_ignores_middle_names_and_affixes(item):
+    assert person_key(item) == "john smith"
+
+
+def test_person_key_folds_accents_and_keeps_hyphenated_names():
+    assert person_key({"name": "José Núñez"}) == person_key({"first_name": "Jose", "last_name": "Nunez"})
+    assert person_key({"name": "Anna Smith-Jones"}) == "anna smith-jones"
+    assert person_key({"name": "Cher"}) is None
+
+
+def test_url_key_ignores_scheme_www_and_trailing_slash():
+    assert url_key({"url": "https://www.Example.com/about/"}) == url_key({"input_url": "http://example.com/about"})
+    assert url_key({}) is None
+
+
+def coalescer(brightdata_url, poller, **kwargs) -> TriggerCoalescer:
+    return TriggerCoalescer("test-token", "gd_test", window_seconds=0.2, max_wait=30,
+                            base_url=brightdata_url, poller=poller, **kwargs)
+
+
+def test_concurrent_people_share_one_trigger(mock_server, brightdata_url, poller):
+    people = coalescer(brightdata_url, poller, key_fn=person_key,
+                       trigger_params={"type": "discover_new", "discover_by": "name"})
+    inputs = [{"first_name": "John", "last_name": "Smith"}, {"first_name": "Jane", "last_name": "Doe"}]
+
+    futures = [people.submit(item) for item in inputs]
+    futures.append(people.submit({"first_name": "john", "last_name": "SMITH"}))  # Same person, sent once
+    wait(futures, timeout=30)
+
+    assert people.stats["triggers"] == 1
+    assert people.stats["inputs_sent"] == 2
+    john, jane, john_again = [future.result()["records"] for future in futures]
+    assert len(john) == len(jane) == mock_server.config.profiles_per_person
+    assert {profile["name"] for profile in john} == {"John Smith"}
+    assert {profile["name"] for profile in jane} == {"Jane Doe"}
+    assert john_again == john
+
+
+def test_urls_are_routed_to_their_own_callers(brightdata_url, poller):
+    urls = coalescer(brightdata_url, poller)
+    first = urls.submit({"url": "https://www.first.example/"})
+    second = urls.submit({"url": "http://second.example"})
+
+    assert [record["url"] for record in first.result(timeout=30)["records"]] == ["https://www.first.example/"]
+    assert [record["url"] for record in second.result(timeout=30)["records"]] == ["http://second.example"]
+    assert urls.stats["triggers"] == 1
+
+
+def test_strict_routing_drops_records_of_other_inputs(brightdata_url, poller):
+    people = coalescer(brightdata_url, poller, key_fn=person_key)
+    john = {"first_name": "John", "last_name": "Smith"}
+    batch = [_PendingRequest(john, person_key(john))]
+    records = [{"name": "John Smith"}, {"name": "Someone Else"}, {"input": john}]
+
+    routed = people.route_records(batch, records, strict=True)
+
+    assert routed == {"john smith": [records[0], records[2]]}
+
+
+def test_profiles_of_unknown_people_are_not_routed():
+    scraper = BrightDataLinkedInNameScraper("test-token")
+    matcher = MultiPatternMatcher({"t_john": "acme", "t_jane": "acme"})
+    targets_by_person = {"john smith": {"t_john"}, "jane doe": {"t_jane"}}
+    profiles = [
+        {"name": "John A. Smith", "current_company_name": "Acme Corp"},
+        {"name": "Stranger Danger", "current_company_name": "Acme Corp"},
+        {"name": "Whoever", "input": {"first_name": "Jane", "last_name": "Doe"}, "current_company_name": "Acme"},
+    ]
+
+    routed = scraper.route_profiles_to_targets(profiles, matcher, targets_by_person)
+
+    assert [profile["name"] for profile in routed["t_john"]] == ["John A. Smith"]
+    assert [profile["name"] for profile in routed["t_jane"]] == ["Whoever"]
+
+
+def test_single_person_gets_profiles_without_a_name():
+    scraper = BrightDataLinkedInNameScraper("test-token")
+    matcher = MultiPatternMatcher({"t_john": "acme"})
+
+    routed = scraper.route_profiles_to_targets([{"current_company_name": "Acme Corp"}], matcher,
+                                               {"john smith": {"t_john"}})
+
+    assert len(routed["t_john"]) == 1